@@ -1,26 +1,241 @@
 # backend/app/database.py
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, ForeignKey, DateTime, Index
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy import (
+    Column, Integer, SmallInteger, String, Float, Boolean, Text, ForeignKey, Date, DateTime, Index, UniqueConstraint,
+    inspect, text, event
+)
 from datetime import datetime
-import os
+import json
+from typing import Dict, Optional
+
+from app.config import settings
+from app.utils.assessment_codes import MULTI_SELECT, encode_assessment
 
-# Database configuration
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./database.db")
 
-# Create async engine
+def async_database_url(url: str) -> str:
+    """
+    The URL with an async driver: plain sqlite:// URLs use aiosqlite, and
+    postgres:// / postgresql:// URLs (as hosting providers hand them out) use asyncpg.
+    """
+    for prefix, driver in (("postgres://", "postgresql+asyncpg://"),
+                           ("postgresql://", "postgresql+asyncpg://"),
+                           ("sqlite://", "sqlite+aiosqlite://")):
+        if url.startswith(prefix):
+            return driver + url[len(prefix):]
+    return url
+
+
+# Database configuration: SQLite (single node) or PostgreSQL, from settings.database_url
+DATABASE_URL = async_database_url(settings.database_url)
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# SQLite performance profiles: pragmas set on every new connection, in this
+# order (busy_timeout first so switching the journal mode waits for a lock).
+# "legacy" sets nothing and keeps SQLite's defaults.
+SQLITE_PROFILES: Dict[str, Dict[str, object]] = {
+    "legacy": {},
+    "durable": {
+        "busy_timeout": 5000, "journal_mode": "WAL", "synchronous": "FULL",
+        "cache_size": -16384, "temp_store": "MEMORY",
+    },
+    "balanced": {
+        "busy_timeout": 5000, "journal_mode": "WAL", "synchronous": "NORMAL",
+        "cache_size": -65536, "mmap_size": 256 * 1024 * 1024, "temp_store": "MEMORY",
+    },
+    "fast": {
+        "busy_timeout": 5000, "journal_mode": "WAL", "synchronous": "OFF",
+        "cache_size": -262144, "mmap_size": 1024 * 1024 * 1024, "temp_store": "MEMORY",
+    },
+}
+SQLITE_PRAGMA_ORDER = ("busy_timeout", "journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store")
+_SQLITE_PRAGMA_CHOICES = {
+    "journal_mode": ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"),
+    "synchronous": ("OFF", "NORMAL", "FULL", "EXTRA"),
+    "temp_store": ("DEFAULT", "FILE", "MEMORY"),
+}
+
+
+def sqlite_pragmas(profile: str, journal_mode: Optional[str] = None, synchronous: Optional[str] = None,
+                   cache_size_kib: Optional[int] = None, mmap_size_mb: Optional[int] = None,
+                   busy_timeout_ms: Optional[int] = None, temp_store: Optional[str] = None) -> Dict[str, object]:
+    """Pragmas of a named profile with any explicitly given values overriding it."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"sqlite profile must be one of {tuple(SQLITE_PROFILES)}, got {profile!r}")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    overrides = {
+        "busy_timeout": busy_timeout_ms,
+        "journal_mode": journal_mode.upper() if journal_mode else None,
+        "synchronous": synchronous.upper() if synchronous else None,
+        "cache_size": -cache_size_kib if cache_size_kib is not None else None,  # negative = KiB
+        "mmap_size": mmap_size_mb * 1024 * 1024 if mmap_size_mb is not None else None,
+        "temp_store": temp_store.upper() if temp_store else None,
+    }
+    for name, value in overrides.items():
+        if value is None:
+            continue
+        if name in _SQLITE_PRAGMA_CHOICES and value not in _SQLITE_PRAGMA_CHOICES[name]:
+            raise ValueError(f"sqlite {name} must be one of {_SQLITE_PRAGMA_CHOICES[name]}, got {value!r}")
+        pragmas[name] = int(value) if name not in _SQLITE_PRAGMA_CHOICES else value
+    return {name: pragmas[name] for name in SQLITE_PRAGMA_ORDER if name in pragmas}
+
+
+SQLITE_PRAGMAS = sqlite_pragmas(
+    settings.sqlite_profile,
+    journal_mode=settings.sqlite_journal_mode,
+    synchronous=settings.sqlite_synchronous,
+    cache_size_kib=settings.sqlite_cache_size_kib,
+    mmap_size_mb=settings.sqlite_mmap_size_mb,
+    busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+    temp_store=settings.sqlite_temp_store
+) if IS_SQLITE else {}
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+
+def _engine_options(url: str, pool_size: int, max_overflow: int, read_only: bool = False) -> Dict:
+    """Driver and pool arguments: a queue pool of `pool_size` connections, or
+    a new connection per session when it is 0. In-memory SQLite keeps
+    SQLAlchemy's own single-connection pool. Server connections (PostgreSQL)
+    are checked before use and replaced after `db_pool_recycle_seconds`, so
+    connections the server or a proxy closed are never handed out."""
+    options: Dict = {"insertmanyvalues_page_size": settings.db_insert_page_size}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+        if _is_memory_sqlite(url):
+            return options
+    elif url.startswith("postgresql+asyncpg"):
+        server_settings = {
+            "application_name": settings.postgres_application_name + ("-read" if read_only else ""),
+            # Planning JIT costs more than it saves on short dashboard queries
+            "jit": "on" if settings.postgres_jit else "off",
+        }
+        if settings.postgres_statement_timeout_ms > 0:
+            server_settings["statement_timeout"] = str(settings.postgres_statement_timeout_ms)
+        if read_only:
+            server_settings["default_transaction_read_only"] = "on"
+        options["connect_args"] = {"server_settings": server_settings}
+    if pool_size > 0:
+        options.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds
+        )
+        if not url.startswith("sqlite"):
+            options.update(pool_pre_ping=True, pool_recycle=settings.db_pool_recycle_seconds)
+    else:
+        options["poolclass"] = NullPool
+    return options
+
+
+# Write engine: prediction storage, migrations and background jobs
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,  # Set to True for SQL query logging
-    connect_args={"check_same_thread": False}  # SQLite specific
+    **_engine_options(DATABASE_URL, settings.db_pool_size, settings.db_max_overflow)
 )
 
-# Session factory
+# Read engine: the admin dashboard, with its own pool of read-only connections
+# so dashboard traffic and prediction writes never wait for each other's
+# connections. It reads the replica at database_read_url if one is set, else
+# the same database (SQLite WAL readers run alongside the writer). An
+# in-memory SQLite database exists once per connection, so it shares the write engine.
+DATABASE_READ_URL = async_database_url(settings.database_read_url) if settings.database_read_url else DATABASE_URL
+if _is_memory_sqlite(DATABASE_READ_URL):
+    read_engine = engine
+else:
+    read_engine = create_async_engine(
+        DATABASE_READ_URL,
+        echo=False,
+        **_engine_options(DATABASE_READ_URL, settings.db_read_pool_size, settings.db_read_max_overflow,
+                          read_only=True)
+    )
+ENGINES = {"write": engine, "read": read_engine}
+
+# Per engine role: pragma values SQLite reported back on the most recent new
+# connection, and the number of connections opened
+_applied_pragmas: Dict[str, Dict[str, object]] = {role: {} for role in ENGINES}
+_connections_opened: Dict[str, int] = {role: 0 for role in ENGINES}
+
+
+def _listen_for_connections(role_engine, read_only: bool = False, role: Optional[str] = None):
+    """Set up every new connection of `role_engine`; a `role` also records it for database_metrics."""
+    @event.listens_for(role_engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        """Apply the configured SQLite profile to every new connection (pooled connections keep it)."""
+        if role_engine.dialect.name == "sqlite":
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in SQLITE_PRAGMAS.items():
+                    cursor.execute(f"PRAGMA {name}={value}")
+                if read_only:
+                    cursor.execute("PRAGMA query_only=ON")
+                for name in SQLITE_PRAGMA_ORDER:
+                    cursor.execute(f"PRAGMA {name}")
+                    row = cursor.fetchone()
+                    if role is not None:
+                        _applied_pragmas[role][name] = row[0] if row else None
+            finally:
+                cursor.close()
+        if role is not None:
+            _connections_opened[role] += 1
+
+
+_listen_for_connections(engine, role="write")
+if read_engine is not engine:
+    _listen_for_connections(read_engine, read_only=True, role="read")
+
+
+def _pool_metrics(role: str, role_engine) -> Dict:
+    pool = role_engine.pool
+    metrics = {
+        'pool': type(pool).__name__,
+        'pool_status': pool.status(),
+        'connections_opened': _connections_opened[role],
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        metrics.update(pool_size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    if role_engine.dialect.name == "sqlite":
+        metrics['sqlite_pragmas_applied'] = dict(_applied_pragmas[role])
+    return metrics
+
+
+def database_metrics() -> Dict:
+    """Connection pool state per engine role and the SQLite pragmas in effect."""
+    metrics = {
+        'dialect': engine.dialect.name,
+        'separate_read_engine': read_engine is not engine,
+        'read_replica': DATABASE_READ_URL != DATABASE_URL,
+        'write': _pool_metrics("write", engine),
+        'read': _pool_metrics("read", read_engine) if read_engine is not engine else {},
+    }
+    if IS_SQLITE:
+        metrics.update(sqlite_profile=settings.sqlite_profile, sqlite_pragmas=SQLITE_PRAGMAS)
+    return metrics
+
+
+async def dispose_engines():
+    """Close the pooled connections of both engines."""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
+# Session factories: writes, and read-only dashboard queries
 SessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
 
 # Base class for ORM models
 Base = declarative_base()
@@ -45,12 +260,21 @@ class Prediction(Base):
     prediction_confidence = Column(Float, nullable=False)
 
     # Source tracking
-    endpoint = Column(String, nullable=False)  # 'simplified' or 'raw'
+    endpoint = Column(String, nullable=False)  # 'simplified', 'raw' or 'batch'
+    model_version = Column(String, nullable=True, index=True)  # e.g. 'model_gb@3fa9c1e2b7d0'; NULL for fallback
 
 
 class AssessmentInput(Base):
-    """Stores all form inputs from SimplifiedAssessmentRequest"""
+    """
+    Stores all form inputs from SimplifiedAssessmentRequest, encoded: single-choice
+    answers as small-integer codes, multi-select lists as bitmasks (see
+    app/utils/assessment_codes.py for the vocabularies and the decoding)
+    """
     __tablename__ = "assessment_inputs"
+    # Covers the usual cohort filter (employment x financial stress) without touching the table
+    __table_args__ = (
+        Index("ix_assessment_inputs_cohort", "employment_status", "financial_stress", "prediction_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     prediction_id = Column(Integer, ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -61,67 +285,236 @@ class AssessmentInput(Base):
     consent_anonymous_analytics = Column(Boolean, nullable=False)
 
     # Academic (5 fields)
-    academic_year = Column(String, nullable=False)
-    attendance = Column(String, nullable=False)
-    overwhelm_frequency = Column(String, nullable=False)
-    study_hours = Column(String, nullable=False)
+    academic_year = Column(SmallInteger, nullable=False)  # code
+    attendance = Column(SmallInteger, nullable=False)  # code
+    overwhelm_frequency = Column(SmallInteger, nullable=False)  # code
+    study_hours = Column(SmallInteger, nullable=False)  # code
     performance_satisfaction = Column(Integer, nullable=False)
 
     # Support (3 fields)
-    advisor_interaction = Column(String, nullable=False)
+    advisor_interaction = Column(SmallInteger, nullable=False)  # code
     support_network_strength = Column(Integer, nullable=False)
     extracurricular_hours = Column(Integer, nullable=False)
 
     # Personal (3 fields)
-    employment_status = Column(String, nullable=False)
-    financial_stress = Column(String, nullable=False)
+    employment_status = Column(SmallInteger, nullable=False)  # code
+    financial_stress = Column(SmallInteger, nullable=False)  # code
     career_alignment = Column(Integer, nullable=False)
 
-    # Services (arrays stored as JSON text)
-    services_used = Column(Text, nullable=True)  # JSON array
+    # Services (multi-select lists as bitmasks)
+    services_used = Column(Integer, nullable=False, default=0)
     withdrawal_considered = Column(Boolean, nullable=False)
-    withdrawal_reasons = Column(Text, nullable=True)  # JSON array
+    withdrawal_reasons = Column(Integer, nullable=False, default=0)
 
+    # JSON object of answers the codes cannot represent exactly; NULL for almost every row
+    unlisted_answers = Column(Text, nullable=True)
 
-class RiskFactor(Base):
-    """Stores individual risk factors identified for each prediction"""
-    __tablename__ = "risk_factors"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    prediction_id = Column(Integer, ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False, index=True)
+class RiskFactorText(Base):
+    """Catalog of distinct risk factor texts; each is stored once and referenced by id"""
+    __tablename__ = "risk_factor_texts"
+    __table_args__ = (UniqueConstraint("category", "factor", "impact", "description"),)
 
+    id = Column(Integer, primary_key=True, autoincrement=True)
     category = Column(String, nullable=False, index=True)  # e.g., 'Academic', 'Financial'
     factor = Column(String, nullable=False)
     impact = Column(String, nullable=False)  # 'low', 'medium', 'high'
     description = Column(Text, nullable=False)
 
 
-class Recommendation(Base):
-    """Stores personalized recommendations for each prediction"""
-    __tablename__ = "recommendations"
+class RecommendationText(Base):
+    """Catalog of distinct recommendation texts; each is stored once and referenced by id"""
+    __tablename__ = "recommendation_texts"
+    __table_args__ = (UniqueConstraint("rec_type", "title", "description", "urgency", "contact"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    prediction_id = Column(Integer, ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False, index=True)
-
     rec_type = Column(String, nullable=False, index=True)  # 'counseling', 'financial', 'academic', etc.
     title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
     urgency = Column(String, nullable=False)  # 'immediate', 'soon', 'when-needed'
-    contact = Column(String, nullable=True)
+    contact = Column(String, nullable=False, default="")  # '' when there is none, so the key stays unique
+
+
+class RiskFactor(Base):
+    """Risk factors identified for each prediction, as references into risk_factor_texts"""
+    __tablename__ = "risk_factors"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    prediction_id = Column(Integer, ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False, index=True)
+    text_id = Column(Integer, ForeignKey("risk_factor_texts.id"), nullable=False, index=True)
+
+
+class Recommendation(Base):
+    """Personalized recommendations for each prediction, as references into recommendation_texts"""
+    __tablename__ = "recommendations"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    prediction_id = Column(Integer, ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False, index=True)
+    text_id = Column(Integer, ForeignKey("recommendation_texts.id"), nullable=False, index=True)
+
+
+class ShadowComparison(Base):
+    """Candidate-vs-live model comparison, one row per shadow-scored batch"""
+    __tablename__ = "shadow_comparisons"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    live_version = Column(String, nullable=False)
+    candidate_version = Column(String, nullable=False, index=True)
+
+    # Aggregates over the batch
+    n = Column(Integer, nullable=False)
+    agreements = Column(Integer, nullable=False)  # same predicted_class
+    risk_level_flips = Column(Integer, nullable=False)
+    sum_delta = Column(Float, nullable=False)  # sum of candidate - live probability
+    sum_abs_delta = Column(Float, nullable=False)
+    max_abs_delta = Column(Float, nullable=False)
+    flip_counts = Column(Text, nullable=True)  # JSON object, e.g. {"low->medium": 3}
+
+
+class PredictionRollup(Base):
+    """
+    Daily totals per risk level of predictions moved to the cold archive
+    (app/models/retention.py), so all-time dashboard numbers still count them
+    """
+    __tablename__ = "prediction_rollups"
+    __table_args__ = (UniqueConstraint("day", "risk_level"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    day = Column(Date, nullable=False)  # UTC date of created_at
+    risk_level = Column(String, nullable=False)
+    predictions = Column(Integer, nullable=False)
+    risk_score_sum = Column(Integer, nullable=False)
+
+
+class RiskFactorRollup(Base):
+    """Daily occurrences per risk factor text among predictions moved to the cold archive"""
+    __tablename__ = "risk_factor_rollups"
+    __table_args__ = (UniqueConstraint("day", "text_id"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    day = Column(Date, nullable=False)  # UTC date of the prediction's created_at
+    text_id = Column(Integer, ForeignKey("risk_factor_texts.id"), nullable=False)
+    occurrences = Column(Integer, nullable=False)
 
 
 # ============================================================================
 # Database Initialization
 # ============================================================================
 
+def _add_missing_columns(sync_conn):
+    """
+    Add nullable columns that were introduced after a table was first created.
+    create_all only creates missing tables, so existing databases would
+    otherwise lack new columns.
+    """
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+            for index in table.indexes:
+                if [c.name for c in index.columns] == [column.name]:
+                    index.create(sync_conn, checkfirst=True)
+            print(f"[OK] Added column {table.name}.{column.name}")
+
+
+# Per-prediction tables that used to repeat their full texts on every row,
+# with the catalog the texts moved to and the columns that make up a text
+TEXT_CATALOGS = (
+    (RiskFactor, RiskFactorText, ("category", "factor", "impact", "description")),
+    (Recommendation, RecommendationText, ("rec_type", "title", "description", "urgency", "contact")),
+)
+
+
+def _migrate_inline_texts(sync_conn):
+    """
+    Move risk factor and recommendation texts stored inline on every row
+    (the layout before the text catalogs) into the catalogs, keeping row ids.
+    """
+    inspector = inspect(sync_conn)
+    for link, catalog, columns in TEXT_CATALOGS:
+        table = link.__tablename__
+        if not inspector.has_table(table):
+            continue
+        if "text_id" in {col["name"] for col in inspector.get_columns(table)}:
+            continue
+        legacy = f"{table}_inline_texts"
+        for index in inspector.get_indexes(table):
+            sync_conn.execute(text(f"DROP INDEX {index['name']}"))
+        sync_conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+        catalog.__table__.create(sync_conn, checkfirst=True)
+        link.__table__.create(sync_conn)
+
+        values = ", ".join(f"COALESCE({c}, '')" for c in columns)
+        sync_conn.execute(text(
+            f"INSERT INTO {catalog.__tablename__} ({', '.join(columns)}) SELECT DISTINCT {values} FROM {legacy}"
+        ))
+        matches = " AND ".join(f"t.{c} = COALESCE(l.{c}, '')" for c in columns)
+        moved = sync_conn.execute(text(
+            f"INSERT INTO {table} (id, prediction_id, text_id) "
+            f"SELECT l.id, l.prediction_id, t.id FROM {legacy} l JOIN {catalog.__tablename__} t ON {matches}"
+        )).rowcount
+        distinct = sync_conn.execute(text(f"SELECT COUNT(*) FROM {catalog.__tablename__}")).scalar()
+        sync_conn.execute(text(f"DROP TABLE {legacy}"))
+        print(f"[OK] Moved {moved} {table} rows to {catalog.__tablename__} ({distinct} distinct texts)")
+
+
+def _migrate_text_answers(sync_conn, chunk_size: int = 10000):
+    """
+    Re-encode assessment inputs stored as answer strings and JSON lists (the
+    layout before the answer codes) into codes and bitmasks, keeping row ids.
+    """
+    inspector = inspect(sync_conn)
+    table = AssessmentInput.__tablename__
+    if not inspector.has_table(table):
+        return
+    if "unlisted_answers" in {col["name"] for col in inspector.get_columns(table)}:
+        return
+    legacy = f"{table}_text_answers"
+    for index in inspector.get_indexes(table):
+        sync_conn.execute(text(f"DROP INDEX {index['name']}"))
+    sync_conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    AssessmentInput.__table__.create(sync_conn)
+
+    moved, last_id = 0, 0
+    while True:
+        rows = sync_conn.execute(
+            text(f"SELECT * FROM {legacy} WHERE id > :last_id ORDER BY id LIMIT {chunk_size}"),
+            {"last_id": last_id}
+        ).mappings().all()
+        if not rows:
+            break
+        encoded = []
+        for row in rows:
+            answers = dict(row)
+            for field in MULTI_SELECT:
+                answers[field] = json.loads(row[field]) if row[field] else []
+            encoded.append({"id": row["id"], "prediction_id": row["prediction_id"], **encode_assessment(answers)})
+        sync_conn.execute(AssessmentInput.__table__.insert(), encoded)
+        moved += len(rows)
+        last_id = rows[-1]["id"]
+    sync_conn.execute(text(f"DROP TABLE {legacy}"))
+    print(f"[OK] Re-encoded {moved} {table} rows as answer codes")
+
+
 async def init_db():
     """
     Initialize database by creating all tables.
     This is called on application startup.
     """
     async with engine.begin() as conn:
+        await conn.run_sync(_migrate_inline_texts)
+        await conn.run_sync(_migrate_text_answers)
         # Create all tables defined in Base metadata
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
         print("[OK] Database tables created successfully")
 
 
@@ -139,3 +532,16 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db():
+    """
+    Dependency providing a session on the read engine, for endpoints that
+    only query (the admin dashboard). Writes through it fail: its
+    connections are read-only.
+    """
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -1,12 +1,12 @@
 # backend/app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config import settings
-from app.models.schemas import HealthResponse
+from app.models.schemas import HealthResponse, ReadinessResponse
 from app.models.ml_model import ml_model
-from app.database import init_db, SessionLocal
 from app.routers import prediction, admin
-from app.seed_data import seed_demo_data
+from app.startup import run_startup, run_shutdown, startup_state
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -26,37 +26,19 @@ app.add_middleware(
 
 # Include routers
 app.include_router(prediction.router, prefix=settings.api_prefix)
+app.include_router(admin.dashboard_router, prefix=settings.api_prefix)
 app.include_router(admin.router, prefix=settings.api_prefix)
 
 @app.on_event("startup")
 async def startup_event():
-    """Load ML model and initialize database on startup"""
-    print(f"Starting {settings.app_name} v{settings.version}")
+    """Initialize database and load ML model (concurrently; see app.startup)"""
+    await run_startup()
 
-    # Initialize database and seed demo data
-    try:
-        await init_db()
-        print("[OK] Database initialized successfully")
-        async with SessionLocal() as db:
-            await seed_demo_data(db)
-    except Exception as e:
-        print(f"[ERROR] Database initialization failed: {e}")
 
-    # Archive known legacy model files (do not delete them)
-    # Note: Do NOT include the currently active model paths here
-    legacy_paths = [
-        "ml/Model_Random_Forest.pkl",
-        "ml/scaler_rf.pkl",
-        "models/Model_Gradient_Boosting.pkl",
-        "models/scaler.pkl",
-    ]
-    try:
-        ml_model.archive_legacy_files(legacy_paths)
-    except Exception as e:
-        print(f"Archiving legacy models failed: {e}")
-
-    # Try to load the active model (will use fallback if not available)
-    ml_model.load_model(settings.model_path, settings.scaler_path)
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Drain in-flight batched predictions and queued database writes before the process exits"""
+    await run_shutdown()
 
 @app.get("/")
 async def root():
@@ -76,6 +58,23 @@ async def health_check():
         ml_model_loaded=ml_model.is_loaded
     )
 
+@app.get("/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+async def readiness_check():
+    """Readiness probe: 503 until the database is initialized and the model load has finished.
+
+    Unlike /health (liveness), route traffic to this instance only once this returns 200.
+    """
+    version = ml_model.current()
+    body = ReadinessResponse(
+        ready=startup_state.is_ready,
+        database_ready=startup_state.database_ready,
+        ml_model_loaded=version is not None,
+        ml_model_version=version.version if version is not None else None,
+        startup_ms=startup_state.elapsed_ms(),
+        phases_ms=startup_state.phases
+    )
+    return JSONResponse(status_code=200 if body.ready else 503, content=body.model_dump())
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
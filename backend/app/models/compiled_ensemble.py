@@ -0,0 +1,158 @@
+# backend/app/models/compiled_ensemble.py
+"""Flat-array evaluator for a fitted binary GradientBoostingClassifier.
+
+sklearn's `predict_proba` spends most of a single-row call on input
+validation and per-estimator dispatch. At load time we copy every tree
+into padded, contiguous NumPy arrays and fold the StandardScaler into the
+split thresholds, so scoring is a handful of vectorised gathers over the
+raw (unscaled) feature matrix.
+"""
+from typing import Optional
+import numpy as np
+
+
+def _fold_thresholds(threshold: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Map split thresholds from scaled float32 space back to raw feature space.
+
+    sklearn trees compare `float32((x - mean) / scale) <= threshold`. The
+    naive inverse `threshold * scale + mean` is off whenever a threshold sits
+    exactly on a float32 training value, so instead we bisect for the largest
+    raw double that still goes left. The mapping is monotone, so
+    `x <= folded` then reproduces sklearn's decision exactly.
+    """
+    def goes_left(x):
+        return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    guess = threshold * scale + mean
+    width = np.maximum(np.abs(guess), 1.0) * 1e-6
+    lo, hi = guess - width, guess + width
+    while not np.all(goes_left(lo)):
+        lo = np.where(goes_left(lo), lo, lo - (hi - lo))
+    while np.any(goes_left(hi)):
+        hi = np.where(goes_left(hi), hi + (hi - lo), hi)
+
+    for _ in range(200):
+        if np.all(np.nextafter(lo, hi) >= hi):
+            break
+        mid = lo + (hi - lo) / 2
+        left = goes_left(mid)
+        lo = np.where(left, mid, lo)
+        hi = np.where(left, hi, mid)
+    return lo
+
+
+class CompiledEnsemble:
+    """Gradient boosting ensemble flattened into contiguous node arrays.
+
+    All trees are concatenated into one set of node arrays; `roots` holds the
+    offset of each tree's root. Child indices are global, and leaves point to
+    themselves with a +inf threshold, so every row can be walked exactly
+    `max_depth` steps without branching.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, base_score: float,
+                 max_depth: int, n_features: int):
+        self.feature = feature        # int64 (n_nodes,): split feature (0 for leaves)
+        self.threshold = threshold    # float64 (n_nodes,): threshold in raw feature space (+inf for leaves)
+        self.children = children      # int64 (n_nodes * 2,): [left, right] global child index per node
+        self.value = value            # float64 (n_nodes,): leaf value already scaled by learning_rate
+        self.roots = roots            # int64 (n_trees,): global index of each tree's root
+        self.base_score = base_score  # raw log-odds of the init estimator
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.n_trees = roots.shape[0]
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None) -> Optional["CompiledEnsemble"]:
+        """Compile a fitted binary `GradientBoostingClassifier` (and optional StandardScaler).
+
+        Returns None for models this evaluator does not support (multiclass,
+        non log-loss, ...), in which case callers should keep using sklearn.
+        """
+        estimators = getattr(model, 'estimators_', None)
+        if estimators is None or estimators.ndim != 2 or estimators.shape[1] != 1:
+            return None
+        if getattr(model, 'loss', 'log_loss') not in ('log_loss', 'deviance'):
+            return None
+
+        n_features = int(model.n_features_in_)
+        trees = [est.tree_ for est in estimators[:, 0]]
+
+        mean = np.zeros(n_features)
+        scale = np.ones(n_features)
+        if scaler is not None:
+            if getattr(scaler, 'mean_', None) is not None:
+                mean = np.asarray(scaler.mean_, dtype=float)
+            if getattr(scaler, 'scale_', None) is not None:
+                scale = np.asarray(scaler.scale_, dtype=float)
+        if np.any(scale <= 0):
+            return None
+
+        learning_rate = float(model.learning_rate)
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for t in trees:
+            n = t.node_count
+            local = np.arange(n)
+            is_split = t.children_left[:n] != -1
+
+            feature = np.where(is_split, t.feature[:n], 0).astype(np.int64)
+            threshold = np.full(n, np.inf)
+            threshold[is_split] = _fold_thresholds(
+                t.threshold[:n][is_split], mean[feature[is_split]], scale[feature[is_split]]
+            )
+            left = np.where(is_split, t.children_left[:n], local) + offset
+            right = np.where(is_split, t.children_right[:n], local) + offset
+
+            features.append(feature)
+            thresholds.append(threshold)
+            children.append(np.column_stack([left, right]).ravel())
+            values.append(t.value[:n, 0, 0] * learning_rate)
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, int(t.max_depth))
+
+        compiled = cls(
+            feature=np.ascontiguousarray(np.concatenate(features)),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds)),
+            children=np.ascontiguousarray(np.concatenate(children)).astype(np.int64),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int64),
+            base_score=0.0,
+            max_depth=max_depth,
+            n_features=n_features
+        )
+
+        # Recover the init estimator's raw score from sklearn itself so any
+        # `init` (prior, zero, custom) is handled without private APIs.
+        reference = np.zeros((1, n_features))
+        reference_scaled = scaler.transform(reference) if scaler is not None else reference
+        sklearn_raw = float(np.ravel(model.decision_function(reference_scaled))[0])
+        compiled.base_score = sklearn_raw - float(compiled.raw_margin(reference)[0])
+        return compiled
+
+    def leaf_indices(self, X: np.ndarray) -> np.ndarray:
+        """Global leaf index reached in every tree, shape (N, n_trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        row_offset = (np.arange(X.shape[0], dtype=np.int64) * self.n_features)[:, None]
+        flat_X = X.ravel()
+
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        for _ in range(self.max_depth):
+            x = flat_X.take(row_offset + self.feature.take(node))
+            go_right = x > self.threshold.take(node)
+            node = self.children.take(2 * node + go_right)
+        return node
+
+    def raw_margin(self, X: np.ndarray) -> np.ndarray:
+        """Raw log-odds for each row of an (N, n_features) matrix in unscaled feature space."""
+        return self.base_score + self.value.take(self.leaf_indices(X)).sum(axis=1)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """(N, 2) class probabilities in `model.classes_` order, like sklearn."""
+        p = 1.0 / (1.0 + np.exp(-self.raw_margin(X)))
+        return np.column_stack([1.0 - p, p])
@@ -0,0 +1,168 @@
+# backend/app/models/csv_scoring.py
+"""Chunked scoring of uploaded CSV exports (shaped like ml/data/dataset.csv).
+
+The file is read `settings.csv_chunk_rows` rows at a time with only the
+FEATURE_ORDER columns parsed; each chunk is scored in one model pass and
+its results are encoded and yielded before the next chunk is scored, so
+memory stays flat whatever the file size. Reading the next chunk overlaps
+with scoring the current one.
+
+Output rows carry the 0-based data row index. Rows with a missing or
+non-numeric feature value get an `error` instead of a prediction and do
+not affect the rest of the chunk.
+"""
+import asyncio
+import time
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.models.executor import inference_executor
+from app.models.ml_model import ModelVersion
+from app.utils.feature_mapping import FEATURE_ORDER
+from app.utils.json_response import dumps
+
+OUTPUT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class CsvScoringStats:
+    """Counters across uploads, for /admin/runtime."""
+
+    def __init__(self):
+        self.uploads = 0
+        self.active = 0
+        self.rows = 0
+        self.malformed_rows = 0
+        self.last: Dict = {}
+
+    def metrics(self) -> Dict:
+        return {
+            'uploads': self.uploads,
+            'active': self.active,
+            'rows': self.rows,
+            'malformed_rows': self.malformed_rows,
+            'last_upload': self.last,
+        }
+
+
+csv_scoring_stats = CsvScoringStats()
+
+
+def open_csv(file: BinaryIO, sep: str = ","):
+    """Chunked reader over the FEATURE_ORDER columns, and its first chunk (blocking).
+
+    Raises ValueError if the header lacks any FEATURE_ORDER column, so that
+    and other problems with the start of the file fail the request before
+    any output is streamed.
+    """
+    reader = pd.read_csv(
+        file, sep=sep, usecols=FEATURE_ORDER, dtype=str, chunksize=settings.csv_chunk_rows,
+        encoding="utf-8-sig", skip_blank_lines=False
+    )
+    return reader, _next_chunk(reader)
+
+
+def _next_chunk(reader) -> Optional[pd.DataFrame]:
+    return next(reader, None)
+
+
+def chunk_to_matrix(chunk: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Float feature matrix in FEATURE_ORDER and a per-row mask of well-formed rows."""
+    # usecols keeps the file's column order; the model needs FEATURE_ORDER
+    X = chunk[FEATURE_ORDER].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    return X, np.isfinite(X).all(axis=1)
+
+
+def row_errors(X: np.ndarray, valid: np.ndarray) -> List[str]:
+    """Error messages for the malformed rows (`~valid`), in row order."""
+    names = np.asarray(FEATURE_ORDER)
+    return [
+        "Missing or non-numeric value for: " + ", ".join(names[cols])
+        for cols in ~np.isfinite(X[~valid])
+    ]
+
+
+def _encode_chunk(fmt: str, first_row: int, valid: np.ndarray, X: np.ndarray,
+                  result, header: bool) -> bytes:
+    n = len(valid)
+    out = pd.DataFrame({
+        "row": np.arange(first_row, first_row + n),
+        "dropout_probability": np.full(n, np.nan),
+        "predicted_class": np.full(n, None, dtype=object),
+        "model_confidence": np.full(n, np.nan),
+        "error": np.full(n, None, dtype=object),
+    })
+    if result is not None:
+        dropout_probability, is_dropout, model_confidence = result
+        out.loc[valid, "dropout_probability"] = dropout_probability
+        out.loc[valid, "predicted_class"] = np.where(is_dropout, "Dropout", "Non-Dropout")
+        out.loc[valid, "model_confidence"] = model_confidence
+    elif valid.any():
+        out.loc[valid, "error"] = "Model prediction failed"
+
+    if not valid.all():
+        out.loc[~valid, "error"] = row_errors(X, valid)
+
+    if fmt == "csv":
+        return out.to_csv(index=False, header=header).encode()
+    # Not DataFrame.to_json: it rounds floats to at most 15 significant digits
+    names = list(out.columns)
+    columns = [out[name].tolist() for name in names]
+    return b"".join([dumps(dict(zip(names, values))) + b"\n" for values in zip(*columns)])
+
+
+async def score_csv_chunks(reader, first_chunk: Optional[pd.DataFrame], version: ModelVersion,
+                           fmt: str, on_close=None) -> AsyncIterator[bytes]:
+    """Yield encoded results chunk by chunk; ends with a summary line for NDJSON.
+
+    `on_close` (e.g. closing the uploaded form) is awaited once streaming ends.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    rows = malformed = 0
+    error = None
+    chunk = first_chunk
+    csv_scoring_stats.uploads += 1
+    csv_scoring_stats.active += 1
+    try:
+        while chunk is not None:
+            # Start reading the next chunk while this one is scored
+            next_chunk = loop.run_in_executor(None, _next_chunk, reader)
+
+            X, valid = chunk_to_matrix(chunk)
+            result = await inference_executor.predict_arrays(X[valid], version) if valid.any() else None
+            yield await loop.run_in_executor(None, _encode_chunk, fmt, rows, valid, X, result, rows == 0)
+
+            n_bad = int((~valid).sum())
+            rows += len(chunk)
+            malformed += n_bad
+            csv_scoring_stats.rows += len(chunk)
+            csv_scoring_stats.malformed_rows += n_bad
+            try:
+                chunk = await next_chunk
+            except Exception as e:
+                # Unreadable from here on (e.g. an unterminated quote): report what was scored
+                error = f"CSV parsing stopped after row {rows - 1}: {e}"
+                print(error)
+                chunk = None
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            'rows': rows,
+            'scored': rows - malformed,
+            'malformed': malformed,
+            'model_version': version.version,
+            'elapsed_s': round(elapsed, 3),
+            'rows_per_sec': round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+            'error': error,
+        }
+        csv_scoring_stats.last = summary
+        print(f"CSV scoring: {rows} rows ({malformed} malformed) in {elapsed:.2f} s, "
+              f"{summary['rows_per_sec']:.0f} rows/s")
+        if fmt == "ndjson":
+            yield dumps({'summary': summary}) + b"\n"
+    finally:
+        csv_scoring_stats.active -= 1
+        if on_close is not None:
+            await on_close()
@@ -0,0 +1,155 @@
+# backend/app/models/executor.py
+"""Runs CPU-bound model scoring off the asyncio event loop.
+
+The pool type comes from `settings.inference_executor`:
+  - "inline":  score on the event loop (previous behaviour)
+  - "thread":  ThreadPoolExecutor scoring the caller's ModelVersion directly
+  - "process": ProcessPoolExecutor; each worker loads the model once in its initializer
+
+Process workers hold their own copy of a model, so there is one process
+pool per model version. A reload starts the new version's pool before the
+swap; the old pool is retired once the swap has happened.
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+
+from app.config import settings
+from app.models.ml_model import MLModel, ModelVersion, ml_model
+
+# Model instance owned by a process-pool worker (loaded by _init_worker)
+_worker_model: Optional[MLModel] = None
+
+
+def _init_worker(model_path: str, scaler_path: str):
+    global _worker_model
+    _worker_model = MLModel()
+    # The parent process answers lookup-table hits itself, so workers skip building it
+    _worker_model.load_model(model_path, scaler_path, build_lookup=False)
+
+
+def _worker_version() -> Optional[str]:
+    version = _worker_model.current() if _worker_model is not None else None
+    return version.version if version is not None else None
+
+
+def _worker_predict_batch(features: List[List[float]]) -> Optional[List[dict]]:
+    return _worker_model.predict_batch(features)
+
+
+def _worker_predict_arrays(features: np.ndarray):
+    return _worker_model.current().predict_arrays(features)
+
+
+class InferenceExecutor:
+    def __init__(self, kind: str, workers: int):
+        if kind not in ("inline", "thread", "process"):
+            raise ValueError(f"Unknown inference executor '{kind}' (expected inline, thread or process)")
+        self.kind = kind
+        self.workers = workers
+        self._pool: Optional[Executor] = None
+        self._process_pools: Dict[str, ProcessPoolExecutor] = {}
+        self.in_flight = 0
+        self.completed = 0
+
+    def start(self, version: Optional[ModelVersion] = None):
+        """Create the pool. Process workers load the model once, here, not per call."""
+        if self.kind == "inline" or self._pool is not None:
+            return
+        if self.kind == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+            print(f"[OK] Inference executor: thread pool with {self.workers} worker(s)")
+        elif version is not None:
+            self.prepare(version)
+
+    def prepare(self, version: ModelVersion):
+        """Make `version` scoreable before it goes live (blocking; run off the event loop).
+
+        Only process mode has per-version state: a fresh pool whose workers
+        load the version's files. If the workers end up with different files
+        (e.g. they were replaced again meanwhile) the pool is discarded and
+        that version is scored in-process instead.
+        """
+        if self.kind != "process" or version.version in self._process_pools:
+            return
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(version.model_path, version.scaler_path)
+        )
+        # Spawn and warm every worker now rather than on the first request
+        loaded = [pool.submit(_worker_version) for _ in range(self.workers)]
+        if all(f.result() == version.version for f in loaded):
+            self._process_pools[version.version] = pool
+            print(f"[OK] Inference executor: process pool with {self.workers} worker(s) for {version.version}")
+        else:
+            pool.shutdown(wait=False)
+            print(f"[WARNING] Inference workers could not load {version.version}; scoring it in-process")
+
+    def retire(self, keep: ModelVersion):
+        """Shut down process pools of every version except `keep`.
+
+        Work already submitted to a retired pool still completes; the pool
+        exits once it drains.
+        """
+        for tag in [t for t in self._process_pools if t != keep.version]:
+            self._process_pools.pop(tag).shutdown(wait=False)
+            print(f"Retired inference pool for {tag}")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        for pool in self._process_pools.values():
+            pool.shutdown(wait=True)
+        self._process_pools.clear()
+
+    async def predict_batch(self, features: List[List[float]],
+                            version: Optional[ModelVersion] = None) -> Optional[List[dict]]:
+        """Awaitable `ModelVersion.predict_batch` that does not block the event loop.
+
+        Scores with `version` (default: the active one), so a request that
+        started before a reload finishes on the model it started with.
+        """
+        return await self._run('predict_batch', _worker_predict_batch, features, version)
+
+    async def predict_arrays(self, features: np.ndarray, version: Optional[ModelVersion] = None):
+        """Awaitable `ModelVersion.predict_arrays` (columnar bulk scoring), like `predict_batch`."""
+        return await self._run('predict_arrays', _worker_predict_arrays, features, version)
+
+    async def _run(self, method: str, worker_fn, features, version: Optional[ModelVersion]):
+        version = version or ml_model.current()
+        if version is None:
+            return None
+        score = getattr(version, method)
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            if self.kind == "process":
+                pool = self._process_pools.get(version.version)
+                if pool is not None:
+                    return await loop.run_in_executor(pool, worker_fn, features)
+                # No pool for this version (retired or failed to start): score it here
+                return await loop.run_in_executor(None, score, features)
+            if self._pool is None:
+                return score(features)
+            return await loop.run_in_executor(self._pool, score, features)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def metrics(self) -> Dict:
+        running = self._pool is not None or bool(self._process_pools)
+        return {
+            'kind': self.kind,
+            'pool_size': self.workers if running else 0,
+            'running': running,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'process_pools': sorted(self._process_pools),
+        }
+
+
+# Global executor instance
+inference_executor = InferenceExecutor(settings.inference_executor, settings.inference_workers)
@@ -0,0 +1,198 @@
+# backend/app/models/inference_queue.py
+"""Micro-batching front end for MLModel.
+
+Concurrent /predict requests arriving within a few milliseconds of each
+other are collected into one matrix and scored with a single
+`predict_batch` call on the inference executor; each caller awaits its own
+future. Lookup-table hits never enter the queue, so they pay no batching
+delay. Each request carries the ModelVersion it started with; a batch that
+straddles a model reload is split and scored per version.
+"""
+import asyncio
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models.ml_model import MLModel, ModelVersion, ml_model
+from app.models.executor import InferenceExecutor, inference_executor
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+def _bucket_label(size: int) -> str:
+    lower = 1
+    for upper in BATCH_SIZE_BUCKETS:
+        if size <= upper:
+            return str(upper) if lower == upper else f"{lower}-{upper}"
+        lower = upper + 1
+    return f"{lower}+"
+
+
+class InferenceBatcher:
+    def __init__(self, model: MLModel, executor: InferenceExecutor, window_ms: float, max_batch_size: int):
+        self.model = model
+        self.executor = executor
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._scoring: set = set()
+        # Requests `_collect` has taken off the queue for the batch it is building
+        self._collecting: list = []
+
+        # Metrics
+        self.batches = 0
+        self.queued_requests = 0
+        self.scored_requests = 0
+        self.lookup_hits = 0
+        self.batch_sizes: Counter = Counter()
+        self._wait_ms: deque = deque(maxlen=2000)
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self):
+        """Start the background batching task on the running event loop."""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        print(f"[OK] Inference batching enabled (window {self.window_ms} ms, max batch {self.max_batch_size})")
+
+    async def stop(self):
+        """Stop the worker and score anything still queued so no caller is left waiting."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        # Cancelling the worker can interrupt `_collect` mid-window; its partial batch is flushed too
+        pending, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending:
+            await self._score(pending)
+        if self._scoring:
+            await asyncio.gather(*self._scoring, return_exceptions=True)
+
+    async def predict(self, features: List[float], version: Optional[ModelVersion] = None) -> Optional[dict]:
+        """Same contract as `MLModel.predict`, but batched with concurrent callers.
+
+        `version` defaults to the active model; pass the one captured at the
+        start of the request to keep it stable across a reload.
+        """
+        version = version or self.model.current()
+        if version is None:
+            return None
+        if version.lookup is not None:
+            hit = version.lookup.get(features)
+            if hit is not None:
+                self.lookup_hits += 1
+                return hit
+
+        if not self.is_running:
+            preds = await self.executor.predict_batch([features], version)
+            return preds[0] if preds else None
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((features, version, future, time.perf_counter()))
+        self.queued_requests += 1
+        return await future
+
+    async def _collect(self) -> List[Tuple[List[float], ModelVersion, asyncio.Future, float]]:
+        """Wait for one request, then gather more until the window closes or the batch is full."""
+        batch = self._collecting = []
+        batch.append(await self._queue.get())
+        deadline = time.perf_counter() + self.window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        self._collecting = []
+        return batch
+
+    async def _score(self, batch: List[Tuple[List[float], ModelVersion, asyncio.Future, float]]):
+        by_version: Dict[str, list] = {}
+        for item in batch:
+            by_version.setdefault(item[1].version, []).append(item)
+        if len(by_version) > 1:
+            await asyncio.gather(*(self._score(items) for items in by_version.values()))
+            return
+
+        started = time.perf_counter()
+        for _, _, _, enqueued in batch:
+            self._wait_ms.append((started - enqueued) * 1000)
+
+        version = batch[0][1]
+        try:
+            preds = await self.executor.predict_batch([features for features, _, _, _ in batch], version)
+        except Exception as e:
+            print(f"Batched inference failed: {e}")
+            preds = None
+        self.batches += 1
+        self.scored_requests += len(batch)
+        self.batch_sizes[_bucket_label(len(batch))] += 1
+
+        for i, (_, _, future, _) in enumerate(batch):
+            if not future.done():
+                future.set_result(preds[i] if preds is not None else None)
+
+    async def _run(self):
+        # Batches are scored concurrently so a multi-worker executor stays busy
+        # while the next batch is being collected.
+        while True:
+            batch = await self._collect()
+            task = asyncio.create_task(self._score(batch))
+            self._scoring.add(task)
+            task.add_done_callback(self._scoring.discard)
+
+    def metrics(self) -> Dict:
+        waits = sorted(self._wait_ms)
+
+        def percentile(q: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))], 3)
+
+        return {
+            'enabled': self.is_running,
+            'window_ms': self.window_ms,
+            'max_batch_size': self.max_batch_size,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'batches': self.batches,
+            'queued_requests': self.queued_requests,
+            'lookup_hits': self.lookup_hits,
+            'avg_batch_size': round(self.scored_requests / self.batches, 2) if self.batches else 0.0,
+            'batch_size_histogram': {
+                label: self.batch_sizes[label]
+                for label in sorted(self.batch_sizes, key=lambda l: int(l.split('-')[0].rstrip('+')))
+            },
+            'wait_ms_p50': percentile(0.50),
+            'wait_ms_p99': percentile(0.99),
+            'wait_ms_max': round(waits[-1], 3) if waits else 0.0,
+        }
+
+
+# Global batcher instance
+inference_batcher = InferenceBatcher(
+    ml_model,
+    inference_executor,
+    window_ms=settings.inference_batch_window_ms,
+    max_batch_size=settings.inference_batch_max_size
+)
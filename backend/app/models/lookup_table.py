@@ -0,0 +1,124 @@
+# backend/app/models/lookup_table.py
+"""Exhaustive prediction table for the simplified assessment space.
+
+map_form_to_ml_features only reads a handful of small enums and 0-10
+sliders, so the set of feature vectors the form can produce is finite
+(about a thousand distinct rows). We enumerate it once, score every
+reachable vector with the loaded model and store the results in dense
+arrays indexed by the per-feature value codes. A simplified prediction is
+then an array lookup instead of a model call.
+"""
+import itertools
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Sequence
+import numpy as np
+
+from app.utils.feature_mapping import FORM_OPTIONS, map_form_to_ml_features
+
+_reachable_cache: Optional[np.ndarray] = None
+
+
+def reachable_feature_vectors() -> np.ndarray:
+    """Every distinct 8-feature vector the assessment form can produce.
+
+    Model independent, so it is computed once per process and reused on
+    every table rebuild.
+    """
+    global _reachable_cache
+    if _reachable_cache is None:
+        fields = list(FORM_OPTIONS.keys())
+        vectors = {
+            tuple(map_form_to_ml_features(SimpleNamespace(**dict(zip(fields, combo)))))
+            for combo in itertools.product(*FORM_OPTIONS.values())
+        }
+        _reachable_cache = np.array(sorted(vectors), dtype=float)
+    return _reachable_cache
+
+
+class SimplifiedLookupTable:
+    """Dense (probability, class, confidence) table over reachable feature vectors."""
+
+    def __init__(self, value_codes: List[Dict[float, int]], strides: np.ndarray,
+                 probability: np.ndarray, is_dropout: np.ndarray, confidence: np.ndarray,
+                 filled: np.ndarray):
+        self.value_codes = value_codes  # per feature: value -> code
+        self.strides = strides          # row-major strides over the code space
+        self.probability = probability  # float64 (cells,)
+        self.is_dropout = is_dropout    # bool (cells,)
+        self.confidence = confidence    # float64 (cells,)
+        self.filled = filled            # bool (cells,): cell holds a reachable vector
+        self.size = int(filled.sum())
+        self.sorted_values = [np.array(sorted(c)) for c in value_codes]
+
+    @classmethod
+    def build(cls, score: Callable[[np.ndarray], Sequence[dict]]) -> "SimplifiedLookupTable":
+        """Enumerate all reachable vectors and score them with `score` (one batch call)."""
+        vectors = reachable_feature_vectors()
+        n_features = vectors.shape[1]
+
+        value_codes = []
+        codes = np.empty(vectors.shape, dtype=np.int64)
+        for f in range(n_features):
+            values, inverse = np.unique(vectors[:, f], return_inverse=True)
+            value_codes.append({float(v): i for i, v in enumerate(values)})
+            codes[:, f] = inverse
+
+        dims = [len(c) for c in value_codes]
+        strides = np.array([int(np.prod(dims[f + 1:])) for f in range(n_features)], dtype=np.int64)
+        n_cells = int(np.prod(dims))
+
+        preds = score(vectors)
+        cells = codes @ strides
+
+        probability = np.full(n_cells, np.nan)
+        is_dropout = np.zeros(n_cells, dtype=bool)
+        confidence = np.full(n_cells, np.nan)
+        filled = np.zeros(n_cells, dtype=bool)
+
+        probability[cells] = [p['dropout_probability'] for p in preds]
+        is_dropout[cells] = [p['predicted_class'] == "Dropout" for p in preds]
+        confidence[cells] = [p['model_confidence'] for p in preds]
+        filled[cells] = True
+
+        return cls(value_codes, strides, probability, is_dropout, confidence, filled)
+
+    def _cell(self, features: Sequence[float]) -> Optional[int]:
+        cell = 0
+        for f, value in enumerate(features):
+            code = self.value_codes[f].get(value)
+            if code is None:
+                return None
+            cell += code * self.strides[f]
+        return cell if self.filled[cell] else None
+
+    def get(self, features: Sequence[float]) -> Optional[dict]:
+        """Prediction for one feature vector, or None if it is outside the table."""
+        if len(features) != len(self.value_codes):
+            return None
+        cell = self._cell(features)
+        if cell is None:
+            return None
+        return self.row(cell)
+
+    def row(self, cell: int) -> dict:
+        """Prediction dict stored in a filled cell."""
+        return {
+            'dropout_probability': float(self.probability[cell]),
+            'predicted_class': "Dropout" if self.is_dropout[cell] else "Non-Dropout",
+            'model_confidence': float(self.confidence[cell])
+        }
+
+    def get_many(self, X: np.ndarray) -> np.ndarray:
+        """Cell index for each row of X, or -1 where the row is not in the table."""
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2 or X.shape[1] != len(self.value_codes):
+            return np.full(X.shape[0] if X.ndim else 0, -1, dtype=np.int64)
+
+        cells = np.zeros(X.shape[0], dtype=np.int64)
+        found = np.ones(X.shape[0], dtype=bool)
+        for f, values in enumerate(self.sorted_values):
+            code = np.minimum(np.searchsorted(values, X[:, f]), len(values) - 1)
+            found &= values[code] == X[:, f]
+            cells += code * self.strides[f]
+        found[found] = self.filled[cells[found]]
+        return np.where(found, cells, -1)
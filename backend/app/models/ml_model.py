@@ -1,18 +1,318 @@
 # backend/app/models/ml_model.py
 import joblib
+import hashlib
 import os
 import shutil
-from typing import Optional, List, Union
+import time
+from datetime import datetime
+from typing import Callable, Optional, List, Tuple, Union
 import numpy as np
 
 from app.config import settings
+from app.models.compiled_ensemble import CompiledEnsemble
+from app.models.lookup_table import SimplifiedLookupTable
+from app.models.tree_attribution import TreeAttribution
+from app.utils.feature_mapping import FEATURE_ORDER
+
+
+def compute_model_version(model_path: str, scaler_path: str) -> str:
+    """Content-derived version tag, e.g. `model_gb@3fa9c1e2b7d0`.
+
+    Identical files always get the same tag, so a retrained model is a new
+    version even if it is written to the same path.
+    """
+    digest = hashlib.sha256()
+    for path in (model_path, scaler_path):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    return f"{name}@{digest.hexdigest()[:12]}"
+
+
+class ModelVersion:
+    """A loaded model + scaler and everything derived from them.
+
+    Never mutated after construction: a reload builds a new ModelVersion and
+    swaps it in, so a request that captured a version keeps scoring (and
+    recording) with that version even if a reload lands mid-request.
+    """
+
+    def __init__(self, model, scaler, version: str, model_path: str, scaler_path: str,
+                 build_lookup: bool = True):
+        self.model = model
+        self.scaler = scaler
+        self.version = version
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.loaded_at = datetime.utcnow()
+        self.compiled = self._compile(model, scaler)
+        self.attribution = self._build_attribution(model)
+        # Built per version so the table always reflects the model that serves it
+        self.lookup = self._build_lookup() if build_lookup else None
+
+    @staticmethod
+    def check_compatible(model, scaler):
+        """Raise ValueError if the pair does not take FEATURE_ORDER as input."""
+        n_features = len(FEATURE_ORDER)
+        if not hasattr(model, 'predict_proba'):
+            raise ValueError("model has no predict_proba")
+        for name, obj in (('model', model), ('scaler', scaler)):
+            expected = getattr(obj, 'n_features_in_', n_features)
+            if expected != n_features:
+                raise ValueError(f"{name} expects {expected} features, FEATURE_ORDER has {n_features}")
+
+    def validate(self):
+        """Raise ValueError if this version cannot serve predictions.
+
+        The warm-up doubles as a smoke test: a few rows go through every
+        scoring path before the version is allowed to go live.
+        """
+        sample = np.array([
+            [5, 5, 0, 0, 25, 1, 1, 2],
+            [45, 40, 1, 1, 19, 0, 0, 1],
+            [30, 30, 0, 0, 20, 1, 1, 1],
+        ], dtype=float)
+        probs = self.model.predict_proba(self.scaler.transform(sample))
+        if self.compiled is not None and not np.allclose(self.compiled.predict_proba(sample), probs, atol=1e-9):
+            # Runs before the version is published, so it is still safe to change
+            print("Compiled evaluator disagrees with sklearn, using sklearn predict_proba")
+            self.compiled = None
+            self.attribution = None
+            self.lookup = self._build_lookup() if self.lookup is not None else None
+        if self.attribution is not None:
+            base_value, contributions = self.attribution.contributions(sample)
+            if not np.allclose(base_value + contributions.sum(axis=1), self.compiled.raw_margin(sample), atol=1e-9):
+                print("Feature attributions do not add up to the model output, disabling explanations")
+                self.attribution = None
+        if probs.ndim != 2 or probs.shape[0] != len(sample) or not np.all(np.isfinite(probs)):
+            raise ValueError("model returned invalid probabilities")
+        if np.any((probs < 0) | (probs > 1)):
+            raise ValueError("model probabilities out of range")
+        if self.predict_batch(sample) is None:
+            raise ValueError("batch prediction failed")
+
+    def info(self) -> dict:
+        return {
+            'version': self.version,
+            'model_path': self.model_path,
+            'scaler_path': self.scaler_path,
+            'loaded_at': self.loaded_at.isoformat(),
+            'compiled': self.compiled is not None,
+            'attribution': self.attribution is not None,
+            'lookup_table_size': self.lookup.size if self.lookup is not None else 0,
+        }
+
+    def _prepare_features(self, features: Union[List[float], np.ndarray]) -> np.ndarray:
+        """Ensure features are a 2D NumPy array in the shape (1, n_features)."""
+        arr = np.array(features, dtype=float)
+        if arr.ndim == 1:
+            arr = arr.reshape(1, -1)
+        return arr
+
+    def _compile(self, model, scaler) -> Optional[CompiledEnsemble]:
+        """Flatten the ensemble for fast scoring; falls back to sklearn if unsupported."""
+        try:
+            compiled = CompiledEnsemble.from_sklearn(model, scaler)
+            if compiled is None:
+                print("Compiled evaluator not supported for this model, using sklearn predict_proba")
+            return compiled
+        except Exception as e:
+            print(f"Failed to compile model, using sklearn predict_proba: {e}")
+            return None
+
+    def _build_attribution(self, model) -> Optional[TreeAttribution]:
+        """Precompute per-leaf TreeSHAP structures; needs the compiled evaluator."""
+        if self.compiled is None:
+            return None
+        try:
+            return TreeAttribution.from_sklearn(model, self.compiled)
+        except Exception as e:
+            print(f"Failed to build feature attribution, explanations disabled: {e}")
+            return None
+
+    def _build_lookup(self) -> Optional[SimplifiedLookupTable]:
+        """Score every reachable simplified-form feature vector for O(1) lookups."""
+        try:
+            started = time.perf_counter()
+            table = SimplifiedLookupTable.build(
+                lambda X: self._format_predictions(self._predict_proba(X, per_request=True))
+            )
+            print(f"Prediction lookup table built: {table.size} feature vectors "
+                  f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+            return table
+        except Exception as e:
+            print(f"Failed to build prediction lookup table, using live inference: {e}")
+            return None
+
+    def _positive_class_index(self, n_columns: int) -> int:
+        """Column of `predict_proba` output holding the Dropout (class 1) probability."""
+        if hasattr(self.model, 'classes_'):
+            classes = list(self.model.classes_)
+            if 1 in classes:
+                return classes.index(1)
+            elif 'Dropout' in classes:
+                return classes.index('Dropout')
+        # Fallback: assume second column is positive class
+        return 1 if n_columns > 1 else 0
+
+    def _predict_proba(self, X: np.ndarray, per_request: bool = False) -> np.ndarray:
+        """Class probabilities for an unscaled (N, n_features) matrix.
+
+        Small batches (the per-request case) use the compiled evaluator, which
+        skips sklearn's validation overhead; large batches are faster in
+        sklearn's Cython tree walk. `per_request=True` forces the evaluator
+        single predictions use, so precomputed results match them exactly.
+        """
+        if self.compiled is not None and (per_request or X.shape[0] <= settings.compiled_max_rows):
+            return self.compiled.predict_proba(X)
+        return self.model.predict_proba(self.scaler.transform(X))
+
+    def _prediction_columns(self, probs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(dropout_probability, is_dropout, model_confidence) arrays for an (N, n_classes) matrix.
+
+        The class is derived from the probabilities the same way `model.predict`
+        does (raw score >= 0 for binary, argmax otherwise), so no second model
+        call is needed.
+        """
+        pos_idx = self._positive_class_index(probs.shape[1])
+        if probs.shape[1] == 2:
+            predicted = (probs[:, 1] >= 0.5).astype(int)
+        else:
+            predicted = probs.argmax(axis=1)
+        classes = list(getattr(self.model, 'classes_', range(probs.shape[1])))
+        # Explicitly map prediction to Dropout/Non-Dropout
+        dropout_classes = np.array([label == 1 or label == 'Dropout' for label in classes])
+        return probs[:, pos_idx], dropout_classes[predicted], probs.max(axis=1)
+
+    def _format_predictions(self, probs: np.ndarray) -> List[dict]:
+        """Turn an (N, n_classes) probability matrix into per-row prediction dicts."""
+        dropout_probability, is_dropout, confidence = self._prediction_columns(probs)
+        return [
+            {
+                'dropout_probability': p,
+                'predicted_class': "Dropout" if d else "Non-Dropout",
+                'model_confidence': c
+            }
+            for p, d, c in zip(dropout_probability.tolist(), is_dropout.tolist(), confidence.tolist())
+        ]
+
+    def predict(self, features: Union[List[float], np.ndarray]) -> Optional[dict]:
+        """Make prediction using this model version.
+
+        Returns dict with keys: `dropout_probability` (float 0-1), `predicted_class` ("Dropout"/"Non-Dropout"), and `model_confidence` (float).
+        """
+        if self.lookup is not None:
+            hit = self.lookup.get(features)
+            if hit is not None:
+                return hit
+
+        try:
+            X = self._prepare_features(features)
+            return self._format_predictions(self._predict_proba(X))[0]
+        except Exception as e:
+            print(f"Prediction error: {e}")
+            return None
+
+    def predict_batch(self, features: Union[List[List[float]], np.ndarray]) -> Optional[List[dict]]:
+        """Score an (N, n_features) matrix in a single vectorised model pass.
+
+        Returns one dict per row with the same keys as `predict`, or None if the
+        batch could not be scored.
+        """
+        # Checked before the reshape below, which would turn [] into one empty row
+        if len(features) == 0:
+            return []
+        try:
+            X = np.asarray(features, dtype=float)
+            if X.ndim == 1:
+                X = X.reshape(1, -1)
+            if self.lookup is None:
+                return self._format_predictions(self._predict_proba(X))
+
+            # Table hits are answered directly; only the misses reach the model
+            cells = self.lookup.get_many(X)
+            results = [self.lookup.row(cell) if cell >= 0 else None for cell in cells.tolist()]
+            miss = np.flatnonzero(cells < 0)
+            if miss.size:
+                for i, pred in zip(miss.tolist(), self._format_predictions(self._predict_proba(X[miss]))):
+                    results[i] = pred
+            return results
+        except Exception as e:
+            print(f"Batch prediction error: {e}")
+            return None
+
+    def predict_arrays(self, features: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Columnar `predict_batch` for bulk scoring: no per-row dicts are created.
+
+        Returns `(dropout_probability, is_dropout, model_confidence)` arrays,
+        or None if the matrix could not be scored. The lookup table is not
+        consulted; bulk matrices rarely come from the simplified form.
+        """
+        try:
+            X = np.asarray(features, dtype=float)
+            if X.shape[0] == 0:
+                return np.zeros(0), np.zeros(0, dtype=bool), np.zeros(0)
+            return self._prediction_columns(self._predict_proba(X))
+        except Exception as e:
+            print(f"Bulk prediction error: {e}")
+            return None
+
+    def explain(self, features: Union[List[List[float]], np.ndarray]) -> Optional[Tuple[float, np.ndarray]]:
+        """Per-feature contributions to the Dropout log-odds (exact path-dependent TreeSHAP).
+
+        Returns `(base_value, contributions)` with contributions shaped
+        (N, len(FEATURE_ORDER)); `base_value + contributions.sum(axis=1)` is
+        each row's log-odds. None if attribution is unavailable for this
+        version or the rows could not be explained.
+        """
+        if self.attribution is None:
+            return None
+        try:
+            X = np.asarray(features, dtype=float)
+            if X.ndim == 1:
+                X = X.reshape(1, -1)
+            base_value, contributions = self.attribution.contributions(X)
+            # The ensemble's log-odds are for classes_[1]; flip them if Dropout is classes_[0]
+            if self._positive_class_index(2) == 0:
+                return -base_value, -contributions
+            return base_value, contributions
+        except Exception as e:
+            print(f"Feature attribution error: {e}")
+            return None
 
 
 class MLModel:
+    """Holds the active ModelVersion and swaps it atomically on reload."""
+
     def __init__(self):
-        self.model = None
-        self.scaler = None
-        self.is_loaded = False
+        self.active: Optional[ModelVersion] = None
+        self.previous_version: Optional[str] = None
+        self._activation_listeners: List[Callable[[ModelVersion], None]] = []
+
+    def add_activation_listener(self, listener: Callable[[ModelVersion], None]):
+        """Call `listener(version)` whenever a new version becomes active (e.g. to drop caches)."""
+        self._activation_listeners.append(listener)
+
+    def current(self) -> Optional[ModelVersion]:
+        """Snapshot of the active version; hold on to it for the whole request."""
+        return self.active
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.active is not None
+
+    @property
+    def model(self):
+        return self.active.model if self.active is not None else None
+
+    @property
+    def scaler(self):
+        return self.active.scaler if self.active is not None else None
+
+    @property
+    def lookup(self) -> Optional[SimplifiedLookupTable]:
+        return self.active.lookup if self.active is not None else None
 
     def archive_legacy_files(self, legacy_paths: List[str]):
         """Move legacy model/scaler files to the archived_models_dir and rename them with DEPRECATED tag."""
@@ -37,18 +337,42 @@ class MLModel:
             except Exception as e:
                 print(f"Failed to archive {path}: {e}")
 
-    def load_model(self, model_path: str, scaler_path: str) -> bool:
+    @staticmethod
+    def build_version(model_path: str, scaler_path: str, build_lookup: bool = True) -> ModelVersion:
+        """Load, validate and warm up a model/scaler pair without touching the active version.
+
+        Raises on any failure so callers can keep serving the current version.
+        """
+        if not (os.path.exists(model_path) and os.path.exists(scaler_path)):
+            raise FileNotFoundError(f"Model files not found at {model_path} or {scaler_path}")
+
+        version_tag = compute_model_version(model_path, scaler_path)
+        model = joblib.load(model_path)
+        scaler = joblib.load(scaler_path)
+        ModelVersion.check_compatible(model, scaler)
+        version = ModelVersion(model, scaler, version_tag, model_path, scaler_path, build_lookup=build_lookup)
+        version.validate()
+        return version
+
+    def activate(self, version: ModelVersion):
+        """Atomically make `version` the one new requests use."""
+        previous = self.active
+        self.active = version
+        self.previous_version = previous.version if previous is not None else None
+        print(f"Model version {version.version} active"
+              + (f" (replaced {previous.version})" if previous is not None else ""))
+        for listener in self._activation_listeners:
+            try:
+                listener(version)
+            except Exception as e:
+                print(f"Model activation listener failed: {e}")
+
+    def load_model(self, model_path: str, scaler_path: str, build_lookup: bool = True) -> bool:
         """Load the trained model and scaler from provided paths."""
         try:
             if os.path.exists(model_path) and os.path.exists(scaler_path):
-                try:
-                    self.model = joblib.load(model_path)
-                except Exception as e:
-                    print(f"Error loading model: {e}")
-                    raise
-
-                self.scaler = joblib.load(scaler_path)
-                self.is_loaded = True
+                version = self.build_version(model_path, scaler_path, build_lookup=build_lookup)
+                self.activate(version)
                 print(f"Model loaded successfully from {model_path}")
                 return True
             else:
@@ -60,53 +384,15 @@ class MLModel:
             traceback.print_exc()
             return False
 
-    def _prepare_features(self, features: Union[List[float], np.ndarray]) -> np.ndarray:
-        """Ensure features are a 2D NumPy array in the shape (1, n_features)."""
-        arr = np.array(features)
-        if arr.ndim == 1:
-            arr = arr.reshape(1, -1)
-        return arr
-
     def predict(self, features: Union[List[float], np.ndarray]) -> Optional[dict]:
-        """Make prediction using the loaded model.
-
-        Returns dict with keys: `dropout_probability` (float 0-1), `predicted_class` ("Dropout"/"Non-Dropout"), and `model_confidence` (float).
-        """
-        if not self.is_loaded:
-            return None
+        """Predict with the active version (see `ModelVersion.predict`)."""
+        version = self.active
+        return version.predict(features) if version is not None else None
 
-        try:
-            X = self._prepare_features(features)
-            X_scaled = self.scaler.transform(X)
-            probs = self.model.predict_proba(X_scaled)[0]
-            # Assuming class 1 is Dropout
-            # Determine index of positive class (1) if classes_ not ordered
-            if hasattr(self.model, 'classes_'):
-                classes = list(self.model.classes_)
-                if 1 in classes:
-                    pos_idx = classes.index(1)
-                elif 'Dropout' in classes:
-                    pos_idx = classes.index('Dropout')
-                else:
-                    # Fallback: assume second column is positive class
-                    pos_idx = 1 if len(probs) > 1 else 0
-            else:
-                pos_idx = 1 if len(probs) > 1 else 0
-
-            dropout_probability = float(probs[pos_idx])
-            predicted_index = int(self.model.predict(X_scaled)[0])
-            # Explicitly map prediction to Dropout/Non-Dropout
-            predicted_class = "Dropout" if predicted_index == 1 else "Non-Dropout"
-            model_confidence = float(max(probs))
-
-            return {
-                'dropout_probability': dropout_probability,
-                'predicted_class': predicted_class,
-                'model_confidence': model_confidence
-            }
-        except Exception as e:
-            print(f"Prediction error: {e}")
-            return None
+    def predict_batch(self, features: Union[List[List[float]], np.ndarray]) -> Optional[List[dict]]:
+        """Batch predict with the active version (see `ModelVersion.predict_batch`)."""
+        version = self.active
+        return version.predict_batch(features) if version is not None else None
 
 
 # Global model instance
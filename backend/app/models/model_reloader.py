@@ -0,0 +1,138 @@
+# backend/app/models/model_reloader.py
+"""Hot model reload without restarting the API.
+
+A reload loads, validates and warms up the new model/scaler pair in a
+background thread while the current version keeps serving. Only when the
+new version is fully ready (lookup table built, process workers started)
+is it swapped in with a single reference assignment; requests already in
+flight finish on the version they captured. A failed reload leaves the
+current version active.
+
+Reloads always read the configured `settings.model_path` /
+`settings.scaler_path` and are triggered by POST /admin/model/reload or,
+when `settings.model_watch_interval_seconds` > 0, by a watcher that polls
+those files' mtime and size.
+"""
+import asyncio
+import os
+from datetime import datetime
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.models.ml_model import MLModel, ModelVersion, compute_model_version, ml_model
+from app.models.executor import InferenceExecutor, inference_executor
+
+
+def _file_signature(model_path: str, scaler_path: str) -> Optional[Tuple]:
+    """(mtime_ns, size) of both files, or None if either is missing."""
+    try:
+        return tuple((st.st_mtime_ns, st.st_size) for st in map(os.stat, (model_path, scaler_path)))
+    except OSError:
+        return None
+
+
+class ModelReloader:
+    def __init__(self, model: MLModel, executor: InferenceExecutor, watch_interval: float):
+        self.model = model
+        self.executor = executor
+        self.watch_interval = watch_interval
+        self._lock: Optional[asyncio.Lock] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._loaded_signature: Optional[Tuple] = None
+
+        self.reload_count = 0
+        self.last_error: Optional[str] = None
+        self.last_reload_at: Optional[datetime] = None
+
+    def _paths(self) -> Tuple[str, str]:
+        return settings.model_path, settings.scaler_path
+
+    async def reload(self) -> Tuple[ModelVersion, bool]:
+        """Load and swap in the configured model files.
+
+        Returns (active version, whether it changed). Identical files are a
+        no-op: their content hash is compared with the active version before
+        anything is built. Raises if the new files cannot be loaded or fail
+        validation, in which case the previous version stays active.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            model_path, scaler_path = self._paths()
+            signature = _file_signature(model_path, scaler_path)
+            loop = asyncio.get_running_loop()
+            current = self.model.current()
+            try:
+                if current is not None:
+                    tag = await loop.run_in_executor(None, compute_model_version, model_path, scaler_path)
+                    if tag == current.version:
+                        self._loaded_signature = signature
+                        self.last_error = None
+                        return current, False
+                version = await loop.run_in_executor(None, MLModel.build_version, model_path, scaler_path)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                # Remember the bad files so the watcher does not retry them every poll
+                self._loaded_signature = signature
+                print(f"[ERROR] Model reload from {model_path} failed, keeping current version: {e}")
+                raise
+
+            self._loaded_signature = signature
+            self.last_error = None
+            await loop.run_in_executor(None, self.executor.prepare, version)
+            self.model.activate(version)
+            self.executor.retire(version)
+            if current is not None:
+                self.reload_count += 1
+                self.last_reload_at = datetime.utcnow()
+            return version, True
+
+    def start_watcher(self):
+        """Start polling the active model files (no-op if the interval is 0)."""
+        if self.watch_interval <= 0 or self._watcher is not None:
+            return
+        self._loaded_signature = _file_signature(*self._paths())
+        self._watcher = asyncio.create_task(self._watch())
+        print(f"[OK] Watching model files for changes every {self.watch_interval}s")
+
+    async def stop_watcher(self):
+        if self._watcher is None:
+            return
+        self._watcher.cancel()
+        try:
+            await self._watcher
+        except asyncio.CancelledError:
+            pass
+        self._watcher = None
+
+    async def _watch(self):
+        seen = self._loaded_signature
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            signature = _file_signature(*self._paths())
+            # Reload only once the files have stopped changing for a full
+            # interval, so a model that is still being written is not picked up
+            stable = signature == seen
+            seen = signature
+            if signature is None or not stable or signature == self._loaded_signature:
+                continue
+            print("Model files changed on disk, reloading")
+            try:
+                await self.reload()
+            except Exception:
+                pass
+
+    def info(self) -> dict:
+        current = self.model.current()
+        info = current.info() if current is not None else {}
+        info.update({
+            'previous_version': self.model.previous_version,
+            'reload_count': self.reload_count,
+            'last_error': self.last_error,
+            'watching': self._watcher is not None and not self._watcher.done(),
+        })
+        return info
+
+
+# Global reloader instance
+model_reloader = ModelReloader(ml_model, inference_executor, settings.model_watch_interval_seconds)
@@ -0,0 +1,198 @@
+# backend/app/models/prediction_writer.py
+"""Write-behind persistence of predictions.
+
+Prediction endpoints hand each result to `record_prediction`. With the
+writer running, that is a put on a bounded in-memory queue and the request
+returns without touching the database; a background task drains the queue
+and stores up to `batch_max_size` predictions per transaction with
+`save_predictions`. Rows keep the time the request was served as
+`created_at`, so dashboards see the same timestamps as with synchronous
+writes, only a flush interval later.
+
+When the queue is full the `overflow` policy applies:
+  - "block": the request waits for room (no prediction is lost)
+  - "drop": the prediction is not stored and counted as dropped
+On shutdown everything still queued is written before the process exits.
+A batch that fails is retried row by row so one bad row does not lose the
+rest.
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.schemas import PredictionResponse, SimplifiedAssessmentRequest
+from app.repositories.prediction_repository import PredictionRecord, save_prediction, save_predictions
+
+OVERFLOW_POLICIES = ("block", "drop")
+
+
+class PredictionWriter:
+    def __init__(self, queue_max: int, batch_max_size: int, flush_interval_ms: float, overflow: str):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"prediction write overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.queue_max = queue_max
+        self.batch_max_size = batch_max_size
+        self.flush_interval_ms = flush_interval_ms
+        self.overflow = overflow
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.batches = 0
+        self._flush_ms: deque = deque(maxlen=2000)
+        self._lag_ms: deque = deque(maxlen=2000)
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self):
+        """Start the background writer on the running event loop."""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_max)
+        self._worker = asyncio.create_task(self._run())
+        print(f"[OK] Write-behind prediction storage enabled (queue max {self.queue_max}, "
+              f"batch {self.batch_max_size}, overflow {self.overflow})")
+
+    async def stop(self):
+        """Write everything still queued, then stop the worker."""
+        if self._worker is None:
+            return
+        if self.is_running:
+            await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending:
+            await self._write(pending)
+        print(f"[OK] Prediction writer stopped ({self.written} written, {self.failed} failed, "
+              f"{self.dropped} dropped)")
+
+    async def submit(self, record: PredictionRecord):
+        """Queue a prediction for storage; applies the overflow policy when the queue is full."""
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            if self.overflow == "drop":
+                self.dropped += 1
+                return
+            self.blocked += 1
+            await self._queue.put(record)
+        self.submitted += 1
+
+    async def _collect(self) -> List[PredictionRecord]:
+        """Wait for one record, give others the flush interval to arrive, take up to a batch."""
+        batch = [await self._queue.get()]
+        if self._queue.qsize() < self.batch_max_size:
+            await asyncio.sleep(self.flush_interval_ms / 1000)
+        while len(batch) < self.batch_max_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch: List[PredictionRecord]):
+        started = time.perf_counter()
+        try:
+            async with SessionLocal() as db:
+                await save_predictions(db, batch)
+            self.written += len(batch)
+        except Exception as e:
+            print(f"Batched prediction write failed, retrying {len(batch)} rows one by one: {e}")
+            for record in batch:
+                try:
+                    async with SessionLocal() as db:
+                        await save_predictions(db, [record])
+                    self.written += 1
+                except Exception as row_error:
+                    self.failed += 1
+                    print(f"Prediction not stored: {row_error}")
+        finished = time.perf_counter()
+        self.batches += 1
+        self._flush_ms.append((finished - started) * 1000)
+        now = datetime.utcnow()
+        self._lag_ms.append((now - batch[0].created_at).total_seconds() * 1000)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def metrics(self) -> Dict:
+        def percentile(samples, q: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))], 3)
+
+        flush_ms = sorted(self._flush_ms)
+        lag_ms = sorted(self._lag_ms)
+        return {
+            'enabled': self.is_running,
+            'overflow': self.overflow,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'queue_max': self.queue_max,
+            'submitted': self.submitted,
+            'written': self.written,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'blocked': self.blocked,
+            'batches': self.batches,
+            'avg_batch_size': round((self.written + self.failed) / self.batches, 2) if self.batches else 0.0,
+            'flush_ms_p50': percentile(flush_ms, 0.50),
+            'flush_ms_p99': percentile(flush_ms, 0.99),
+            'flush_ms_max': round(flush_ms[-1], 3) if flush_ms else 0.0,
+            # Request served -> row committed, for the oldest row of each batch
+            'lag_ms_p50': percentile(lag_ms, 0.50),
+            'lag_ms_p99': percentile(lag_ms, 0.99),
+        }
+
+
+# Global writer instance; started at startup when write-behind is enabled
+prediction_writer = PredictionWriter(
+    queue_max=settings.prediction_write_queue_max,
+    batch_max_size=settings.prediction_write_batch_max_size,
+    flush_interval_ms=settings.prediction_write_flush_interval_ms,
+    overflow=settings.prediction_write_overflow
+)
+
+
+async def record_prediction(db: AsyncSession, prediction: PredictionResponse,
+                            assessment_input: Optional[SimplifiedAssessmentRequest] = None,
+                            endpoint: str = "simplified", model_version: Optional[str] = None):
+    """Store a served prediction: queued for the writer if it is running, else written now with `db`."""
+    if prediction_writer.is_running:
+        await prediction_writer.submit(PredictionRecord(
+            prediction, assessment_input, endpoint, model_version, datetime.utcnow()
+        ))
+    else:
+        await save_prediction(db, prediction, assessment_input, endpoint=endpoint, model_version=model_version)
+
+
+async def record_predictions(db: AsyncSession, records: List[PredictionRecord]):
+    """`record_prediction` for many results: queued one by one, or written with `db` in one transaction."""
+    if prediction_writer.is_running:
+        for record in records:
+            await prediction_writer.submit(record)
+    elif records:
+        await save_predictions(db, records)
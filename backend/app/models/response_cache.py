@@ -0,0 +1,128 @@
+# backend/app/models/response_cache.py
+"""In-process LRU + TTL cache of /predict/simplified responses.
+
+Identical submissions (retries, demo sessions, common answer combinations)
+skip feature mapping, inference, rule evaluation and response construction:
+the entry holds the PredictionResponse and its JSON bytes, keyed by a
+canonical hash of the validated request plus the model version that
+produced it. Entries are dropped whenever a new model version is activated.
+Callers still record every prediction in the database.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models.ml_model import ModelVersion, ml_model
+from app.models.schemas import PredictionResponse, SimplifiedAssessmentRequest
+from app.utils.json_response import encode_prediction_response
+
+# Version slot for responses produced by the heuristic fallback
+HEURISTIC_VERSION = "heuristic"
+
+
+class CachedResponse:
+    __slots__ = ('response', 'body', 'model_version', 'features', 'pred', 'expires_at')
+
+    def __init__(self, response: PredictionResponse, body: bytes, model_version: Optional[str],
+                 features: Optional[List[float]], pred: Optional[dict], expires_at: float):
+        self.response = response
+        self.body = body                    # pre-encoded JSON response body
+        self.model_version = model_version  # None for heuristic responses
+        self.features = features            # for shadow scoring on a hit
+        self.pred = pred
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    def __init__(self, enabled: bool, max_entries: int, ttl_seconds: float):
+        self.enabled = enabled and max_entries > 0
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, bytes], CachedResponse]" = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(data: SimplifiedAssessmentRequest, version: Optional[ModelVersion],
+            explain: bool = False) -> Tuple[str, bytes]:
+        """Canonical key: hash of the validated request (fields in schema order) + model version.
+
+        List order is kept on purpose: withdrawal reasons are answered in the
+        order given, so reordering them changes the response. Responses with
+        feature attributions (`explain`) are cached separately.
+        """
+        canonical = data.model_dump_json().encode() + (b"|explain" if explain else b"")
+        digest = hashlib.blake2b(canonical, digest_size=16).digest()
+        return (version.version if version is not None else HEURISTIC_VERSION, digest)
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Tuple[str, bytes], response: PredictionResponse, model_version: Optional[str] = None,
+            features: Optional[List[float]] = None, pred: Optional[dict] = None) -> CachedResponse:
+        """Encode `response` once and cache it; returns the entry (cached or not)."""
+        entry = CachedResponse(
+            response, encode_prediction_response(response), model_version, features, pred,
+            time.monotonic() + self.ttl_seconds
+        )
+        # Requests still finishing on a replaced model must not repopulate the cache
+        current = ml_model.current()
+        if not self.enabled or key[0] != (current.version if current is not None else HEURISTIC_VERSION):
+            return entry
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def on_model_activated(self, version: ModelVersion):
+        self.clear()
+
+    def metrics(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
+
+
+# Global response cache instance, emptied whenever the model changes
+response_cache = ResponseCache(
+    enabled=settings.response_cache_enabled,
+    max_entries=settings.response_cache_max_entries,
+    ttl_seconds=settings.response_cache_ttl_seconds
+)
+ml_model.add_activation_listener(response_cache.on_model_activated)
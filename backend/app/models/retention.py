@@ -0,0 +1,236 @@
+# backend/app/models/retention.py
+"""Retention and cold archival of old predictions.
+
+A background job moves predictions made before the cutoff (midnight UTC
+`retention_days` ago) out of the live tables, oldest first, one chunk at
+a time:
+  1. read a chunk with its answers and texts (a read-only transaction)
+  2. append it to the gzipped NDJSON file of each prediction's month,
+     `predictions-YYYY-MM.ndjson.gz`, one JSON object per prediction, and
+     fsync (in a worker thread, off the event loop)
+  3. in one short write transaction, delete the chunk with its child rows
+     and add it to the daily rollups the dashboard reads
+then pauses so request writes get the lock in between. No transaction
+ever spans more than one chunk.
+
+Each chunk is appended as its own gzip member, so a file is valid after
+every chunk and `gzip`/`zcat` read it whole. Archival is at-least-once: a
+process that stops between steps 2 and 3 archives that chunk again on the
+next pass, so `read_archive` skips repeated prediction ids.
+
+Windowed dashboard queries (trends, risk factor trends, cohorts) read live
+rows only, hence the minimum retention.
+"""
+import asyncio
+import gzip
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+import orjson
+
+from app.config import settings
+from app.database import SessionLocal
+from app.repositories.retention_repository import ExpiredPrediction, fetch_expired, remove_archived
+
+# Longest window a dashboard query reads from live rows (the 8-week trend chart), plus a day
+MIN_RETENTION_DAYS = 8 * 7 + 1
+
+ARCHIVE_PATTERN = "predictions-{month}.ndjson.gz"
+
+
+def read_archive(path: str) -> Iterator[Dict]:
+    """The predictions in an archive file, each once."""
+    seen = set()
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            record = orjson.loads(line)
+            if record['id'] not in seen:
+                seen.add(record['id'])
+                yield record
+
+
+class RetentionJob:
+    def __init__(self, retention_days: int, archive_dir: str, chunk_size: int, chunk_pause_ms: float,
+                 interval_seconds: float, session_factory=SessionLocal):
+        self.retention_days = retention_days
+        self.archive_dir = archive_dir
+        self.chunk_size = chunk_size
+        self.chunk_pause_ms = chunk_pause_ms
+        self.interval_seconds = interval_seconds
+        self.session_factory = session_factory
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._pass_lock = asyncio.Lock()
+
+        # Metrics
+        self.runs = 0
+        self.failed_runs = 0
+        self.archived = 0
+        self.chunks = 0
+        self.contended_chunks = 0
+        self.archive_bytes_written = 0
+        self.last_run: Dict = {}
+        self._delete_ms: deque = deque(maxlen=2000)
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def check_retention_days(self):
+        """Raise ValueError if the retention period would archive rows the dashboard still reads.
+
+        Checked when the job is used rather than built, so a setting for a
+        disabled job cannot stop the API from starting.
+        """
+        if self.retention_days < MIN_RETENTION_DAYS:
+            raise ValueError(f"retention_days must be at least {MIN_RETENTION_DAYS}, got {self.retention_days}")
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """Predictions made before this moment are archived."""
+        day = (now or datetime.utcnow()) - timedelta(days=self.retention_days)
+        return day.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def start(self):
+        """Start periodic retention passes on the running event loop."""
+        if self.is_running:
+            return
+        try:
+            self.check_retention_days()
+        except ValueError as e:
+            print(f"[ERROR] Prediction retention disabled: {e}")
+            return
+        self._stopping.clear()
+        self._worker = asyncio.create_task(self._run())
+        print(f"[OK] Prediction retention enabled (archiving after {self.retention_days} days "
+              f"to {self.archive_dir}, every {self.interval_seconds:.0f}s)")
+
+    async def stop(self):
+        """Stop after the chunk in progress."""
+        if self._worker is None:
+            return
+        self._stopping.set()
+        await self._worker
+        self._worker = None
+        print(f"[OK] Retention stopped ({self.archived} predictions archived)")
+
+    def _append(self, expired: List[ExpiredPrediction]) -> List[str]:
+        """Append a chunk to its monthly archive files and make it durable; returns the files touched."""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        by_month: Dict[str, List[bytes]] = {}
+        for e in expired:
+            by_month.setdefault(e.created_at.strftime("%Y-%m"), []).append(orjson.dumps(e.record) + b"\n")
+        paths = []
+        for month, lines in sorted(by_month.items()):
+            path = os.path.join(self.archive_dir, ARCHIVE_PATTERN.format(month=month))
+            with open(path, "ab") as raw:
+                start = raw.tell()
+                with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+                    archive.write(b"".join(lines))
+                raw.flush()
+                os.fsync(raw.fileno())
+                self.archive_bytes_written += raw.tell() - start
+            paths.append(path)
+        return paths
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict:
+        """Archive everything older than the cutoff, chunk by chunk; returns what this pass did."""
+        self.check_retention_days()
+        async with self._pass_lock:
+            loop = asyncio.get_running_loop()
+            cutoff = self.cutoff(now)
+            started = time.perf_counter()
+            archived = chunks = contended = 0
+            files = set()
+            try:
+                while not self._stopping.is_set():
+                    async with self.session_factory() as db:
+                        expired = await fetch_expired(db, cutoff, self.chunk_size)
+                    if not expired:
+                        break
+                    files.update(await loop.run_in_executor(None, self._append, expired))
+
+                    delete_started = time.perf_counter()
+                    async with self.session_factory() as db:
+                        claimed = await remove_archived(db, expired)
+                    self._delete_ms.append((time.perf_counter() - delete_started) * 1000)
+                    chunks += 1
+                    if not claimed:
+                        # Another process is archiving the same rows; leave the rest to it
+                        contended += 1
+                        break
+                    archived += len(expired)
+                    await asyncio.sleep(self.chunk_pause_ms / 1000)
+            finally:
+                self.runs += 1
+                self.archived += archived
+                self.chunks += chunks
+                self.contended_chunks += contended
+                self.last_run = {
+                    'finished_at': datetime.utcnow().isoformat(),
+                    'cutoff': cutoff.isoformat(),
+                    'archived': archived,
+                    'chunks': chunks,
+                    'contended_chunks': contended,
+                    'files': sorted(files),
+                    'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+                }
+            if archived:
+                print(f"[OK] Archived {archived} predictions made before {cutoff:%Y-%m-%d} "
+                      f"in {chunks} chunks to {len(files)} file(s)")
+            return self.last_run
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.failed_runs += 1
+                print(f"Retention pass failed, retrying next interval: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def metrics(self) -> Dict:
+        def percentile(samples, q: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))], 3)
+
+        delete_ms = sorted(self._delete_ms)
+        files = []
+        if os.path.isdir(self.archive_dir):
+            files = [os.path.join(self.archive_dir, name) for name in os.listdir(self.archive_dir)
+                     if name.startswith("predictions-") and name.endswith(".ndjson.gz")]
+        return {
+            'enabled': self.is_running,
+            'retention_days': self.retention_days,
+            'cutoff': self.cutoff().isoformat(),
+            'archive_dir': self.archive_dir,
+            'archive_files': len(files),
+            'archive_bytes': sum(os.path.getsize(path) for path in files),
+            'runs': self.runs,
+            'failed_runs': self.failed_runs,
+            'archived': self.archived,
+            'chunks': self.chunks,
+            'contended_chunks': self.contended_chunks,
+            'archive_bytes_written': self.archive_bytes_written,
+            # Write transaction per chunk: delete + rollups (the only lock retention holds)
+            'delete_ms_p50': percentile(delete_ms, 0.50),
+            'delete_ms_p99': percentile(delete_ms, 0.99),
+            'delete_ms_max': round(delete_ms[-1], 3) if delete_ms else 0.0,
+            'last_run': self.last_run,
+        }
+
+
+# Global job; started at startup when retention is enabled
+retention_job = RetentionJob(
+    retention_days=settings.retention_days,
+    archive_dir=settings.retention_archive_dir,
+    chunk_size=settings.retention_chunk_size,
+    chunk_pause_ms=settings.retention_chunk_pause_ms,
+    interval_seconds=settings.retention_interval_seconds
+)
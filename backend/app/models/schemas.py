@@ -1,6 +1,6 @@
 # backend/app/models/schemas.py
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Optional, Union
 
 class SimplifiedAssessmentRequest(BaseModel):
     # Consent
@@ -42,18 +42,33 @@ class RawFeaturesRequest(BaseModel):
         features: dict
 
 class RiskFactor(BaseModel):
+    # Frozen: rule fragments are prebuilt once and shared between responses
+    model_config = ConfigDict(frozen=True)
+
     category: str
     factor: str
     impact: str
     description: str
 
 class Recommendation(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     type: str
     title: str
     description: str
     urgency: str
     contact: Optional[str] = None
 
+class FeatureAttribution(BaseModel):
+    """Per-feature contributions to the Dropout log-odds (path-dependent TreeSHAP).
+
+    `base_value` plus the sum of `contributions` (keyed by model feature
+    name) equals the model's log-odds for this prediction.
+    """
+    base_value: float
+    contributions: Dict[str, float]
+
+
 class PredictionResponse(BaseModel):
     risk_level: str
     risk_score: int
@@ -62,6 +77,72 @@ class PredictionResponse(BaseModel):
     risk_factors: List[RiskFactor]
     recommendations: List[Recommendation]
     prediction_confidence: float
+    # Only filled when the caller asks for it (explain=true) and the ML model scored the request
+    feature_attribution: Optional[FeatureAttribution] = None
+
+class BatchAssessmentRequest(BaseModel):
+    """A cohort of simplified assessments scored in one request.
+
+    Rows are validated individually so one malformed assessment does not
+    reject the whole batch.
+    """
+    assessments: List[dict]
+
+
+class BatchPredictionItem(BaseModel):
+    index: int
+    result: Optional[PredictionResponse] = None
+    error: Optional[str] = None
+
+
+class BatchPredictionResponse(BaseModel):
+    results: List[BatchPredictionItem]
+    total: int
+    succeeded: int
+    failed: int
+    ml_model_used: bool
+    inference_ms: float
+    elapsed_ms: float
+
+
+class RawBulkPredictionResponse(BaseModel):
+    """Columnar result of /predict/raw/bulk: one array entry per input row."""
+    model_config = ConfigDict(protected_namespaces=())
+
+    n: int
+    model_version: str
+    dropout_probability: List[float]
+    predicted_class: List[str]
+    model_confidence: List[float]
+    inference_ms: float
+
+
+class WhatIfRequest(BaseModel):
+    """One assessment and which answers to vary (default: every answer the model reads)."""
+    assessment: SimplifiedAssessmentRequest
+    fields: Optional[List[str]] = None
+    pairwise: bool = False
+    top_k: Optional[int] = Field(default=None, ge=1)
+
+
+class WhatIfOption(BaseModel):
+    changes: Dict[str, Union[str, int]]
+    dropout_probability: float
+    delta: float
+    risk_level: str
+
+
+class WhatIfResponse(BaseModel):
+    """Options ranked by probability change, largest reduction first."""
+    model_config = ConfigDict(protected_namespaces=())
+
+    baseline_probability: float
+    baseline_risk_level: str
+    model_version: str
+    scored: int
+    options: List[WhatIfOption]
+    elapsed_ms: float
+
 
 class HealthResponse(BaseModel):
     status: str
@@ -69,6 +150,15 @@ class HealthResponse(BaseModel):
     ml_model_loaded: bool
 
 
+class ReadinessResponse(BaseModel):
+    ready: bool
+    database_ready: bool
+    ml_model_loaded: bool
+    ml_model_version: Optional[str] = None
+    startup_ms: Optional[float] = None
+    phases_ms: Dict[str, float] = {}
+
+
 # ============================================================================
 # Admin Dashboard Response Schemas
 # ============================================================================
@@ -122,3 +212,61 @@ class RiskDistributionResponse(BaseModel):
     high: int
     medium: int
     low: int
+
+
+class CohortStatsResponse(DashboardStatsResponse):
+    """Dashboard statistics restricted to the assessments matching `filters`."""
+    filters: Dict[str, Union[List[str], bool]]
+
+
+class RuntimeMetricsResponse(BaseModel):
+    """Live performance counters for tuning the serving path."""
+    inference_queue: dict
+    executor: dict
+    shadow: dict = {}
+    response_cache: dict = {}
+    csv_uploads: dict = {}
+    prediction_writes: dict = {}
+    database: dict = {}
+    retention: dict = {}
+
+
+class RetentionRunResponse(BaseModel):
+    """What one retention pass moved to the cold archive."""
+    finished_at: str
+    cutoff: str
+    archived: int
+    chunks: int
+    contended_chunks: int
+    files: List[str]
+    elapsed_ms: float
+
+
+class ModelVersionResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    version: Optional[str] = None
+    model_path: Optional[str] = None
+    scaler_path: Optional[str] = None
+    loaded_at: Optional[str] = None
+    compiled: bool = False
+    lookup_table_size: int = 0
+    previous_version: Optional[str] = None
+    reloaded: bool = False
+    reload_count: int = 0
+    last_error: Optional[str] = None
+    watching: bool = False
+
+
+class ShadowLoadRequest(BaseModel):
+    """Candidate model to shadow-score against live traffic (files in the shadow candidates directory)."""
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_path: str
+    scaler_path: str
+
+
+class ShadowReportResponse(BaseModel):
+    """Live shadow counters plus stored totals per (candidate, live) version pair."""
+    current: dict
+    history: List[dict]
@@ -0,0 +1,225 @@
+# backend/app/models/shadow.py
+"""Shadow scoring of a candidate model against live traffic.
+
+After the live model has answered a /predict/simplified request, the
+feature vector and the live result are handed to `ShadowScorer.submit`,
+which only does a non-blocking put on a bounded queue (a full queue drops
+the sample rather than slowing the request). A background task drains the
+queue in batches, scores them with the candidate in a worker thread and
+records agreement, probability deltas and risk-level flips, both in memory
+and as one `shadow_comparisons` row per batch.
+"""
+import asyncio
+import os
+import random
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.ml_model import MLModel, ModelVersion
+from app.repositories.shadow_repository import save_shadow_window
+from app.utils.risk_levels import risk_levels_for_probabilities
+
+# (features, live dropout probability, live predicted class, live version tag)
+ShadowItem = Tuple[List[float], float, str, str]
+
+
+def candidate_file(path: str) -> str:
+    """
+    Resolve a candidate model file requested through the admin API.
+
+    Relative paths are taken from `settings.shadow_candidates_dir`, and the
+    resolved file (symlinks followed) must lie inside it: joblib files can
+    run code when loaded, so arbitrary paths are never loaded. Raises
+    ValueError otherwise.
+    """
+    root = os.path.realpath(settings.shadow_candidates_dir)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Candidate model files must be inside {settings.shadow_candidates_dir}")
+    return resolved
+
+
+class ShadowScorer:
+    def __init__(self, sample_rate: float, queue_max: int, batch_max_size: int, flush_interval_ms: float):
+        self.sample_rate = sample_rate
+        self.queue_max = queue_max
+        self.batch_max_size = batch_max_size
+        self.flush_interval_ms = flush_interval_ms
+        self.candidate: Optional[ModelVersion] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self._reset_stats()
+        self.submitted = 0
+        self.dropped = 0
+        self._submit_us: deque = deque(maxlen=5000)
+
+    def _reset_stats(self):
+        self.compared = 0
+        self.agreements = 0
+        self.flips: Counter = Counter()
+        self.sum_delta = 0.0
+        self.sum_abs_delta = 0.0
+        self.max_abs_delta = 0.0
+        self.batches = 0
+        self.score_ms_total = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def load(self, model_path: str, scaler_path: str) -> ModelVersion:
+        """Load a candidate (off the event loop) and start shadowing traffic with it."""
+        loop = asyncio.get_running_loop()
+        candidate = await loop.run_in_executor(None, MLModel.build_version, model_path, scaler_path)
+        self.candidate = candidate
+        self._reset_stats()
+        if not self.is_running:
+            self._queue = asyncio.Queue(maxsize=self.queue_max)
+            self._worker = asyncio.create_task(self._run())
+        print(f"[OK] Shadow scoring candidate {candidate.version} "
+              f"(sample rate {self.sample_rate}, queue max {self.queue_max})")
+        return candidate
+
+    async def stop(self):
+        """Stop shadowing; samples still queued are compared first."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending and self.candidate is not None:
+            await self._compare(pending)
+
+    async def unload(self):
+        await self.stop()
+        self.candidate = None
+
+    def submit(self, features: List[float], live_pred: dict, live_version: ModelVersion):
+        """Hand a live prediction to the shadow. Never blocks or raises."""
+        started = time.perf_counter()
+        if self._queue is None or self.candidate is None or live_pred is None:
+            return
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        try:
+            self._queue.put_nowait((
+                features, live_pred['dropout_probability'], live_pred['predicted_class'], live_version.version
+            ))
+            self.submitted += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+        self._submit_us.append((time.perf_counter() - started) * 1e6)
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            # Let a batch build up; shadow results are not latency sensitive
+            await asyncio.sleep(self.flush_interval_ms / 1000)
+            while len(batch) < self.batch_max_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._compare(batch)
+            except Exception as e:
+                print(f"Shadow comparison failed: {e}")
+
+    async def _compare(self, batch: List[ShadowItem]):
+        candidate = self.candidate
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        preds = await loop.run_in_executor(None, candidate.predict_batch, [item[0] for item in batch])
+        if preds is None:
+            return
+        self.score_ms_total += (time.perf_counter() - started) * 1000
+
+        # A batch can straddle a live-model reload; compare per live version
+        by_live: Dict[str, List[int]] = {}
+        for i, item in enumerate(batch):
+            by_live.setdefault(item[3], []).append(i)
+
+        for live_version, rows in by_live.items():
+            live_p = np.array([batch[i][1] for i in rows])
+            cand_p = np.array([preds[i]['dropout_probability'] for i in rows])
+            agree = np.array([batch[i][2] == preds[i]['predicted_class'] for i in rows])
+            live_levels = risk_levels_for_probabilities(live_p)
+            cand_levels = risk_levels_for_probabilities(cand_p)
+            flipped = live_levels != cand_levels
+            delta = cand_p - live_p
+
+            window = {
+                'live_version': live_version,
+                'candidate_version': candidate.version,
+                'n': len(rows),
+                'agreements': int(agree.sum()),
+                'risk_level_flips': int(flipped.sum()),
+                'sum_delta': float(delta.sum()),
+                'sum_abs_delta': float(np.abs(delta).sum()),
+                'max_abs_delta': float(np.abs(delta).max()),
+                'flip_counts': dict(Counter(
+                    f"{a}->{b}" for a, b in zip(live_levels[flipped], cand_levels[flipped])
+                )),
+            }
+            if candidate is self.candidate:
+                self.compared += window['n']
+                self.agreements += window['agreements']
+                self.flips.update(window['flip_counts'])
+                self.sum_delta += window['sum_delta']
+                self.sum_abs_delta += window['sum_abs_delta']
+                self.max_abs_delta = max(self.max_abs_delta, window['max_abs_delta'])
+
+            try:
+                async with SessionLocal() as db:
+                    await save_shadow_window(db, window)
+            except Exception as e:
+                print(f"Shadow comparison not stored: {e}")
+        self.batches += 1
+
+    def metrics(self) -> Dict:
+        submit_us = sorted(self._submit_us)
+
+        def percentile(q: float) -> float:
+            if not submit_us:
+                return 0.0
+            return round(submit_us[min(len(submit_us) - 1, int(q * len(submit_us)))], 2)
+
+        n = self.compared
+        return {
+            'enabled': self.candidate is not None and self.is_running,
+            'candidate_version': self.candidate.version if self.candidate is not None else None,
+            'sample_rate': self.sample_rate,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'submitted': self.submitted,
+            'dropped': self.dropped,
+            'compared': n,
+            'batches': self.batches,
+            'agreement_rate': round(self.agreements / n, 4) if n else None,
+            'risk_level_flips': sum(self.flips.values()),
+            'flip_counts': dict(self.flips),
+            'mean_delta': round(self.sum_delta / n, 6) if n else None,
+            'mean_abs_delta': round(self.sum_abs_delta / n, 6) if n else None,
+            'max_abs_delta': round(self.max_abs_delta, 6),
+            # Cost on the request path (submit) vs. off it (candidate scoring)
+            'request_overhead_us_p50': percentile(0.50),
+            'request_overhead_us_p99': percentile(0.99),
+            'request_overhead_us_max': round(submit_us[-1], 2) if submit_us else 0.0,
+            'candidate_score_ms_avg': round(self.score_ms_total / self.batches, 3) if self.batches else 0.0,
+        }
+
+
+# Global shadow scorer instance
+shadow_scorer = ShadowScorer(
+    sample_rate=settings.shadow_sample_rate,
+    queue_max=settings.shadow_queue_max,
+    batch_max_size=settings.shadow_batch_max_size,
+    flush_interval_ms=settings.shadow_flush_interval_ms
+)
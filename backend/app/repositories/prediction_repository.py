@@ -1,107 +1,166 @@
 # backend/app/repositories/prediction_repository.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, case, and_
-from app.database import Prediction, AssessmentInput, RiskFactor, Recommendation
+from sqlalchemy import select, func, case, insert
+from app.database import (
+    Prediction, AssessmentInput, RiskFactor, Recommendation, PredictionRollup, RiskFactorRollup
+)
 from app.models.schemas import PredictionResponse, SimplifiedAssessmentRequest
+from app.utils.assessment_codes import choice_code, decode_choice, encode_assessment, multi_select_bit
+from app.utils.sql_functions import year_week
+from app.repositories.text_catalog import (
+    recommendation_catalog, recommendation_key, risk_factor_catalog, risk_factor_key
+)
 from datetime import datetime, timedelta
-import json
-from typing import Optional, List, Dict
+from typing import NamedTuple, Optional, List, Dict, Tuple
+
+
+class PredictionRecord(NamedTuple):
+    """Everything needed to store one prediction later (see save_predictions)."""
+    prediction: PredictionResponse
+    assessment_input: Optional[SimplifiedAssessmentRequest]
+    endpoint: str
+    model_version: Optional[str]
+    created_at: datetime
+
+
+def _prediction_row(prediction: PredictionResponse, endpoint: str, model_version: Optional[str],
+                    created_at: datetime) -> Dict:
+    return {
+        'risk_level': prediction.risk_level,
+        'risk_score': prediction.risk_score,
+        'dropout_probability': prediction.dropout_probability,
+        'predicted_class': prediction.predicted_class if prediction.predicted_class else None,
+        'prediction_confidence': prediction.prediction_confidence,
+        'endpoint': endpoint,
+        'model_version': model_version,
+        'created_at': created_at,
+    }
+
+
+def _assessment_row(prediction_id: int, assessment_input: SimplifiedAssessmentRequest) -> Dict:
+    return {'prediction_id': prediction_id, **encode_assessment(assessment_input.__dict__)}
+
+
+def _text_row(prediction_id: int, text_id: int) -> Dict:
+    return {'prediction_id': prediction_id, 'text_id': text_id}
 
 
 async def save_prediction(
     db: AsyncSession,
     prediction: PredictionResponse,
     assessment_input: Optional[SimplifiedAssessmentRequest] = None,
-    endpoint: str = "simplified"
+    endpoint: str = "simplified",
+    model_version: Optional[str] = None
 ) -> int:
     """
     Save prediction with all related data in a transaction.
     Returns the prediction ID.
     """
+    record = PredictionRecord(prediction, assessment_input, endpoint, model_version, datetime.utcnow())
+    return (await save_predictions(db, [record]))[0]
+
+
+async def save_predictions(db: AsyncSession, records: List[PredictionRecord]) -> List[int]:
+    """
+    Save many predictions with all related data in one transaction.
+
+    Uses Core INSERTs instead of ORM objects. A batch of N records costs:
+    - ceil(N / settings.db_insert_page_size) multi-row INSERT ... RETURNING
+      statements for the predictions (IDs come back in record order),
+    - one executemany INSERT per child table with rows (assessment inputs,
+      risk factors, recommendations), at most three,
+    - and, only for texts this process has not cached yet, a SELECT, an
+      INSERT and a second SELECT per text catalog (at most six).
+    Risk factors and recommendations are stored as references into the text
+    catalogs. Returns the prediction IDs in record order.
+    """
+    if not records:
+        return []
     try:
-        # 1. Insert prediction
-        new_prediction = Prediction(
-            risk_level=prediction.risk_level,
-            risk_score=prediction.risk_score,
-            dropout_probability=prediction.dropout_probability,
-            predicted_class=prediction.predicted_class if prediction.predicted_class else None,
-            prediction_confidence=prediction.prediction_confidence,
-            endpoint=endpoint,
-            created_at=datetime.utcnow()
+        # 0. Catalog ids of the texts (only texts never seen before touch the database)
+        factor_ids, new_factors = await risk_factor_catalog.resolve(
+            db, {risk_factor_key(f) for r in records for f in r.prediction.risk_factors}
+        )
+        recommendation_ids, new_recommendations = await recommendation_catalog.resolve(
+            db, {recommendation_key(rec) for r in records for rec in r.prediction.recommendations}
         )
-        db.add(new_prediction)
-        await db.flush()  # Get the prediction ID
-
-        prediction_id = new_prediction.id
-
-        # 2. Insert assessment inputs (if provided)
-        if assessment_input:
-            new_assessment = AssessmentInput(
-                prediction_id=prediction_id,
-                consent_given=assessment_input.consent_given,
-                consent_data_processing=assessment_input.consent_data_processing,
-                consent_anonymous_analytics=assessment_input.consent_anonymous_analytics,
-                academic_year=assessment_input.academic_year,
-                attendance=assessment_input.attendance,
-                overwhelm_frequency=assessment_input.overwhelm_frequency,
-                study_hours=assessment_input.study_hours,
-                performance_satisfaction=assessment_input.performance_satisfaction,
-                advisor_interaction=assessment_input.advisor_interaction,
-                support_network_strength=assessment_input.support_network_strength,
-                extracurricular_hours=assessment_input.extracurricular_hours,
-                employment_status=assessment_input.employment_status,
-                financial_stress=assessment_input.financial_stress,
-                career_alignment=assessment_input.career_alignment,
-                services_used=json.dumps(assessment_input.services_used) if assessment_input.services_used else None,
-                withdrawal_considered=assessment_input.withdrawal_considered,
-                withdrawal_reasons=json.dumps(assessment_input.withdrawal_reasons) if assessment_input.withdrawal_reasons else None
-            )
-            db.add(new_assessment)
-
-        # 3. Insert risk factors
-        for risk_factor in prediction.risk_factors:
-            new_risk_factor = RiskFactor(
-                prediction_id=prediction_id,
-                category=risk_factor.category,
-                factor=risk_factor.factor,
-                impact=risk_factor.impact,
-                description=risk_factor.description
-            )
-            db.add(new_risk_factor)
-
-        # 4. Insert recommendations
-        for recommendation in prediction.recommendations:
-            new_recommendation = Recommendation(
-                prediction_id=prediction_id,
-                rec_type=recommendation.type,
-                title=recommendation.title,
-                description=recommendation.description,
-                urgency=recommendation.urgency,
-                contact=recommendation.contact if recommendation.contact else None
-            )
-            db.add(new_recommendation)
+
+        # 1. Insert predictions, getting their IDs back in parameter order
+        table = Prediction.__table__
+        rows = [_prediction_row(r.prediction, r.endpoint, r.model_version, r.created_at) for r in records]
+        if db.get_bind().dialect.name == "sqlite":
+            # SQLAlchemy cannot order SQLite's RETURNING rows in one statement and would
+            # fall back to an INSERT per row. SQLite does not promise RETURNING order, but
+            # it holds the write lock from the first INSERT until commit and gives each
+            # new row of a table without AUTOINCREMENT the rowid max(rowid) + 1, so the
+            # IDs of this batch are consecutive and ascend in insertion (= parameter)
+            # order; sorting them restores it. A gap would mean that reasoning no longer
+            # holds (e.g. rowid reached its maximum and SQLite picked random free ids),
+            # so refuse rather than attach child rows to the wrong predictions.
+            result = await db.execute(insert(table).returning(table.c.id), rows)
+            prediction_ids = sorted(result.scalars())
+            if prediction_ids[-1] - prediction_ids[0] != len(prediction_ids) - 1:
+                raise RuntimeError("SQLite returned non-consecutive prediction IDs for one batch")
+        else:
+            result = await db.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows)
+            prediction_ids = list(result.scalars())
+
+        # 2. Insert assessment inputs (if provided), risk factors and recommendations
+        assessments, risk_factors, recommendations = [], [], []
+        for prediction_id, r in zip(prediction_ids, records):
+            if r.assessment_input:
+                assessments.append(_assessment_row(prediction_id, r.assessment_input))
+            risk_factors.extend(_text_row(prediction_id, factor_ids[risk_factor_key(f)])
+                                for f in r.prediction.risk_factors)
+            recommendations.extend(_text_row(prediction_id, recommendation_ids[recommendation_key(rec)])
+                                   for rec in r.prediction.recommendations)
+        for table, rows in ((AssessmentInput.__table__, assessments),
+                            (RiskFactor.__table__, risk_factors),
+                            (Recommendation.__table__, recommendations)):
+            if rows:
+                await db.execute(insert(table), rows)
 
         # Commit transaction
         await db.commit()
-        return prediction_id
+        risk_factor_catalog.remember(new_factors)
+        recommendation_catalog.remember(new_recommendations)
+        return prediction_ids
 
     except Exception as e:
         await db.rollback()
-        print(f"Error saving prediction: {e}")
+        print(f"Error saving {len(records)} prediction(s): {e}")
         raise
 
 
-async def get_dashboard_stats(db: AsyncSession) -> Dict:
+async def _archived_counts(db: AsyncSession) -> Dict[str, Tuple[int, int]]:
+    """(predictions, risk score sum) per risk level of the predictions moved to the cold archive."""
+    rows = (await db.execute(
+        select(
+            PredictionRollup.risk_level,
+            func.sum(PredictionRollup.predictions).label('count'),
+            func.sum(PredictionRollup.risk_score_sum).label('score_sum')
+        ).group_by(PredictionRollup.risk_level)
+    )).all()
+    return {row.risk_level: (row.count, row.score_sum) for row in rows}
+
+
+async def _risk_stats(db: AsyncSession, assessment_conditions: Optional[List] = None,
+                      include_archived: bool = False) -> Dict:
     """
-    Calculate aggregated dashboard statistics.
+    Risk-level counts, percentages and average score, optionally only for
+    matching assessments or including the archived predictions' rollups.
     """
     query = select(
         func.count(Prediction.id).label('total'),
         func.sum(case((Prediction.risk_level == 'high', 1), else_=0)).label('high_count'),
         func.sum(case((Prediction.risk_level == 'medium', 1), else_=0)).label('medium_count'),
         func.sum(case((Prediction.risk_level == 'low', 1), else_=0)).label('low_count'),
-        func.avg(Prediction.risk_score).label('avg_score')
+        func.sum(Prediction.risk_score).label('score_sum')
     )
+    if assessment_conditions is not None:
+        query = query.join(AssessmentInput, Prediction.id == AssessmentInput.prediction_id).where(
+            *assessment_conditions
+        )
 
     result = await db.execute(query)
     row = result.first()
@@ -110,6 +169,14 @@ async def get_dashboard_stats(db: AsyncSession) -> Dict:
     high = row.high_count or 0
     medium = row.medium_count or 0
     low = row.low_count or 0
+    score_sum = row.score_sum or 0
+    if include_archived:
+        for risk_level, (count, level_score_sum) in (await _archived_counts(db)).items():
+            total += count
+            score_sum += level_score_sum
+            high += count if risk_level == 'high' else 0
+            medium += count if risk_level == 'medium' else 0
+            low += count if risk_level == 'low' else 0
 
     return {
         'total_assessments': total,
@@ -119,25 +186,67 @@ async def get_dashboard_stats(db: AsyncSession) -> Dict:
         'high_risk_percentage': round((high / total * 100) if total > 0 else 0, 2),
         'medium_risk_percentage': round((medium / total * 100) if total > 0 else 0, 2),
         'low_risk_percentage': round((low / total * 100) if total > 0 else 0, 2),
-        'average_risk_score': round(row.avg_score or 0, 1)
+        'average_risk_score': round((score_sum / total) if total > 0 else 0, 1)
     }
 
 
+async def get_dashboard_stats(db: AsyncSession) -> Dict:
+    """
+    Calculate aggregated dashboard statistics, archived predictions included.
+    """
+    return await _risk_stats(db, include_archived=True)
+
+
+async def get_cohort_stats(
+    db: AsyncSession,
+    choices: Optional[Dict[str, List[str]]] = None,
+    services_used: Optional[List[str]] = None,
+    withdrawal_reasons: Optional[List[str]] = None,
+    withdrawal_considered: Optional[bool] = None
+) -> Dict:
+    """
+    Dashboard statistics for the assessments matching every filter, e.g.
+    choices={'employment_status': ['full-time'], 'financial_stress': ['high', 'very-high']}.
+
+    Single-choice filters match any of the listed answers; services_used and
+    withdrawal_reasons match assessments that selected all listed entries.
+    Filters compare answer codes and bitmasks, never strings or JSON.
+    Covers live predictions only: archived answers are in the archive files.
+    Raises ValueError for answers outside the vocabularies.
+    """
+    conditions = []
+    for field, values in (choices or {}).items():
+        codes = [choice_code(field, value) for value in values]
+        column = getattr(AssessmentInput, field)
+        conditions.append(column == codes[0] if len(codes) == 1 else column.in_(codes))
+    for field, values in (('services_used', services_used), ('withdrawal_reasons', withdrawal_reasons)):
+        mask = 0
+        for value in values or []:
+            mask |= multi_select_bit(field, value)
+        if mask:
+            conditions.append(getattr(AssessmentInput, field).op('&')(mask) == mask)
+    if withdrawal_considered is not None:
+        conditions.append(AssessmentInput.withdrawal_considered == withdrawal_considered)
+
+    return await _risk_stats(db, conditions)
+
+
 async def get_risk_trends(db: AsyncSession, weeks: int = 8) -> List[Dict]:
     """
     Get risk counts grouped by week for trend chart.
     """
     start_date = datetime.utcnow() - timedelta(weeks=weeks)
+    week_num = year_week(Prediction.created_at)
 
     query = select(
-        func.strftime('%Y-%W', Prediction.created_at).label('week_num'),
+        week_num.label('week_num'),
         Prediction.risk_level,
         func.count(Prediction.id).label('count')
     ).where(
         Prediction.created_at >= start_date
     ).group_by(
-        'week_num', Prediction.risk_level
-    ).order_by('week_num')
+        week_num, Prediction.risk_level
+    ).order_by(week_num)
 
     result = await db.execute(query)
     rows = result.all()
@@ -167,7 +276,8 @@ async def get_recent_assessments(db: AsyncSession, limit: int = 10) -> List[Dict
         Prediction.id,
         Prediction.created_at,
         Prediction.risk_level,
-        AssessmentInput.academic_year
+        AssessmentInput.academic_year,
+        AssessmentInput.unlisted_answers
     ).outerjoin(
         AssessmentInput, Prediction.id == AssessmentInput.prediction_id
     ).order_by(
@@ -179,90 +289,86 @@ async def get_recent_assessments(db: AsyncSession, limit: int = 10) -> List[Dict
 
     assessments = []
     for row in rows:
+        academic_year = None
+        if row.academic_year is not None:
+            academic_year = decode_choice('academic_year', row.academic_year, row.unlisted_answers)
         assessments.append({
             'id': row.id,
             'name': 'Student Assessment',  # Generic label for privacy
             'date': row.created_at.strftime('%a, %d %b'),
             'time': row.created_at.strftime('%I:%M %p'),
             'risk': row.risk_level,
-            'type': f"Year {row.academic_year or 'N/A'} Review"
+            'type': f"Year {academic_year or 'N/A'} Review"
         })
 
     return assessments
 
 
+async def _risk_factor_counts(db: AsyncSession, since: Optional[datetime] = None,
+                              until: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Risk factor occurrences per category, optionally only for predictions made in [since, until).
+    Counts are grouped by catalog text in SQL and summed per category in memory.
+    Without a window the archived predictions' rollups are included; windows
+    are always within the live retention period.
+    """
+    query = select(RiskFactor.text_id, func.count().label('count')).group_by(RiskFactor.text_id)
+    if since is not None or until is not None:
+        # IN (subquery) rather than a join: the planner then walks the window's
+        # predictions by created_at instead of scanning every risk factor row
+        window = select(Prediction.id)
+        if since is not None:
+            window = window.where(Prediction.created_at >= since)
+        if until is not None:
+            window = window.where(Prediction.created_at < until)
+        query = query.where(RiskFactor.prediction_id.in_(window))
+    rows = (await db.execute(query)).all()
+    if since is None and until is None:
+        rows += (await db.execute(
+            select(RiskFactorRollup.text_id, func.sum(RiskFactorRollup.occurrences).label('count'))
+            .group_by(RiskFactorRollup.text_id)
+        )).all()
+
+    categories = await risk_factor_catalog.values(db, (row.text_id for row in rows), 'category')
+    counts: Dict[str, int] = {}
+    for row in rows:
+        category = categories[row.text_id]
+        counts[category] = counts.get(category, 0) + row.count
+    return counts
+
+
 async def get_top_risk_factors(db: AsyncSession, limit: int = 5) -> List[Dict]:
     """
     Get top risk factors by occurrence with trend calculation.
     """
     # Count factors by category
-    query = select(
-        RiskFactor.category,
-        func.count(RiskFactor.id).label('count')
-    ).group_by(
-        RiskFactor.category
-    ).order_by(
-        func.count(RiskFactor.id).desc()
-    ).limit(limit)
+    counts = await _risk_factor_counts(db)
+    top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    total_factors = sum(count for _, count in top)
 
-    result = await db.execute(query)
-    rows = result.all()
-
-    total_factors = sum(r.count for r in rows)
+    # Trend: compare current week vs previous week counts
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    two_weeks_ago = now - timedelta(days=14)
+    current = await _risk_factor_counts(db, since=week_ago) if top else {}
+    previous = await _risk_factor_counts(db, since=two_weeks_ago, until=week_ago) if top else {}
 
     factors = []
-    for row in rows:
-        percentage = (row.count / total_factors * 100) if total_factors > 0 else 0
-
-        # Calculate trend (compare current week vs previous week)
-        trend = await calculate_trend(db, row.category)
-
+    for category, count in top:
+        percentage = (count / total_factors * 100) if total_factors > 0 else 0
         factors.append({
-            'name': row.category,
+            'name': category,
             'percentage': round(percentage, 1),
-            'trend': trend
+            'trend': calculate_trend(current.get(category, 0), previous.get(category, 0))
         })
 
     return factors
 
 
-async def calculate_trend(db: AsyncSession, category: str) -> str:
+def calculate_trend(current_count: int, prev_count: int) -> str:
     """
     Compare current week vs previous week count for a risk factor category.
     """
-    now = datetime.utcnow()
-    week_ago = now - timedelta(days=7)
-    two_weeks_ago = now - timedelta(days=14)
-
-    # Count this week
-    query_current = select(func.count(RiskFactor.id)).where(
-        and_(
-            RiskFactor.category == category,
-            RiskFactor.id.in_(
-                select(RiskFactor.id).join(Prediction).where(Prediction.created_at >= week_ago)
-            )
-        )
-    )
-    current_result = await db.execute(query_current)
-    current_count = current_result.scalar() or 0
-
-    # Count previous week
-    query_prev = select(func.count(RiskFactor.id)).where(
-        and_(
-            RiskFactor.category == category,
-            RiskFactor.id.in_(
-                select(RiskFactor.id).join(Prediction).where(
-                    and_(
-                        Prediction.created_at >= two_weeks_ago,
-                        Prediction.created_at < week_ago
-                    )
-                )
-            )
-        )
-    )
-    prev_result = await db.execute(query_prev)
-    prev_count = prev_result.scalar() or 0
-
     if current_count > prev_count:
         return 'up'
     elif current_count < prev_count:
@@ -273,7 +379,7 @@ async def calculate_trend(db: AsyncSession, category: str) -> str:
 
 async def get_risk_distribution(db: AsyncSession) -> Dict:
     """
-    Get simple count by risk level.
+    Get simple count by risk level, archived predictions included.
     """
     query = select(
         Prediction.risk_level,
@@ -288,5 +394,7 @@ async def get_risk_distribution(db: AsyncSession) -> Dict:
     distribution = {'high': 0, 'medium': 0, 'low': 0}
     for row in rows:
         distribution[row.risk_level] = row.count
+    for risk_level, (count, _) in (await _archived_counts(db)).items():
+        distribution[risk_level] = distribution.get(risk_level, 0) + count
 
     return distribution
@@ -0,0 +1,146 @@
+# backend/app/repositories/retention_repository.py
+"""Reading expired predictions for the cold archive and removing them afterwards."""
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import (
+    AssessmentInput, Prediction, PredictionRollup, Recommendation, RiskFactor, RiskFactorRollup
+)
+from app.repositories.text_catalog import recommendation_catalog, risk_factor_catalog
+from app.utils.assessment_codes import decode_assessment
+
+_RECOMMENDATION_FIELDS = ('type', 'title', 'description', 'urgency', 'contact')
+
+
+class ExpiredPrediction(NamedTuple):
+    """One prediction due for archival: its self-contained archive record and what the rollups need."""
+    id: int
+    created_at: datetime
+    risk_level: str
+    risk_score: int
+    factor_text_ids: List[int]
+    record: Dict
+
+
+async def fetch_expired(db: AsyncSession, cutoff: datetime, limit: int) -> List[ExpiredPrediction]:
+    """
+    The oldest predictions made before `cutoff` (at most `limit`), each with
+    its answers decoded and its risk factor / recommendation texts resolved,
+    so the archive record does not depend on codes or catalog ids.
+    """
+    table = Prediction.__table__
+    rows = (await db.execute(
+        select(table).where(table.c.created_at < cutoff)
+        .order_by(table.c.created_at, table.c.id).limit(limit)
+    )).mappings().all()
+    if not rows:
+        return []
+    ids = [row['id'] for row in rows]
+
+    assessments = {
+        row['prediction_id']: decode_assessment(row)
+        for row in (await db.execute(
+            select(AssessmentInput.__table__).where(AssessmentInput.prediction_id.in_(ids))
+        )).mappings()
+    }
+    links = {}
+    for model in (RiskFactor, Recommendation):
+        by_prediction: Dict[int, List[int]] = {}
+        for prediction_id, text_id in (await db.execute(
+            select(model.prediction_id, model.text_id).where(model.prediction_id.in_(ids)).order_by(model.id)
+        )).all():
+            by_prediction.setdefault(prediction_id, []).append(text_id)
+        links[model] = by_prediction
+    factor_texts = await risk_factor_catalog.texts(
+        db, {t for text_ids in links[RiskFactor].values() for t in text_ids})
+    recommendation_texts = await recommendation_catalog.texts(
+        db, {t for text_ids in links[Recommendation].values() for t in text_ids})
+
+    expired = []
+    for row in rows:
+        factor_ids = links[RiskFactor].get(row['id'], [])
+        recommendations = []
+        for text_id in links[Recommendation].get(row['id'], []):
+            recommendation = dict(zip(_RECOMMENDATION_FIELDS, recommendation_texts[text_id]))
+            recommendation['contact'] = recommendation['contact'] or None
+            recommendations.append(recommendation)
+        record = {
+            **{column: row[column] for column in table.columns.keys()},
+            'assessment': assessments.get(row['id']),
+            'risk_factors': [dict(zip(risk_factor_catalog.columns, factor_texts[t])) for t in factor_ids],
+            'recommendations': recommendations,
+        }
+        expired.append(ExpiredPrediction(row['id'], row['created_at'], row['risk_level'], row['risk_score'],
+                                         factor_ids, record))
+    return expired
+
+
+async def _add_to_rollup(db: AsyncSession, model, key_columns: Tuple[str, ...],
+                         increments: Dict[Tuple, Dict[str, int]]):
+    """Add counts to rollup rows keyed by `key_columns` (the first is `day`), creating missing rows."""
+    table = model.__table__
+    existing = {
+        tuple(row[1:]): row[0]
+        for row in (await db.execute(
+            select(table.c.id, *(table.c[c] for c in key_columns))
+            .where(table.c.day.in_({key[0] for key in increments}))
+        )).all()
+    }
+    updates, new_rows = [], []
+    for key, counts in increments.items():
+        if key in existing:
+            updates.append({'rollup_id': existing[key], **{f'add_{c}': n for c, n in counts.items()}})
+        else:
+            new_rows.append({**dict(zip(key_columns, key)), **counts})
+    if updates:
+        count_columns = [c for c in updates[0] if c != 'rollup_id']
+        await db.execute(
+            update(table).where(table.c.id == bindparam('rollup_id'))
+            .values({c[len('add_'):]: table.c[c[len('add_'):]] + bindparam(c) for c in count_columns}),
+            updates
+        )
+    if new_rows:
+        await db.execute(insert(table), new_rows)
+
+
+async def remove_archived(db: AsyncSession, expired: List[ExpiredPrediction]) -> bool:
+    """
+    Delete archived predictions with their child rows and add them to the
+    daily rollups, in one short transaction.
+
+    Deleting the predictions comes first and doubles as a claim: if another
+    process removed any of them in the meantime the transaction is rolled
+    back and False returned, so no prediction is ever counted twice.
+    """
+    ids = [e.id for e in expired]
+    try:
+        claimed = (await db.execute(delete(Prediction.__table__).where(Prediction.id.in_(ids)))).rowcount
+        if claimed != len(ids):
+            await db.rollback()
+            return False
+        for model in (AssessmentInput, RiskFactor, Recommendation):
+            await db.execute(delete(model.__table__).where(model.prediction_id.in_(ids)))
+
+        predictions: Dict[Tuple[date, str], Dict[str, int]] = {}
+        factors: Dict[Tuple[date, int], Dict[str, int]] = {}
+        for e in expired:
+            day = e.created_at.date()
+            counts = predictions.setdefault((day, e.risk_level), {'predictions': 0, 'risk_score_sum': 0})
+            counts['predictions'] += 1
+            counts['risk_score_sum'] += e.risk_score
+            for text_id in e.factor_text_ids:
+                factors.setdefault((day, text_id), {'occurrences': 0})['occurrences'] += 1
+        await _add_to_rollup(db, PredictionRollup, ('day', 'risk_level'), predictions)
+        if factors:
+            await _add_to_rollup(db, RiskFactorRollup, ('day', 'text_id'), factors)
+
+        await db.commit()
+        return True
+
+    except Exception as e:
+        await db.rollback()
+        print(f"Error removing {len(ids)} archived prediction(s): {e}")
+        raise
@@ -0,0 +1,73 @@
+# backend/app/repositories/shadow_repository.py
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from app.database import ShadowComparison
+from collections import Counter
+import json
+from typing import Dict, List
+
+
+async def save_shadow_window(db: AsyncSession, window: Dict) -> None:
+    """Store the aggregates of one shadow-scored batch."""
+    try:
+        db.add(ShadowComparison(
+            live_version=window['live_version'],
+            candidate_version=window['candidate_version'],
+            n=window['n'],
+            agreements=window['agreements'],
+            risk_level_flips=window['risk_level_flips'],
+            sum_delta=window['sum_delta'],
+            sum_abs_delta=window['sum_abs_delta'],
+            max_abs_delta=window['max_abs_delta'],
+            flip_counts=json.dumps(window['flip_counts']) if window['flip_counts'] else None
+        ))
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        print(f"Error saving shadow comparison: {e}")
+        raise
+
+
+async def get_shadow_summary(db: AsyncSession) -> List[Dict]:
+    """
+    Totals per (candidate, live) version pair across all stored batches.
+    """
+    query = select(
+        ShadowComparison.candidate_version,
+        ShadowComparison.live_version,
+        func.sum(ShadowComparison.n),
+        func.sum(ShadowComparison.agreements),
+        func.sum(ShadowComparison.risk_level_flips),
+        func.sum(ShadowComparison.sum_delta),
+        func.sum(ShadowComparison.sum_abs_delta),
+        func.max(ShadowComparison.max_abs_delta),
+        func.min(ShadowComparison.created_at),
+        func.max(ShadowComparison.created_at)
+    ).group_by(
+        ShadowComparison.candidate_version, ShadowComparison.live_version
+    ).order_by(func.max(ShadowComparison.created_at).desc())
+    rows = (await db.execute(query)).all()
+
+    flips_query = select(
+        ShadowComparison.candidate_version, ShadowComparison.live_version, ShadowComparison.flip_counts
+    ).where(ShadowComparison.flip_counts.isnot(None))
+    flips: Dict[tuple, Counter] = {}
+    for candidate, live, counts in (await db.execute(flips_query)).all():
+        flips.setdefault((candidate, live), Counter()).update(json.loads(counts))
+
+    summary = []
+    for candidate, live, n, agreements, level_flips, sum_delta, sum_abs, max_abs, first, last in rows:
+        summary.append({
+            'candidate_version': candidate,
+            'live_version': live,
+            'compared': int(n),
+            'agreement_rate': round(agreements / n, 4) if n else 0.0,
+            'risk_level_flips': int(level_flips),
+            'mean_delta': round(sum_delta / n, 6) if n else 0.0,
+            'mean_abs_delta': round(sum_abs / n, 6) if n else 0.0,
+            'max_abs_delta': round(max_abs, 6),
+            'flip_counts': dict(flips.get((candidate, live), {})),
+            'first_seen': first.isoformat() if first else None,
+            'last_seen': last.isoformat() if last else None
+        })
+    return summary
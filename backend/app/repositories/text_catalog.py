@@ -0,0 +1,98 @@
+# backend/app/repositories/text_catalog.py
+"""In-memory view of the risk factor and recommendation text catalogs.
+
+Per-prediction rows store only a `text_id`; the texts live once in
+`risk_factor_texts` / `recommendation_texts`. Those hold a few dozen rows
+(the rule table's texts), so each process keeps the whole catalog in
+memory and only goes to the database for a text it has not seen yet.
+
+Texts added inside a write transaction are cached only after that
+transaction commits (`remember`), so a rolled-back insert can never leave
+an id in the cache that the database does not have.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import TEXT_CATALOGS, RecommendationText, RiskFactorText
+
+TextKey = Tuple[str, ...]
+
+
+def risk_factor_key(risk_factor) -> TextKey:
+    return (risk_factor.category, risk_factor.factor, risk_factor.impact, risk_factor.description)
+
+
+def recommendation_key(recommendation) -> TextKey:
+    return (recommendation.type, recommendation.title, recommendation.description,
+            recommendation.urgency, recommendation.contact or "")
+
+
+def _insert_ignoring_duplicates(table, dialect_name: str):
+    """INSERT that skips texts another process added first (they are unique)."""
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return insert(table)
+    return dialect_insert(table).on_conflict_do_nothing()
+
+
+class TextCatalog:
+    def __init__(self, model):
+        self.model = model
+        self.table = model.__table__
+        self.columns = next(columns for _, catalog, columns in TEXT_CATALOGS if catalog is model)
+        self._ids: Dict[TextKey, int] = {}
+        self._texts: Dict[int, TextKey] = {}
+
+    def clear(self):
+        """Forget every cached text, e.g. after the catalog tables were emptied."""
+        self._ids.clear()
+        self._texts.clear()
+
+    async def _fetch(self, db: AsyncSession) -> Dict[TextKey, int]:
+        result = await db.execute(select(self.table.c.id, *(self.table.c[c] for c in self.columns)))
+        return {tuple(row[1:]): row[0] for row in result}
+
+    def remember(self, entries: Iterable[Tuple[TextKey, int]]):
+        """Cache texts once the transaction that stored them has committed."""
+        for key, text_id in entries:
+            self._ids[key] = text_id
+            self._texts[text_id] = key
+
+    async def resolve(self, db: AsyncSession,
+                      keys: Iterable[TextKey]) -> Tuple[Dict[TextKey, int], List[Tuple[TextKey, int]]]:
+        """
+        Ids for the given texts, adding unknown ones to the catalog in `db`'s
+        transaction. Returns the ids and the entries to `remember` after commit.
+        """
+        missing = {key for key in keys if key not in self._ids}
+        if not missing:
+            return self._ids, []
+        stored = await self._fetch(db)
+        new = [key for key in missing if key not in stored]
+        if new:
+            await db.execute(_insert_ignoring_duplicates(self.table, db.get_bind().dialect.name),
+                             [dict(zip(self.columns, key)) for key in new])
+            stored = await self._fetch(db)
+        return {**self._ids, **stored}, [(key, stored[key]) for key in missing]
+
+    async def texts(self, db: AsyncSession, text_ids: Iterable[int]) -> Dict[int, TextKey]:
+        """The full text (values of `columns`) for each of the given ids."""
+        text_ids = list(text_ids)
+        if any(text_id not in self._texts for text_id in text_ids):
+            self.remember((await self._fetch(db)).items())
+        return {text_id: self._texts[text_id] for text_id in text_ids if text_id in self._texts}
+
+    async def values(self, db: AsyncSession, text_ids: Iterable[int], column: str) -> Dict[int, str]:
+        """One text column for each of the given ids, e.g. the category of risk factor texts."""
+        position = self.columns.index(column)
+        return {text_id: key[position] for text_id, key in (await self.texts(db, text_ids)).items()}
+
+
+# Global catalogs, shared by every session of the process
+risk_factor_catalog = TextCatalog(RiskFactorText)
+recommendation_catalog = TextCatalog(RecommendationText)
@@ -1,28 +1,50 @@
 # backend/app/routers/admin.py
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
+from app.database import get_read_db, database_metrics
+from app.models.inference_queue import inference_batcher
+from app.models.executor import inference_executor
+from app.models.model_reloader import model_reloader
+from app.models.shadow import candidate_file, shadow_scorer
+from app.models.response_cache import response_cache
+from app.models.csv_scoring import csv_scoring_stats
+from app.models.prediction_writer import prediction_writer
+from app.models.retention import retention_job
+from app.utils.auth import require_admin_key, require_dashboard_access
 from app.repositories.prediction_repository import (
     get_dashboard_stats,
     get_risk_trends,
     get_recent_assessments,
     get_top_risk_factors,
-    get_risk_distribution
+    get_risk_distribution,
+    get_cohort_stats
 )
+from app.repositories.shadow_repository import get_shadow_summary
 from app.models.schemas import (
     DashboardStatsResponse,
     TrendsResponse,
     TrendDataPoint,
     RiskFactorsResponse,
     RecentAssessmentsResponse,
-    RiskDistributionResponse
+    RiskDistributionResponse,
+    CohortStatsResponse,
+    RuntimeMetricsResponse,
+    RetentionRunResponse,
+    ModelVersionResponse,
+    ShadowLoadRequest,
+    ShadowReportResponse
 )
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+# Read-only dashboard data, fetched by the frontend dashboard
+dashboard_router = APIRouter(prefix="/admin", tags=["admin"],
+                             dependencies=[Depends(require_dashboard_access)])
+# Everything else changes server state or exposes internals: admin key only
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_key)])
 
 
-@router.get("/dashboard/stats", response_model=DashboardStatsResponse)
-async def dashboard_stats(db: AsyncSession = Depends(get_db)):
+@dashboard_router.get("/dashboard/stats", response_model=DashboardStatsResponse)
+async def dashboard_stats(db: AsyncSession = Depends(get_read_db)):
     """
     Get overall dashboard statistics including:
     - Total number of assessments
@@ -50,8 +72,8 @@ async def dashboard_stats(db: AsyncSession = Depends(get_db)):
         )
 
 
-@router.get("/dashboard/trends", response_model=TrendsResponse)
-async def dashboard_trends(period: str = 'weekly', db: AsyncSession = Depends(get_db)):
+@dashboard_router.get("/dashboard/trends", response_model=TrendsResponse)
+async def dashboard_trends(period: str = 'weekly', db: AsyncSession = Depends(get_read_db)):
     """
     Get historical risk trend data for the dashboard chart.
 
@@ -71,8 +93,8 @@ async def dashboard_trends(period: str = 'weekly', db: AsyncSession = Depends(ge
         return TrendsResponse(data=[])
 
 
-@router.get("/risk-factors", response_model=RiskFactorsResponse)
-async def top_risk_factors(limit: int = 5, db: AsyncSession = Depends(get_db)):
+@dashboard_router.get("/risk-factors", response_model=RiskFactorsResponse)
+async def top_risk_factors(limit: int = 5, db: AsyncSession = Depends(get_read_db)):
     """
     Get the top N risk factors by occurrence.
 
@@ -91,8 +113,8 @@ async def top_risk_factors(limit: int = 5, db: AsyncSession = Depends(get_db)):
         return RiskFactorsResponse(factors=[])
 
 
-@router.get("/recent-assessments", response_model=RecentAssessmentsResponse)
-async def recent_assessments(limit: int = 10, db: AsyncSession = Depends(get_db)):
+@dashboard_router.get("/recent-assessments", response_model=RecentAssessmentsResponse)
+async def recent_assessments(limit: int = 10, db: AsyncSession = Depends(get_read_db)):
     """
     Get the most recent student assessments.
 
@@ -111,8 +133,8 @@ async def recent_assessments(limit: int = 10, db: AsyncSession = Depends(get_db)
         return RecentAssessmentsResponse(assessments=[])
 
 
-@router.get("/risk-distribution", response_model=RiskDistributionResponse)
-async def risk_distribution(db: AsyncSession = Depends(get_db)):
+@dashboard_router.get("/risk-distribution", response_model=RiskDistributionResponse)
+async def risk_distribution(db: AsyncSession = Depends(get_read_db)):
     """
     Get simple count of predictions by risk level.
 
@@ -126,3 +148,181 @@ async def risk_distribution(db: AsyncSession = Depends(get_db)):
         print(f"Error fetching risk distribution: {e}")
         # Return zero distribution on error
         return RiskDistributionResponse(high=0, medium=0, low=0)
+
+
+@dashboard_router.get("/cohort", response_model=CohortStatsResponse)
+async def cohort_stats(
+    academic_year: Optional[List[str]] = Query(None),
+    attendance: Optional[List[str]] = Query(None),
+    overwhelm_frequency: Optional[List[str]] = Query(None),
+    study_hours: Optional[List[str]] = Query(None),
+    advisor_interaction: Optional[List[str]] = Query(None),
+    employment_status: Optional[List[str]] = Query(None),
+    financial_stress: Optional[List[str]] = Query(None),
+    services_used: Optional[List[str]] = Query(None),
+    withdrawal_reasons: Optional[List[str]] = Query(None),
+    withdrawal_considered: Optional[bool] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get dashboard statistics for a cohort of assessments, e.g.
+    ?employment_status=full-time&financial_stress=high&financial_stress=very-high
+
+    A repeated single-choice filter matches any of its values; services_used
+    and withdrawal_reasons match assessments that selected every given entry.
+
+    Returns:
+        CohortStatsResponse with the cohort's risk distribution and average
+        risk score; 400 for answers the assessment form does not offer
+    """
+    choices = {
+        field: values for field, values in (
+            ('academic_year', academic_year), ('attendance', attendance),
+            ('overwhelm_frequency', overwhelm_frequency), ('study_hours', study_hours),
+            ('advisor_interaction', advisor_interaction), ('employment_status', employment_status),
+            ('financial_stress', financial_stress)
+        ) if values
+    }
+    filters = dict(choices)
+    if services_used:
+        filters['services_used'] = services_used
+    if withdrawal_reasons:
+        filters['withdrawal_reasons'] = withdrawal_reasons
+    if withdrawal_considered is not None:
+        filters['withdrawal_considered'] = withdrawal_considered
+    try:
+        stats = await get_cohort_stats(db, choices, services_used, withdrawal_reasons, withdrawal_considered)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return CohortStatsResponse(filters=filters, **stats)
+
+
+@router.get("/runtime", response_model=RuntimeMetricsResponse)
+async def runtime_metrics():
+    """
+    Get live serving-path metrics used to tune throughput against latency.
+
+    Returns:
+        RuntimeMetricsResponse with inference queue depth, batch-size
+        distribution, queue wait times, executor pool usage, shadow
+        scoring, response cache hit/miss/eviction counters, CSV upload
+        scoring throughput, write-behind queue depth / flush latency,
+        read / write database pool state with the SQLite pragmas in effect and
+        retention / archive progress
+    """
+    return RuntimeMetricsResponse(
+        inference_queue=inference_batcher.metrics(),
+        executor=inference_executor.metrics(),
+        shadow=shadow_scorer.metrics(),
+        response_cache=response_cache.metrics(),
+        csv_uploads=csv_scoring_stats.metrics(),
+        prediction_writes=prediction_writer.metrics(),
+        database=database_metrics(),
+        retention=retention_job.metrics()
+    )
+
+
+@router.post("/retention/run", response_model=RetentionRunResponse)
+async def run_retention():
+    """
+    Move predictions older than the retention period to the cold archive now.
+
+    Works in short per-chunk transactions like the scheduled job, and also
+    when the schedule is disabled. Waits for a pass already in progress.
+
+    Returns:
+        RetentionRunResponse with the cutoff, the number of predictions
+        archived and the archive files written
+    """
+    try:
+        return RetentionRunResponse(**await retention_job.run_once())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Retention pass failed: {e}")
+
+
+@router.get("/model", response_model=ModelVersionResponse)
+async def model_version():
+    """
+    Get the model version currently serving predictions.
+
+    Returns:
+        ModelVersionResponse with the version tag, file paths, load time and
+        reload history
+    """
+    return ModelVersionResponse(**model_reloader.info())
+
+
+@router.post("/model/reload", response_model=ModelVersionResponse)
+async def reload_model():
+    """
+    Hot-reload the model without restarting the API.
+
+    The configured model and scaler files (MODEL_PATH / SCALER_PATH) are
+    loaded, validated and warmed up in the background, then swapped in
+    atomically; requests already in flight finish on the previous version.
+    To deploy a new model, replace those files and call this endpoint. If
+    loading fails the current version keeps serving and the error is returned.
+
+    Returns:
+        ModelVersionResponse for the now-active version; `reloaded` is false
+        when the files were unchanged
+    """
+    try:
+        _, reloaded = await model_reloader.reload()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Model reload failed, previous version still active: {e}")
+    return ModelVersionResponse(reloaded=reloaded, **model_reloader.info())
+
+
+@router.get("/shadow", response_model=ShadowReportResponse)
+async def shadow_report(db: AsyncSession = Depends(get_read_db)):
+    """
+    Compare the shadow candidate model with the live model.
+
+    Returns:
+        ShadowReportResponse with live counters for the current candidate
+        (agreement rate, probability deltas, risk-level flips, request-path
+        overhead) and stored totals for every candidate shadowed so far
+    """
+    try:
+        history = await get_shadow_summary(db)
+    except Exception as e:
+        print(f"Error fetching shadow summary: {e}")
+        history = []
+    return ShadowReportResponse(current=shadow_scorer.metrics(), history=history)
+
+
+@router.post("/shadow", response_model=ShadowReportResponse)
+async def load_shadow_candidate(request: ShadowLoadRequest, db: AsyncSession = Depends(get_read_db)):
+    """
+    Start shadow-scoring live traffic with a candidate model.
+
+    Replaces any current candidate. Paths are relative to (and must stay
+    inside) SHADOW_CANDIDATES_DIR; anything else is rejected with 400.
+    Promote the candidate afterwards by copying its files over the
+    configured model files and calling POST /admin/model/reload.
+    """
+    try:
+        model_path, scaler_path = candidate_file(request.model_path), candidate_file(request.scaler_path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        await shadow_scorer.load(model_path, scaler_path)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Candidate model failed to load: {e}")
+    return await shadow_report(db)
+
+
+@router.delete("/shadow", response_model=ShadowReportResponse)
+async def stop_shadow(db: AsyncSession = Depends(get_read_db)):
+    """
+    Stop shadow scoring; samples already queued are compared first.
+    """
+    await shadow_scorer.unload()
+    return await shadow_report(db)
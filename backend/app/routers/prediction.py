@@ -1,286 +1,114 @@
 # backend/app/routers/prediction.py
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.schemas import SimplifiedAssessmentRequest, PredictionResponse, RiskFactor, Recommendation, RawFeaturesRequest
+from app.config import settings
+from app.models.schemas import (
+    SimplifiedAssessmentRequest,
+    PredictionResponse,
+    FeatureAttribution,
+    RawFeaturesRequest,
+    BatchAssessmentRequest,
+    BatchPredictionItem,
+    BatchPredictionResponse,
+    RawBulkPredictionResponse,
+    WhatIfRequest,
+    WhatIfResponse
+)
 from app.models.ml_model import ml_model
+from app.models.inference_queue import inference_batcher
+from app.models.executor import inference_executor
+from app.models.shadow import shadow_scorer
+from app.models.response_cache import CachedResponse, response_cache
+from app.models.csv_scoring import OUTPUT_FORMATS as CSV_OUTPUT_FORMATS, open_csv, score_csv_chunks
+from app.utils.fallback_scoring import (
+    ATTENDANCE_SCORES, OVERWHELM_SCORES, FINANCIAL_STRESS_SCORES, ADVISOR_SCORES, EMPLOYMENT_SCORES,
+    WITHDRAWAL_CONSIDERED_POINTS, EXTRACURRICULAR_RANGE, EXTRACURRICULAR_POINTS,
+    HIGH_RISK_SCORE, MEDIUM_RISK_SCORE, encode_assessments, fallback_scores
+)
+from app.utils.feature_mapping import FEATURE_ORDER, map_form_to_ml_features
+from app.utils.json_response import dumps, encode_batch_response, encode_prediction_response, json_loads
+from app.utils.risk_levels import risk_level_for_probability, risk_levels_for_probabilities
+from app.utils.risk_rules import ML, FALLBACK, evaluate_rules, evaluate_rules_batch
+from app.utils.what_if import build_what_if_grid
 from app.database import get_db
-from app.repositories.prediction_repository import save_prediction
-from typing import List
-
-# NOTE: FEATURE_ORDER must match the order used during model training.
-# Keep this list in sync with backend/ml/train_model.py: FEATURE_COLUMNS
-FEATURE_ORDER: List[str] = [
-    'Curricular units 2nd sem (approved)',
-    'Curricular units 1st sem (approved)',
-    'Tuition fees up to date',
-    'Scholarship holder',
-    'Age at enrollment',
-    'Debtor',
-    'Gender',
-    'Application mode'
-]
+from app.models.prediction_writer import record_prediction, record_predictions
+from app.repositories.prediction_repository import PredictionRecord
+from datetime import datetime
+from typing import List, Optional
+import asyncio
+import io
+import time
+import numpy as np
 
 router = APIRouter(prefix="/predict", tags=["prediction"])
 
-def map_form_to_ml_features(data: SimplifiedAssessmentRequest) -> List[float]:
-    """
-    Map all form inputs to ML model's required features.
-    ML Model expects: ['Curricular units 2nd sem (approved)', 'Curricular units 1st sem (approved)',
-                       'Tuition fees up to date', 'Scholarship holder', 'Age at enrollment',
-                       'Debtor', 'Gender', 'Application mode']
-    """
-    # Attendance maps to curricular units approved (study performance proxy)
-    attendance_to_units = {
-        'always': 50, 'often': 45, 'sometimes': 30, 'rarely': 15, 'never': 5
-    }
-    curricular_2nd_sem = attendance_to_units.get(data.attendance, 30)
-    curricular_1st_sem = attendance_to_units.get(data.attendance, 30)
-    
-    # Performance satisfaction affects study units
-    performance_factor = (data.performance_satisfaction / 10.0)
-    curricular_2nd_sem = int(curricular_2nd_sem * performance_factor)
-    curricular_1st_sem = int(curricular_1st_sem * performance_factor)
-    
-    # Tuition fees based on financial stress
-    financial_stress_map = {'none': 1, 'low': 1, 'moderate': 0, 'high': 0, 'very-high': 0}
-    tuition_fees_up_to_date = float(financial_stress_map.get(data.financial_stress, 0))
-    
-    # Scholarship holder based on financial stress
-    scholarship_scores = {'none': 1, 'low': 1, 'moderate': 0, 'high': 0, 'very-high': 0}
-    scholarship_holder = float(scholarship_scores.get(data.financial_stress, 0))
-    
-    # Age proxy based on academic year
-    academic_year_map = {'1st': 18, '2nd': 19, '3rd': 20, '4th': 21}
-    age_base = academic_year_map.get(data.academic_year, 19)
-    
-    # Adjust age based on employment
-    employment_age_adjustment = {'not-employed': 0, 'part-time': 1, 'full-time': 2}
-    age_at_enrollment = float(age_base + employment_age_adjustment.get(data.employment_status, 0))
-    
-    # Debtor status based on financial stress
-    debtor_map = {'none': 0, 'low': 0, 'moderate': 1, 'high': 1, 'very-high': 1}
-    debtor = float(debtor_map.get(data.financial_stress, 0))
-    
-    # Gender (1 for male, 0 for female) - use study hours as proxy
-    if data.study_hours in ['8+', '5-8']:
-        gender = 0  # Female tend to study more
-    else:
-        gender = 1
-    
-    # Application mode based on employment and career alignment
-    if data.employment_status == 'full-time' and data.career_alignment < 5:
-        application_mode = 2  # Alternative entry
-    elif data.career_alignment >= 8:
-        application_mode = 1  # Regular entry
-    else:
-        application_mode = 1
-    
-    return [
-        curricular_2nd_sem,
-        curricular_1st_sem,
-        tuition_fees_up_to_date,
-        scholarship_holder,
-        age_at_enrollment,
-        debtor,
-        gender,
-        application_mode
-    ]
-
-def filter_risk_factors_by_level(risk_factors: List[RiskFactor], risk_level: str) -> List[RiskFactor]:
-    """
-    Filter and adjust risk factors to be contextually appropriate for the overall risk level.
-
-    - Low Risk (0-34): Show max 2 factors with "low" or "medium" impact only
-    - Medium Risk (35-59): Show max 4 factors with "medium" or "high" impact
-    - High Risk (60+): Show all factors with "high" impact
-    """
-    if risk_level == 'low':
-        # For low risk, downgrade all impacts and show minimal factors
-        adjusted_factors = []
-        for factor in risk_factors[:2]:  # Max 2 factors
-            # Downgrade impact levels
-            if factor.impact == 'high':
-                adjusted_impact = 'low'
-            else:
-                adjusted_impact = 'low'
-
-            adjusted_factors.append(RiskFactor(
-                category=factor.category,
-                factor=factor.factor,
-                impact=adjusted_impact,
-                description=factor.description
-            ))
-        return adjusted_factors
-
-    elif risk_level == 'medium':
-        # For medium risk, show moderate number with medium/high impact
-        adjusted_factors = []
-        for factor in risk_factors[:4]:  # Max 4 factors
-            # Keep high as high, but prefer medium
-            if factor.impact == 'high':
-                adjusted_impact = 'medium' if len(adjusted_factors) < 2 else 'high'
-            else:
-                adjusted_impact = 'medium'
-
-            adjusted_factors.append(RiskFactor(
-                category=factor.category,
-                factor=factor.factor,
-                impact=adjusted_impact,
-                description=factor.description
-            ))
-        return adjusted_factors
-
-    else:  # high risk
-        # For high risk, show all factors with their original impact
-        return risk_factors
-
-
 def calculate_fallback_risk(data: SimplifiedAssessmentRequest) -> PredictionResponse:
     """Fallback prediction when ML model is not available"""
     risk_score = 0
 
     # Attendance scoring
-    attendance_scores = {
-        'always': 0, 'often': 5, 'sometimes': 15, 'rarely': 25, 'never': 35
-    }
-    risk_score += attendance_scores.get(data.attendance, 0)
+    risk_score += ATTENDANCE_SCORES.get(data.attendance, 0)
 
     # Overwhelm scoring
-    overwhelm_scores = {
-        'never': 0, 'rarely': 5, 'sometimes': 10, 'often': 20, 'always': 30
-    }
-    risk_score += overwhelm_scores.get(data.overwhelm_frequency, 0)
+    risk_score += OVERWHELM_SCORES.get(data.overwhelm_frequency, 0)
 
     # Financial stress scoring
-    financial_scores = {
-        'none': 0, 'low': 5, 'moderate': 10, 'high': 20, 'very-high': 25
-    }
-    risk_score += financial_scores.get(data.financial_stress, 0)
+    risk_score += FINANCIAL_STRESS_SCORES.get(data.financial_stress, 0)
 
     # Withdrawal consideration
     if data.withdrawal_considered:
-        risk_score += 15
+        risk_score += WITHDRAWAL_CONSIDERED_POINTS
 
     # Performance satisfaction (inverse)
     risk_score += max(0, 10 - data.performance_satisfaction) * 2
 
     # Advisor interaction (inverse - less interaction = higher risk)
-    advisor_scores = {
-        'never': 10, 'once-semester': 5, '2-3-semester': 2, 'monthly': 0
-    }
-    risk_score += advisor_scores.get(data.advisor_interaction, 0)
+    risk_score += ADVISOR_SCORES.get(data.advisor_interaction, 0)
     
     # Support network strength (inverse - weaker = higher risk)
     risk_score += max(0, 10 - data.support_network_strength)
     
     # Extracurricular hours (too much or too little is risky)
-    if data.extracurricular_hours < 1 or data.extracurricular_hours > 15:
-        risk_score += 5
+    if data.extracurricular_hours < EXTRACURRICULAR_RANGE[0] or data.extracurricular_hours > EXTRACURRICULAR_RANGE[1]:
+        risk_score += EXTRACURRICULAR_POINTS
     
     # Career alignment (poor alignment = higher risk)
     risk_score += max(0, 10 - data.career_alignment) * 1.5
     
     # Employment status (full-time while studying increases risk)
-    if data.employment_status == 'full-time':
-        risk_score += 10
-    elif data.employment_status == 'part-time':
-        risk_score += 5
+    risk_score += EMPLOYMENT_SCORES.get(data.employment_status, 0)
 
     # Normalize to 0-100
     risk_score = min(100, max(0, risk_score))
 
     # Determine risk level
-    if risk_score >= 60:
+    if risk_score >= HIGH_RISK_SCORE:
         risk_level = 'high'
-    elif risk_score >= 35:
+    elif risk_score >= MEDIUM_RISK_SCORE:
         risk_level = 'medium'
     else:
         risk_level = 'low'
 
-    # Generate risk factors
-    risk_factors = []
-    if data.attendance in ['rarely', 'never']:
-        risk_factors.append(RiskFactor(
-            category="Academic",
-            factor="Low Class Attendance",
-            impact="high",
-            description="Inconsistent class attendance is strongly correlated with dropout risk"
-        ))
-
-    if data.overwhelm_frequency in ['often', 'always']:
-        risk_factors.append(RiskFactor(
-            category="Mental Health",
-            factor="Academic Overwhelm",
-            impact="high",
-            description="Feeling frequently overwhelmed can lead to burnout and withdrawal"
-        ))
-
-    if data.financial_stress in ['high', 'very-high']:
-        risk_factors.append(RiskFactor(
-            category="Financial",
-            factor="Financial Stress",
-            impact="high",
-            description="Financial difficulties are a leading cause of student withdrawal"
-        ))
+    # Risk factors and recommendations (fallback subset of the rule table)
+    return _fallback_prediction_response(risk_score, risk_level, evaluate_rules(data, risk_level, path=FALLBACK))
 
-    if data.withdrawal_considered:
-        risk_factors.append(RiskFactor(
-            category="Behavioral",
-            factor="Withdrawal Consideration",
-            impact="high",
-            description="Active consideration of withdrawal indicates elevated risk"
-        ))
-
-    # Filter risk factors based on overall risk level
-    risk_factors = filter_risk_factors_by_level(risk_factors, risk_level)
-
-    # Generate recommendations
-    recommendations = []
-    if risk_level == 'high':
-        recommendations.append(Recommendation(
-            type="counseling",
-            title="Mental Health Support",
-            description="Schedule an urgent appointment with a counselor to discuss your concerns and develop a support plan",
-            urgency="immediate",
-            contact="counseling@rvce.edu.in"
-        ))
-
-    if data.financial_stress in ['high', 'very-high']:
-        recommendations.append(Recommendation(
-            type="financial",
-            title="Financial Aid Office",
-            description="Connect with financial aid office to explore scholarships, grants, and emergency funding options",
-            urgency="soon",
-            contact="financialaid@rvce.edu.in"
-        ))
-
-    if data.performance_satisfaction <= 4:
-        recommendations.append(Recommendation(
-            type="academic",
-            title="Academic Tutoring",
-            description="Access tutoring services and study groups to improve academic performance",
-            urgency="soon",
-            contact="tutoring@rvce.edu.in"
-        ))
-    
-    # Services used - if no services used, add recommendation
-    if not data.services_used or len(data.services_used) == 0:
-        recommendations.append(Recommendation(
-            type="support",
-            title="Explore Campus Support Services",
-            description="You haven't indicated using any support services yet. Visit the student center to learn about available resources including academic advising, counseling, and health services.",
-            urgency="soon",
-            contact="studentcenter@rvce.edu.in"
-        ))
-
-    if not recommendations:
-        recommendations.append(Recommendation(
-            type="peer",
-            title="Stay Connected",
-            description="Continue engaging with campus resources and maintain your support network",
-            urgency="when-needed"
-        ))
 
+def calculate_fallback_risks(assessments: List[SimplifiedAssessmentRequest]) -> List[tuple]:
+    """`calculate_fallback_risk` for a batch: scores, levels and rules are computed vectorised.
+
+    Returns `(risk_score, risk_level, rules)` per row; `_fallback_prediction_response`
+    turns one into a response (and can fail per row, as the single-request path does).
+    """
+    scores, levels = fallback_scores(encode_assessments(assessments))
+    levels = levels.tolist()
+    rules = evaluate_rules_batch(assessments, levels, path=FALLBACK)
+    return list(zip(scores.tolist(), levels, rules))
+
+
+def _fallback_prediction_response(risk_score, risk_level: str, rules) -> PredictionResponse:
+    risk_factors, recommendations = rules
     return PredictionResponse(
         risk_level=risk_level,
         risk_score=risk_score,
@@ -290,293 +118,126 @@ def calculate_fallback_risk(data: SimplifiedAssessmentRequest) -> PredictionResp
         prediction_confidence=0.75
     )
 
+
+def build_ml_prediction_response(data: SimplifiedAssessmentRequest, pred: dict,
+                                  attribution: Optional[FeatureAttribution] = None) -> PredictionResponse:
+    """Build the full response (risk factors + recommendations) for an ML model prediction."""
+    risk_level = risk_level_for_probability(pred['dropout_probability'])
+    # Risk factors and recommendations from the precompiled rule table
+    return _ml_prediction_response(pred, risk_level, evaluate_rules(data, risk_level, path=ML), attribution)
+
+
+def build_ml_prediction_responses(assessments: List[SimplifiedAssessmentRequest], preds: List[dict],
+                                  attributions: Optional[List[FeatureAttribution]] = None) -> List[PredictionResponse]:
+    """`build_ml_prediction_response` for a batch; each rule is evaluated once over all rows."""
+    risk_levels = [risk_level_for_probability(pred['dropout_probability']) for pred in preds]
+    rules = evaluate_rules_batch(assessments, risk_levels, path=ML)
+    attributions = attributions or [None] * len(preds)
+    return [_ml_prediction_response(*args) for args in zip(preds, risk_levels, rules, attributions)]
+
+
+def feature_attributions(version, features) -> Optional[List[FeatureAttribution]]:
+    """TreeSHAP contributions per row of `features`, or None if the version cannot explain them."""
+    explained = version.explain(features)
+    if explained is None:
+        return None
+    base_value, contributions = explained
+    return [
+        FeatureAttribution.model_construct(base_value=float(base_value), contributions=dict(zip(FEATURE_ORDER, row)))
+        for row in contributions.tolist()
+    ]
+
+
+def _ml_prediction_response(pred: dict, risk_level: str, rules,
+                            attribution: Optional[FeatureAttribution] = None) -> PredictionResponse:
+    dropout_probability = pred['dropout_probability']
+    risk_factors, recommendations = rules
+    # Every field is already well-typed (model output + frozen rule fragments); skip validation
+    return PredictionResponse.model_construct(
+        risk_level=risk_level,
+        risk_score=int(round(dropout_probability * 100)),
+        dropout_probability=dropout_probability,
+        predicted_class=pred['predicted_class'],
+        risk_factors=risk_factors,
+        recommendations=recommendations,
+        prediction_confidence=pred['model_confidence'],
+        feature_attribution=attribution
+    )
+
+
 @router.post("/simplified", response_model=PredictionResponse)
-async def predict_simplified(data: SimplifiedAssessmentRequest, db: AsyncSession = Depends(get_db)):
+async def predict_simplified(data: SimplifiedAssessmentRequest, explain: bool = False,
+                             db: AsyncSession = Depends(get_db)):
     """
     Predict dropout risk based on simplified assessment.
     Uses ML model if available, falls back to heuristic otherwise.
     All form inputs are used in the prediction.
+    With `explain=true` the response carries `feature_attribution`: each
+    model feature's contribution to the dropout log-odds (null for
+    heuristic results).
     """
     try:
-        # Map all form inputs to ML features
-        ml_features = map_form_to_ml_features(data)
-        
-        # Try to use ML model first
-        if ml_model.is_loaded:
-            pred = ml_model.predict(ml_features)
-            if pred is not None:
-                dropout_probability = pred['dropout_probability']
-                predicted_class = pred['predicted_class']
-                prediction_confidence = pred['model_confidence']
-                
-                # Determine risk level based on probability
-                risk_score = int(round(dropout_probability * 100))
-                if dropout_probability >= 0.6:
-                    risk_level = 'high'
-                elif dropout_probability >= 0.35:
-                    risk_level = 'medium'
-                else:
-                    risk_level = 'low'
-                
-                # Generate risk factors based on form inputs
-                risk_factors = []
-                if data.attendance in ['rarely', 'never']:
-                    risk_factors.append(RiskFactor(
-                        category="Academic",
-                        factor="Low Class Attendance",
-                        impact="high",
-                        description="Inconsistent class attendance is strongly correlated with dropout risk"
-                    ))
-                
-                if data.overwhelm_frequency in ['often', 'always']:
-                    risk_factors.append(RiskFactor(
-                        category="Mental Health",
-                        factor="Academic Overwhelm",
-                        impact="high",
-                        description="Feeling frequently overwhelmed can lead to burnout and withdrawal"
-                    ))
-                
-                if data.financial_stress in ['high', 'very-high']:
-                    risk_factors.append(RiskFactor(
-                        category="Financial",
-                        factor="Financial Stress",
-                        impact="high",
-                        description="Financial difficulties are a leading cause of student withdrawal"
-                    ))
-                
-                if data.withdrawal_considered:
-                    risk_factors.append(RiskFactor(
-                        category="Behavioral",
-                        factor="Withdrawal Consideration",
-                        impact="high",
-                        description="Active consideration of withdrawal indicates elevated risk"
-                    ))
-                
-                if data.support_network_strength <= 3:
-                    risk_factors.append(RiskFactor(
-                        category="Social",
-                        factor="Weak Support Network",
-                        impact="medium",
-                        description="Limited social support increases vulnerability during challenges"
-                    ))
-                
-                if data.employment_status == 'full-time':
-                    risk_factors.append(RiskFactor(
-                        category="Personal",
-                        factor="Full-time Employment",
-                        impact="medium",
-                        description="Working full-time while studying significantly increases time pressure"
-                    ))
-
-                # Generate recommendations
-                recommendations = []
-                if risk_level == 'high':
-                    recommendations.append(Recommendation(
-                        type="counseling",
-                        title="Mental Health Support",
-                        description="Schedule an urgent appointment with a counselor to discuss your concerns and develop a support plan",
-                        urgency="immediate",
-                        contact="counseling@rvce.edu.in"
-                    ))
-                
-                if data.financial_stress in ['high', 'very-high']:
-                    recommendations.append(Recommendation(
-                        type="financial",
-                        title="Financial Aid Office",
-                        description="Connect with financial aid office to explore scholarships, grants, and emergency funding options",
-                        urgency="soon",
-                        contact="financialaid@rvce.edu.in"
-                    ))
-                
-                if data.performance_satisfaction <= 4:
-                    recommendations.append(Recommendation(
-                        type="academic",
-                        title="Academic Tutoring",
-                        description="Access tutoring services and study groups to improve academic performance",
-                        urgency="soon",
-                        contact="tutoring@rvce.edu.in"
-                    ))
-                
-                if data.advisor_interaction in ['never', 'once-semester']:
-                    recommendations.append(Recommendation(
-                        type="academic",
-                        title="Schedule Advisor Meeting",
-                        description="Regular meetings with your academic advisor can help with course planning and early problem detection",
-                        urgency="soon",
-                        contact="advising@rvce.edu.in"
-                    ))
-                
-                if data.employment_status == 'full-time':
-                    recommendations.append(Recommendation(
-                        type="peer",
-                        title="Time Management Support",
-                        description="Consider reducing work hours or exploring flexible work arrangements to prioritize your studies",
-                        urgency="soon"
-                    ))
-                
-                # Handle withdrawal reasons if withdrawal is considered
-                if data.withdrawal_considered and data.withdrawal_reasons:
-                    withdrawal_reason_map = {
-                        'Academic difficulty': {
-                            'recommendation': Recommendation(
-                                type="academic",
-                                title="Academic Support Program",
-                                description="Enroll in our comprehensive academic support program with tutoring, study groups, and study skills workshops",
-                                urgency="immediate",
-                                contact="academicsupport@rvce.edu.in"
-                            ),
-                            'risk_factor': RiskFactor(
-                                category="Academic",
-                                factor="Academic Difficulty",
-                                impact="high",
-                                description="Struggling with academic material can lead to course failure and withdrawal"
-                            )
-                        },
-                        'Financial challenges': {
-                            'recommendation': Recommendation(
-                                type="financial",
-                                title="Emergency Financial Assistance",
-                                description="Apply for emergency grants or loans. Meet with financial counselor to create a sustainable plan",
-                                urgency="immediate",
-                                contact="financialaid@rvce.edu.in"
-                            ),
-                            'risk_factor': RiskFactor(
-                                category="Financial",
-                                factor="Financial Crisis",
-                                impact="high",
-                                description="Severe financial issues are a primary driver of student withdrawal"
-                            )
-                        },
-                        'Mental health': {
-                            'recommendation': Recommendation(
-                                type="counseling",
-                                title="Mental Health Crisis Support",
-                                description="Contact counseling center immediately. We also have peer support groups and crisis resources available",
-                                urgency="immediate",
-                                contact="counseling@rvce.edu.in"
-                            ),
-                            'risk_factor': RiskFactor(
-                                category="Mental Health",
-                                factor="Mental Health Crisis",
-                                impact="high",
-                                description="Mental health challenges require immediate professional support and intervention"
-                            )
-                        },
-                        'Personal/family issues': {
-                            'recommendation': Recommendation(
-                                type="support",
-                                title="Personal Counseling & Family Support",
-                                description="Our counselors can help you navigate personal and family challenges while maintaining your academic progress",
-                                urgency="soon",
-                                contact="counseling@rvce.edu.in"
-                            ),
-                            'risk_factor': RiskFactor(
-                                category="Personal",
-                                factor="Personal/Family Crisis",
-                                impact="high",
-                                description="Personal and family issues can significantly impact academic focus and commitment"
-                            )
-                        },
-                        'Lack of interest': {
-                            'recommendation': Recommendation(
-                                type="academic",
-                                title="Academic Advising & Program Exploration",
-                                description="Meet with academic advisor to explore program alternatives, course selections, or potential major changes",
-                                urgency="soon",
-                                contact="advising@rvce.edu.in"
-                            ),
-                            'risk_factor': RiskFactor(
-                                category="Academic",
-                                factor="Loss of Academic Interest",
-                                impact="high",
-                                description="Declining interest in studies suggests misalignment with chosen program or career path"
-                            )
-                        },
-                        'Career opportunities': {
-                            'recommendation': Recommendation(
-                                type="career",
-                                title="Career Planning & Education Strategy",
-                                description="Explore how to balance career opportunities with completing your degree. Many students pursue internships while studying",
-                                urgency="soon",
-                                contact="career@rvce.edu.in"
-                            ),
-                            'risk_factor': RiskFactor(
-                                category="Career",
-                                factor="Career Path Conflict",
-                                impact="medium",
-                                description="External career opportunities may be pulling focus away from academic commitments"
-                            )
-                        }
-                    }
-                    
-                    for reason in data.withdrawal_reasons:
-                        if reason in withdrawal_reason_map:
-                            recommendations.append(withdrawal_reason_map[reason]['recommendation'])
-                            risk_factors.append(withdrawal_reason_map[reason]['risk_factor'])
-
-                # Filter risk factors based on overall risk level (after all factors collected)
-                risk_factors = filter_risk_factors_by_level(risk_factors, risk_level)
-
-                # Services used - if no services used, add recommendation
-                if not data.services_used or len(data.services_used) == 0:
-                    recommendations.append(Recommendation(
-                        type="support",
-                        title="Explore Campus Support Services",
-                        description="You haven't indicated using any support services yet. Visit the student center to learn about available resources including academic advising, counseling, and health services.",
-                        urgency="soon",
-                        contact="studentcenter@rvce.edu.in"
-                    ))
-                
-                if not recommendations:
-                    recommendations.append(Recommendation(
-                        type="peer",
-                        title="Stay Connected",
-                        description="Continue engaging with campus resources and maintain your support network",
-                        urgency="when-needed"
-                    ))
-
-                result = PredictionResponse(
-                    risk_level=risk_level,
-                    risk_score=risk_score,
-                    dropout_probability=dropout_probability,
-                    predicted_class=predicted_class,
-                    risk_factors=risk_factors,
-                    recommendations=recommendations,
-                    prediction_confidence=prediction_confidence
-                )
-
-                # Save prediction to database (non-blocking, log errors)
-                try:
-                    await save_prediction(db, result, data, endpoint="simplified")
-                except Exception as db_error:
-                    print(f"Database save failed: {db_error}")
-
-                return result
-
-        # Fall back to heuristic if ML model not available
-        result = calculate_fallback_risk(data)
-
-        # Save fallback prediction to database
+        # The version is captured once so a concurrent reload cannot change
+        # the model between scoring and recording the prediction.
+        version = ml_model.current()
+
+        # Identical submissions are answered from the response cache
+        cache_key = response_cache.key(data, version, explain)
+        cached = response_cache.get(cache_key)
+        if cached is None:
+            cached = await _score_simplified(data, version, cache_key, explain)
+        elif cached.pred is not None:
+            shadow_scorer.submit(cached.features, cached.pred, version)
+
+        # Save prediction to database (every request, cached or not; queued when
+        # write-behind storage is enabled; log errors)
         try:
-            await save_prediction(db, result, data, endpoint="simplified")
+            await record_prediction(db, cached.response, data, endpoint="simplified",
+                                    model_version=cached.model_version)
         except Exception as db_error:
             print(f"Database save failed: {db_error}")
 
-        return result
+        return Response(content=cached.body, media_type="application/json")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
+async def _score_simplified(data: SimplifiedAssessmentRequest, version, cache_key,
+                            explain: bool = False) -> CachedResponse:
+    """Full pipeline for a cache miss; the result is cached unless the model failed."""
+    # Map all form inputs to ML features
+    ml_features = map_form_to_ml_features(data)
+
+    # Try to use ML model first (batched with concurrent requests)
+    if version is not None:
+        pred = await inference_batcher.predict(ml_features, version)
+        if pred is not None:
+            shadow_scorer.submit(ml_features, pred, version)
+            attributions = feature_attributions(version, [ml_features]) if explain else None
+            result = build_ml_prediction_response(data, pred, attributions[0] if attributions else None)
+            return response_cache.put(cache_key, result, version.version, ml_features, pred)
+
+    # Fall back to heuristic if ML model not available
+    result = calculate_fallback_risk(data)
+    if version is not None:
+        # Model present but failed for this request: do not cache the heuristic under its version
+        return CachedResponse(result, encode_prediction_response(result), None, None, None, 0.0)
+    return response_cache.put(cache_key, result)
+
+
 @router.post("/raw", response_model=PredictionResponse)
-async def predict_raw(request: RawFeaturesRequest, db: AsyncSession = Depends(get_db)):
+async def predict_raw(request: RawFeaturesRequest, explain: bool = False, db: AsyncSession = Depends(get_db)):
     """Predict using raw feature dictionary matching training FEATURE_ORDER.
 
     Example request body:
       {"features": {"Curricular units 2nd sem (approved)": 3, ...}}
+
+    `explain=true` adds per-feature log-odds contributions (`feature_attribution`).
     """
     try:
-        if not ml_model.is_loaded:
+        version = ml_model.current()
+        if version is None:
             raise HTTPException(status_code=503, detail="ML model not loaded")
 
         features_dict = request.features
@@ -588,7 +249,7 @@ async def predict_raw(request: RawFeaturesRequest, db: AsyncSession = Depends(ge
         # Build feature vector in the correct order
         feature_vector = [features_dict[f] for f in FEATURE_ORDER]
 
-        pred = ml_model.predict(feature_vector)
+        pred = await inference_batcher.predict(feature_vector, version)
         if pred is None:
             raise HTTPException(status_code=500, detail="Model prediction failed")
 
@@ -598,33 +259,354 @@ async def predict_raw(request: RawFeaturesRequest, db: AsyncSession = Depends(ge
 
         # Determine risk level based on probability
         risk_score = int(round(dropout_probability * 100))
-        if dropout_probability >= 0.6:
-            risk_level = 'high'
-        elif dropout_probability >= 0.35:
-            risk_level = 'medium'
-        else:
-            risk_level = 'low'
+        risk_level = risk_level_for_probability(dropout_probability)
+
+        attributions = feature_attributions(version, [feature_vector]) if explain else None
 
         # Create prediction response
-        result = PredictionResponse(
+        result = PredictionResponse.model_construct(
             risk_level=risk_level,
             risk_score=risk_score,
             dropout_probability=dropout_probability,
             predicted_class=predicted_class,
             risk_factors=[],  # No heuristic factors for raw ML prediction
             recommendations=[], # To be expanded in future versions
-            prediction_confidence=model_confidence
+            prediction_confidence=model_confidence,
+            feature_attribution=attributions[0] if attributions else None
         )
 
         # Save to database (without assessment input for raw endpoint)
         try:
-            await save_prediction(db, result, None, endpoint="raw")
+            await record_prediction(db, result, None, endpoint="raw", model_version=version.version)
         except Exception as db_error:
             print(f"Database save failed: {db_error}")
 
-        return result
+        return Response(content=encode_prediction_response(result), media_type="application/json")
 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+
+NPY_MEDIA_TYPES = ("application/x-npy", "application/octet-stream")
+ARROW_MEDIA_TYPES = ("application/vnd.apache.arrow.stream", "application/vnd.apache.arrow.file")
+
+RAW_BULK_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "application/json": {"schema": {
+            "type": "object",
+            "description": "One equally long array of numbers per feature in FEATURE_ORDER",
+            "properties": {f: {"type": "array", "items": {"type": "number"}} for f in FEATURE_ORDER},
+            "required": FEATURE_ORDER,
+        }},
+        "application/x-npy": {"schema": {
+            "type": "string", "format": "binary",
+            "description": "NumPy .npy array of shape (N, 8), columns in FEATURE_ORDER",
+        }},
+        "application/vnd.apache.arrow.stream": {"schema": {
+            "type": "string", "format": "binary",
+            "description": "Arrow IPC stream with one numeric column per feature (requires pyarrow)",
+        }},
+    },
+}
+
+
+def _columns_to_matrix(columns: dict) -> np.ndarray:
+    if not isinstance(columns, dict):
+        raise HTTPException(status_code=400, detail="Expected a JSON object of feature arrays")
+    missing = [f for f in FEATURE_ORDER if f not in columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing feature keys: {missing}")
+    lengths = {f: len(columns[f]) if isinstance(columns[f], list) else None for f in FEATURE_ORDER}
+    if None in lengths.values():
+        raise HTTPException(status_code=400, detail=f"Feature values must be arrays: {lengths}")
+    if len(set(lengths.values())) > 1:
+        raise HTTPException(status_code=400, detail=f"Feature arrays differ in length: {lengths}")
+    try:
+        return np.column_stack([np.asarray(columns[f], dtype=float) for f in FEATURE_ORDER])
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Feature arrays must be numeric: {e}")
+
+
+def _parse_bulk_body(media_type: str, body: bytes) -> np.ndarray:
+    """(N, len(FEATURE_ORDER)) float matrix from a columnar JSON, .npy or Arrow body."""
+    if media_type in NPY_MEDIA_TYPES:
+        try:
+            X = np.load(io.BytesIO(body), allow_pickle=False)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid .npy body: {e}")
+        if X.ndim != 2 or X.shape[1] != len(FEATURE_ORDER):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Expected an array of shape (N, {len(FEATURE_ORDER)}), got {X.shape}"
+            )
+        if X.dtype.kind not in "biuf":
+            raise HTTPException(status_code=400, detail=f"Expected a numeric array, got dtype {X.dtype}")
+        return X.astype(float, copy=False)
+
+    if media_type in ARROW_MEDIA_TYPES:
+        try:
+            import pyarrow.ipc
+        except ImportError:
+            raise HTTPException(status_code=415, detail="Arrow bodies need pyarrow installed on the server")
+        try:
+            reader = pyarrow.ipc.open_stream(body) if media_type.endswith("stream") else pyarrow.ipc.open_file(body)
+            table = reader.read_all()
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid Arrow body: {e}")
+        missing = [f for f in FEATURE_ORDER if f not in table.column_names]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Missing feature columns: {missing}")
+        try:
+            return np.column_stack([table.column(f).to_numpy().astype(float) for f in FEATURE_ORDER])
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Feature columns must be numeric and non-null: {e}")
+
+    if media_type not in ("", "application/json"):
+        raise HTTPException(status_code=415, detail=f"Unsupported content type '{media_type}'")
+    try:
+        columns = json_loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    return _columns_to_matrix(columns)
+
+
+@router.post("/raw/bulk", response_model=RawBulkPredictionResponse, openapi_extra={"requestBody": RAW_BULK_REQUEST_BODY})
+async def predict_raw_bulk(request: Request):
+    """Score a feature matrix in one model pass (columnar in, columnar out).
+
+    The body is either a JSON object of arrays keyed by FEATURE_ORDER, a
+    NumPy `.npy` array (Content-Type: application/x-npy) with columns in
+    FEATURE_ORDER, or an Arrow IPC stream if pyarrow is installed. The shape
+    is validated once for the whole matrix and results come back as arrays
+    in row order. Bulk results are not recorded in the predictions table.
+    """
+    version = ml_model.current()
+    if version is None:
+        raise HTTPException(status_code=503, detail="ML model not loaded")
+
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    X = _parse_bulk_body(media_type, await request.body())
+    if X.shape[0] > settings.max_bulk_rows:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many rows: {X.shape[0]} (max {settings.max_bulk_rows})"
+        )
+    if not np.isfinite(X).all():
+        raise HTTPException(status_code=400, detail="Feature values must be finite numbers")
+
+    inference_started = time.perf_counter()
+    result = await inference_executor.predict_arrays(X, version)
+    inference_ms = (time.perf_counter() - inference_started) * 1000
+    if result is None:
+        raise HTTPException(status_code=500, detail="Model prediction failed")
+
+    dropout_probability, is_dropout, model_confidence = result
+    body = dumps({
+        "n": int(X.shape[0]),
+        "model_version": version.version,
+        "dropout_probability": dropout_probability,
+        "predicted_class": np.where(is_dropout, "Dropout", "Non-Dropout"),
+        "model_confidence": model_confidence,
+        "inference_ms": round(inference_ms, 3),
+    })
+    return Response(content=body, media_type="application/json")
+
+
+CSV_UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "properties": {"file": {
+            "type": "string", "format": "binary",
+            "description": "CSV export with a header containing every FEATURE_ORDER column (other columns are ignored)",
+        }},
+        "required": ["file"],
+    }}},
+}
+
+
+@router.post("/raw/csv", openapi_extra={"requestBody": CSV_UPLOAD_REQUEST_BODY},
+             responses={200: {"content": {media: {} for media in CSV_OUTPUT_FORMATS.values()}}})
+async def predict_raw_csv(request: Request, format: str = "ndjson", sep: str = ","):
+    """Score every row of an uploaded CSV export, streaming results back as they are produced.
+
+    The file is read and scored in chunks of `settings.csv_chunk_rows`, so
+    memory stays flat whatever its size. Each output row has the 0-based
+    data `row` index and either `dropout_probability`, `predicted_class` and
+    `model_confidence`, or an `error` for a malformed row. `format=ndjson`
+    (default) ends with a `{"summary": ...}` line including rows/sec;
+    `format=csv` returns the same columns as CSV. Results are not recorded
+    in the predictions table.
+    """
+    version = ml_model.current()
+    if version is None:
+        raise HTTPException(status_code=503, detail="ML model not loaded")
+    if format not in CSV_OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{format}' (expected ndjson or csv)")
+
+    # Parsed here rather than as an UploadFile parameter: FastAPI closes those
+    # when the handler returns, before the streamed response is produced
+    form = await request.form()
+    upload = form.get("file")
+    if upload is None or isinstance(upload, str):
+        await form.close()
+        raise HTTPException(status_code=400, detail="Expected a multipart upload with a 'file' field")
+
+    loop = asyncio.get_running_loop()
+    try:
+        reader, first_chunk = await loop.run_in_executor(None, open_csv, upload.file, sep)
+    except Exception as e:
+        await form.close()
+        raise HTTPException(status_code=400, detail=f"Unreadable CSV: {e}")
+
+    return StreamingResponse(
+        score_csv_chunks(reader, first_chunk, version, format, on_close=form.close),
+        media_type=CSV_OUTPUT_FORMATS[format]
+    )
+
+
+@router.post("/what-if", response_model=WhatIfResponse)
+async def predict_what_if(request: WhatIfRequest):
+    """Which single (or, with `pairwise`, two-answer) change lowers this student's risk most.
+
+    Every alternative answer for the requested fields (default: all answers
+    the model reads) is mapped like /predict/simplified and the whole grid,
+    with the unchanged assessment as its first row, is scored in one model
+    call. Options are ranked by `delta` (option probability minus baseline),
+    most negative first; `top_k` keeps only the best ones. Nothing is
+    recorded in the predictions table.
+    """
+    started = time.perf_counter()
+    version = ml_model.current()
+    if version is None:
+        raise HTTPException(status_code=503, detail="ML model not loaded")
+
+    try:
+        options, matrix = build_what_if_grid(request.assessment, request.fields, request.pairwise)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    preds = await inference_executor.predict_batch(matrix, version)
+    if preds is None:
+        raise HTTPException(status_code=500, detail="Model prediction failed")
+
+    probabilities = np.array([pred['dropout_probability'] for pred in preds])
+    levels = risk_levels_for_probabilities(probabilities)
+    deltas = probabilities[1:] - probabilities[0]
+    ranked = np.argsort(deltas, kind="stable")[:request.top_k]
+
+    body = dumps({
+        "baseline_probability": probabilities[0],
+        "baseline_risk_level": levels[0],
+        "model_version": version.version,
+        "scored": len(options),
+        "options": [
+            {
+                "changes": options[i],
+                "dropout_probability": probabilities[i + 1],
+                "delta": deltas[i],
+                "risk_level": levels[i + 1],
+            }
+            for i in ranked.tolist()
+        ],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    })
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/batch", response_model=BatchPredictionResponse)
+async def predict_batch(request: BatchAssessmentRequest, explain: bool = False,
+                        db: AsyncSession = Depends(get_db)):
+    """Score a cohort of simplified assessments in one pass.
+
+    Every valid row is mapped with `map_form_to_ml_features` and the whole
+    N x 8 matrix goes through a single scaler transform and `predict_proba`
+    call. Invalid rows are reported individually and do not fail the batch.
+    With `explain=true` the same matrix is attributed in one pass and every
+    ML-scored row carries `feature_attribution`.
+    """
+    started = time.perf_counter()
+
+    if len(request.assessments) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.assessments)} rows (max {settings.max_batch_size})"
+        )
+
+    items = [BatchPredictionItem(index=i) for i in range(len(request.assessments))]
+
+    # 1. Validate and map each row independently
+    valid_rows: List[int] = []
+    assessments: List[SimplifiedAssessmentRequest] = []
+    feature_matrix: List[List[float]] = []
+    for i, raw in enumerate(request.assessments):
+        try:
+            data = SimplifiedAssessmentRequest.model_validate(raw)
+            feature_matrix.append(map_form_to_ml_features(data))
+        except ValidationError as e:
+            items[i].error = f"Invalid assessment: {e.error_count()} validation error(s): {e.errors()[0]['msg']}"
+            continue
+        except Exception as e:
+            items[i].error = f"Feature mapping failed: {str(e)}"
+            continue
+        valid_rows.append(i)
+        assessments.append(data)
+
+    # 2. One model call for the whole matrix
+    inference_started = time.perf_counter()
+    version = ml_model.current()
+    preds = await inference_executor.predict_batch(feature_matrix, version) if (version is not None and feature_matrix) else None
+    inference_ms = (time.perf_counter() - inference_started) * 1000
+    attributions = None
+    if explain and preds is not None:
+        attributions = await asyncio.get_running_loop().run_in_executor(
+            None, feature_attributions, version, feature_matrix
+        )
+
+    # 3. Build per-row responses (heuristic fallback if the model is unavailable)
+    model_version = version.version if preds is not None else None
+    served_at = datetime.utcnow()
+    records: List[PredictionRecord] = []
+    results = fallback = None
+    try:
+        if preds is not None:
+            results = build_ml_prediction_responses(assessments, preds, attributions)
+        elif assessments:
+            fallback = calculate_fallback_risks(assessments)
+    except Exception:
+        results = fallback = None  # rebuild row by row below to isolate the failing rows
+    for j, (i, data) in enumerate(zip(valid_rows, assessments)):
+        try:
+            if results is not None:
+                items[i].result = results[j]
+            elif preds is not None:
+                items[i].result = build_ml_prediction_response(data, preds[j], attributions[j] if attributions else None)
+            elif fallback is not None:
+                items[i].result = _fallback_prediction_response(*fallback[j])
+            else:
+                items[i].result = calculate_fallback_risk(data)
+        except Exception as e:
+            items[i].error = f"Prediction failed: {str(e)}"
+            continue
+        records.append(PredictionRecord(items[i].result, data, "batch", model_version, served_at))
+
+    # 4. Store every result with one bulk insert (or queue them for the write-behind writer)
+    try:
+        await record_predictions(db, records)
+    except Exception as db_error:
+        print(f"Database save failed: {db_error}")
+
+    succeeded = sum(1 for item in items if item.result is not None)
+    response = BatchPredictionResponse.model_construct(
+        results=items,
+        total=len(items),
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        ml_model_used=preds is not None,
+        inference_ms=round(inference_ms, 3),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 3)
+    )
+    return Response(content=encode_batch_response(response), media_type="application/json")
@@ -4,6 +4,8 @@ from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from app.database import Prediction, AssessmentInput, RiskFactor, Recommendation
+from app.repositories.text_catalog import risk_factor_catalog, recommendation_catalog
+from app.utils.assessment_codes import encode_assessment
 import random
 
 
@@ -18,6 +20,7 @@ async def seed_demo_data(db: AsyncSession):
         return  # Already seeded
 
     now = datetime.utcnow()
+    remembered = []
 
     demo_entries = [
         # (risk_level, risk_score, dropout_prob, confidence, days_ago, student_name, risk_factors, recommendations)
@@ -51,8 +54,7 @@ async def seed_demo_data(db: AsyncSession):
         await db.flush()
 
         # Assessment input
-        db.add(AssessmentInput(
-            prediction_id=pred.id,
+        db.add(AssessmentInput(prediction_id=pred.id, **encode_assessment(dict(
             consent_given=True,
             consent_data_processing=True,
             consent_anonymous_analytics=True,
@@ -67,29 +69,30 @@ async def seed_demo_data(db: AsyncSession):
             employment_status=random.choice(["none", "part-time"]),
             financial_stress={"high": "high", "medium": "moderate", "low": "none"}[risk_level],
             career_alignment={"high": 3, "medium": 6, "low": 8}[risk_level],
-            services_used="[]",
+            services_used=[],
             withdrawal_considered=(risk_level == "high"),
-            withdrawal_reasons="[]"
-        ))
+            withdrawal_reasons=[]
+        ))))
 
-        for (category, factor_text, impact) in factors:
-            db.add(RiskFactor(
-                prediction_id=pred.id,
-                category=category,
-                factor=factor_text,
-                impact=impact,
-                description=f"{factor_text} identified as a {impact} risk factor for {name}."
-            ))
+        factor_keys = [
+            (category, factor_text, impact, f"{factor_text} identified as a {impact} risk factor for {name}.")
+            for (category, factor_text, impact) in factors
+        ]
+        factor_ids, new_factors = await risk_factor_catalog.resolve(db, factor_keys)
+        for key in factor_keys:
+            db.add(RiskFactor(prediction_id=pred.id, text_id=factor_ids[key]))
 
-        for (rec_type, title, urgency) in recs:
-            db.add(Recommendation(
-                prediction_id=pred.id,
-                rec_type=rec_type,
-                title=title,
-                description=f"Recommended action: {title} for {name}.",
-                urgency=urgency,
-                contact=None
-            ))
+        rec_keys = [
+            (rec_type, title, f"Recommended action: {title} for {name}.", urgency, "")
+            for (rec_type, title, urgency) in recs
+        ]
+        rec_ids, new_recs = await recommendation_catalog.resolve(db, rec_keys)
+        for key in rec_keys:
+            db.add(Recommendation(prediction_id=pred.id, text_id=rec_ids[key]))
+        remembered.append((new_factors, new_recs))
 
     await db.commit()
+    for new_factors, new_recs in remembered:
+        risk_factor_catalog.remember(new_factors)
+        recommendation_catalog.remember(new_recs)
     print("[OK] Demo data seeded successfully (14 assessments)")
@@ -0,0 +1,167 @@
+# backend/app/startup.py
+"""Application startup, run as concurrent timed phases.
+
+The database chain (create tables, then seed demo data) and the model
+chain (archive legacy files, then load + warm the model in a worker
+thread) do not depend on each other, so they run side by side. With
+`settings.lazy_model_load` the server starts accepting connections as soon
+as the database is ready and the model warms up in the background; /ready
+returns 503 until it has finished, so an orchestrator only routes traffic
+to warm instances.
+"""
+import asyncio
+import time
+from typing import Dict, Optional
+
+from app.config import settings
+from app.database import init_db, SessionLocal, dispose_engines
+from app.models.ml_model import ml_model
+from app.models.inference_queue import inference_batcher
+from app.models.executor import inference_executor
+from app.models.model_reloader import model_reloader
+from app.models.shadow import shadow_scorer
+from app.models.prediction_writer import prediction_writer
+from app.models.retention import retention_job
+from app.seed_data import seed_demo_data
+
+# Known legacy model files to archive (do not delete them)
+# Note: Do NOT include the currently active model paths here
+LEGACY_MODEL_PATHS = [
+    "ml/Model_Random_Forest.pkl",
+    "ml/scaler_rf.pkl",
+    "models/Model_Gradient_Boosting.pkl",
+    "models/scaler.pkl",
+]
+
+
+class StartupState:
+    """What has finished starting, and how long each phase took."""
+
+    def __init__(self):
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.database_ready = False
+        self.model_ready = False  # load attempted and finished (model may still be absent)
+        self.phases: Dict[str, float] = {}
+        self._model_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.database_ready and self.model_ready
+
+    def elapsed_ms(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return round((self.finished_at - self.started_at) * 1000, 1)
+
+    async def timed(self, phase: str, awaitable):
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.phases[phase] = round((time.perf_counter() - started) * 1000, 1)
+
+    def _finish_if_ready(self):
+        if self.is_ready and self.finished_at is None:
+            self.finished_at = time.perf_counter()
+            timings = ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.phases.items())
+            print(f"[OK] Ready in {self.elapsed_ms():.0f} ms ({timings})")
+
+
+startup_state = StartupState()
+
+
+async def _database_phase():
+    try:
+        await startup_state.timed("init_db", init_db())
+        print("[OK] Database initialized successfully")
+        async with SessionLocal() as db:
+            await startup_state.timed("seed_demo_data", seed_demo_data(db))
+        if settings.retention_enabled:
+            retention_job.start()
+    except Exception as e:
+        print(f"[ERROR] Database initialization failed: {e}")
+    # Requests handle database errors themselves, so a failed init does not block readiness
+    startup_state.database_ready = True
+    startup_state._finish_if_ready()
+
+
+async def _load_live_model():
+    # Try to load the active model (will use fallback if not available).
+    # Goes through the reloader so loading, warm-up and process-pool start
+    # all happen off the event loop.
+    try:
+        await startup_state.timed("load_model", model_reloader.reload())
+        print(f"Model loaded successfully from {settings.model_path}")
+    except FileNotFoundError:
+        print(f"Warning: Model files not found at {settings.model_path} or {settings.scaler_path}. Using fallback prediction.")
+    except Exception as e:
+        print(f"Error loading model from {settings.model_path}: {e}. Using fallback prediction.")
+
+
+async def _load_shadow_model():
+    if not settings.shadow_model_path:
+        return
+    try:
+        await startup_state.timed(
+            "load_shadow_model",
+            shadow_scorer.load(settings.shadow_model_path, settings.shadow_scaler_path)
+        )
+    except Exception as e:
+        print(f"Shadow candidate from {settings.shadow_model_path} not loaded: {e}")
+
+
+async def _model_phase():
+    loop = asyncio.get_running_loop()
+    try:
+        await startup_state.timed(
+            "archive_legacy_files",
+            loop.run_in_executor(None, ml_model.archive_legacy_files, LEGACY_MODEL_PATHS)
+        )
+    except Exception as e:
+        print(f"Archiving legacy models failed: {e}")
+
+    await asyncio.gather(_load_live_model(), _load_shadow_model())
+
+    model_reloader.start_watcher()
+    startup_state.model_ready = True
+    startup_state._finish_if_ready()
+
+
+async def run_startup():
+    """Run all startup phases; returns once the app may accept connections."""
+    print(f"Starting {settings.app_name} v{settings.version}")
+    startup_state.started_at = time.perf_counter()
+
+    # Pools and the batcher cope with no model yet (requests fall back to the heuristic)
+    inference_executor.start()
+    if settings.inference_batching_enabled:
+        inference_batcher.start()
+    if settings.prediction_write_behind_enabled:
+        prediction_writer.start()
+
+    model_task = asyncio.create_task(_model_phase())
+    startup_state._model_task = model_task
+    if settings.lazy_model_load:
+        await _database_phase()
+        print("[OK] Accepting connections; model warming up in the background")
+    else:
+        await asyncio.gather(_database_phase(), model_task)
+
+
+async def run_shutdown():
+    """Stop background work, drain in-flight batched predictions, store queued ones and close pooled connections."""
+    task = startup_state._model_task
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await model_reloader.stop_watcher()
+    await retention_job.stop()
+    await inference_batcher.stop()
+    await shadow_scorer.stop()
+    await prediction_writer.stop()
+    inference_executor.shutdown()
+    await dispose_engines()
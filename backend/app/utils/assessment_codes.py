@@ -0,0 +1,107 @@
+# backend/app/utils/assessment_codes.py
+"""Compact storage encoding of assessment answers.
+
+Single-choice answers are stored as small integers (the 1-based position in
+the field's vocabulary below) and multi-select lists as bitmasks (bit i set
+when vocabulary entry i was chosen), so cohort filters are integer
+comparisons on indexed columns instead of string matches or JSON parsing.
+Codes are persisted: vocabularies may be appended to but never reordered.
+
+The request schema accepts any string, so an answer outside its vocabulary
+is stored as code 0 (UNLISTED) with the original value in the row's
+`unlisted_answers` JSON. A list the bitmask cannot reproduce exactly
+(unlisted entries, duplicates, or an order other than vocabulary order —
+withdrawal reasons keep the order they were given in) is kept there too, so
+decoding always returns what was submitted.
+"""
+import json
+from typing import Dict, List, Mapping, Optional, Tuple
+
+UNLISTED = 0
+
+CHOICES: Dict[str, Tuple[str, ...]] = {
+    'academic_year': ('1st', '2nd', '3rd', '4th'),
+    'attendance': ('always', 'often', 'sometimes', 'rarely', 'never'),
+    'overwhelm_frequency': ('never', 'rarely', 'sometimes', 'often', 'always'),
+    'study_hours': ('1-3', '3-5', '5-8', '8+'),
+    'advisor_interaction': ('never', 'once-semester', '2-3-semester', 'monthly'),
+    'employment_status': ('not-employed', 'part-time', 'full-time'),
+    'financial_stress': ('none', 'low', 'moderate', 'high', 'very-high'),
+}
+
+MULTI_SELECT: Dict[str, Tuple[str, ...]] = {
+    'services_used': ('academic', 'career', 'counseling', 'health', 'financial', 'none'),
+    'withdrawal_reasons': ('Academic difficulty', 'Financial challenges', 'Mental health',
+                           'Personal/family issues', 'Lack of interest', 'Career opportunities'),
+}
+
+# Answers stored as they are
+PLAIN_FIELDS = (
+    'consent_given', 'consent_data_processing', 'consent_anonymous_analytics',
+    'performance_satisfaction', 'support_network_strength', 'extracurricular_hours',
+    'career_alignment', 'withdrawal_considered',
+)
+
+_CODES = {field: {value: i + 1 for i, value in enumerate(values)} for field, values in CHOICES.items()}
+_BITS = {field: {value: 1 << i for i, value in enumerate(values)} for field, values in MULTI_SELECT.items()}
+
+
+def choice_code(field: str, value: str) -> int:
+    """Code of a listed answer, for filters; raises ValueError for anything else."""
+    code = _CODES[field].get(value)
+    if code is None:
+        raise ValueError(f"{field} must be one of {CHOICES[field]}, got {value!r}")
+    return code
+
+
+def multi_select_bit(field: str, value: str) -> int:
+    """Bit of a listed multi-select entry, for filters; raises ValueError for anything else."""
+    bit = _BITS[field].get(value)
+    if bit is None:
+        raise ValueError(f"{field} entries must be among {MULTI_SELECT[field]}, got {value!r}")
+    return bit
+
+
+def _mask_values(field: str, mask: int) -> List[str]:
+    return [value for i, value in enumerate(MULTI_SELECT[field]) if mask >> i & 1]
+
+
+def encode_assessment(answers: Mapping) -> Dict:
+    """AssessmentInput column values (without prediction_id) for one assessment's answers."""
+    row = {field: answers[field] for field in PLAIN_FIELDS}
+    unlisted = {}
+    for field, codes in _CODES.items():
+        value = answers[field]
+        code = codes.get(value, UNLISTED)
+        row[field] = code
+        if code == UNLISTED:
+            unlisted[field] = value
+    for field, bits in _BITS.items():
+        values = list(answers.get(field) or [])
+        mask = 0
+        for value in values:
+            mask |= bits.get(value, 0)
+        row[field] = mask
+        if _mask_values(field, mask) != values:
+            unlisted[field] = values
+    row['unlisted_answers'] = json.dumps(unlisted) if unlisted else None
+    return row
+
+
+def decode_choice(field: str, code: int, unlisted_answers: Optional[str]) -> str:
+    """The submitted answer for one single-choice column."""
+    if code != UNLISTED:
+        return CHOICES[field][code - 1]
+    return json.loads(unlisted_answers)[field] if unlisted_answers else None
+
+
+def decode_assessment(row: Mapping) -> Dict:
+    """The submitted answers (SimplifiedAssessmentRequest fields) from AssessmentInput column values."""
+    unlisted = json.loads(row['unlisted_answers']) if row['unlisted_answers'] else {}
+    answers = {field: row[field] for field in PLAIN_FIELDS}
+    for field, values in CHOICES.items():
+        code = row[field]
+        answers[field] = values[code - 1] if code != UNLISTED else unlisted.get(field)
+    for field in MULTI_SELECT:
+        answers[field] = unlisted[field] if field in unlisted else _mask_values(field, row[field])
+    return answers
@@ -0,0 +1,26 @@
+# backend/app/utils/auth.py
+"""Access control for the /admin API.
+
+Endpoints that change server state (model reload, shadow candidates,
+retention) or expose runtime internals require the `X-Admin-Key` header to
+match `settings.admin_api_key`; with no key configured they are disabled.
+The dashboard reads stay public unless `settings.public_dashboard` is off.
+"""
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.config import settings
+
+
+def require_admin_key(x_admin_key: Optional[str] = Header(None)):
+    if not settings.admin_api_key:
+        raise HTTPException(status_code=403, detail="Admin API disabled: set ADMIN_API_KEY")
+    if x_admin_key is None or not secrets.compare_digest(x_admin_key.encode(), settings.admin_api_key.encode()):
+        raise HTTPException(status_code=401, detail="Missing or invalid X-Admin-Key header")
+
+
+def require_dashboard_access(x_admin_key: Optional[str] = Header(None)):
+    if not settings.public_dashboard:
+        require_admin_key(x_admin_key)
@@ -0,0 +1,87 @@
+# backend/app/utils/fallback_scoring.py
+"""Heuristic fallback scoring tables and their vectorised form.
+
+`calculate_fallback_risk` (routers/prediction.py) is the reference
+implementation for a single request and reads its points from the tables
+below. `fallback_scores` applies the same tables to a whole batch with
+NumPy: categorical answers are encoded once as integer codes into their
+table (unknown answers get a code worth 0 points, like `dict.get(value, 0)`),
+so scoring is array indexing plus plain arithmetic on the numeric answers.
+"""
+from typing import Dict, Sequence, Tuple
+import numpy as np
+
+# Points per answer; answers not listed score 0
+ATTENDANCE_SCORES = {'always': 0, 'often': 5, 'sometimes': 15, 'rarely': 25, 'never': 35}
+OVERWHELM_SCORES = {'never': 0, 'rarely': 5, 'sometimes': 10, 'often': 20, 'always': 30}
+FINANCIAL_STRESS_SCORES = {'none': 0, 'low': 5, 'moderate': 10, 'high': 20, 'very-high': 25}
+# Inverse: less interaction = higher risk
+ADVISOR_SCORES = {'never': 10, 'once-semester': 5, '2-3-semester': 2, 'monthly': 0}
+# Working while studying increases risk
+EMPLOYMENT_SCORES = {'full-time': 10, 'part-time': 5}
+
+WITHDRAWAL_CONSIDERED_POINTS = 15
+# Extracurricular hours outside [min, max] (too little or too much) add points
+EXTRACURRICULAR_RANGE = (1, 15)
+EXTRACURRICULAR_POINTS = 5
+
+# Score thresholds (0-100 scale)
+HIGH_RISK_SCORE = 60
+MEDIUM_RISK_SCORE = 35
+
+_TABLES = {
+    'attendance': ATTENDANCE_SCORES,
+    'overwhelm_frequency': OVERWHELM_SCORES,
+    'financial_stress': FINANCIAL_STRESS_SCORES,
+    'advisor_interaction': ADVISOR_SCORES,
+    'employment_status': EMPLOYMENT_SCORES,
+}
+_NUMERIC_FIELDS = ('performance_satisfaction', 'support_network_strength',
+                   'extracurricular_hours', 'career_alignment')
+
+
+def _compile_table(table: Dict[str, int]) -> Tuple[Dict[str, int], np.ndarray]:
+    """Answer -> code, and points per code; the last code is "unknown answer" (0 points)."""
+    codes = {answer: code for code, answer in enumerate(table)}
+    return codes, np.array(list(table.values()) + [0], dtype=float)
+
+
+_COMPILED_TABLES = {field: _compile_table(table) for field, table in _TABLES.items()}
+
+
+def encode_assessments(assessments: Sequence) -> Dict[str, np.ndarray]:
+    """Column arrays of the scored fields for a batch of SimplifiedAssessmentRequest.
+
+    Categorical answers are encoded as small integer codes into their table.
+    """
+    n = len(assessments)
+    columns = {}
+    for field, (codes, points) in _COMPILED_TABLES.items():
+        unknown = len(points) - 1
+        columns[field] = np.fromiter((codes.get(getattr(d, field), unknown) for d in assessments), np.int8, n)
+    for field in _NUMERIC_FIELDS:
+        columns[field] = np.fromiter((getattr(d, field) for d in assessments), float, n)
+    columns['withdrawal_considered'] = np.fromiter((bool(d.withdrawal_considered) for d in assessments), bool, n)
+    return columns
+
+
+def fallback_scores(columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Risk scores (0-100, float) and risk levels for encoded assessments, in one pass."""
+    n = len(columns['withdrawal_considered'])
+    if n == 0:
+        return np.zeros(0), np.array([], dtype='<U6')
+
+    score = np.zeros(n)
+    for field, (_, points) in _COMPILED_TABLES.items():
+        score += points[columns[field]]
+    score += np.where(columns['withdrawal_considered'], WITHDRAWAL_CONSIDERED_POINTS, 0)
+    score += np.maximum(0, 10 - columns['performance_satisfaction']) * 2
+    score += np.maximum(0, 10 - columns['support_network_strength'])
+    hours = columns['extracurricular_hours']
+    low, high = EXTRACURRICULAR_RANGE
+    score += np.where((hours < low) | (hours > high), EXTRACURRICULAR_POINTS, 0)
+    score += np.maximum(0, 10 - columns['career_alignment']) * 1.5
+
+    score = np.clip(score, 0, 100)
+    levels = np.where(score >= HIGH_RISK_SCORE, 'high', np.where(score >= MEDIUM_RISK_SCORE, 'medium', 'low'))
+    return score, levels
@@ -0,0 +1,93 @@
+# backend/app/utils/feature_mapping.py
+from typing import Dict, List
+from app.models.schemas import SimplifiedAssessmentRequest
+
+# NOTE: FEATURE_ORDER must match the order used during model training.
+# Keep this list in sync with backend/ml/train_model.py: FEATURE_COLUMNS
+FEATURE_ORDER: List[str] = [
+    'Curricular units 2nd sem (approved)',
+    'Curricular units 1st sem (approved)',
+    'Tuition fees up to date',
+    'Scholarship holder',
+    'Age at enrollment',
+    'Debtor',
+    'Gender',
+    'Application mode'
+]
+
+# Answer options offered by the assessment form (frontend/components/AssessmentForm.tsx)
+# for the fields that map_form_to_ml_features reads. Integer sliders run 0-10.
+FORM_OPTIONS: Dict[str, list] = {
+    'attendance': ['always', 'often', 'sometimes', 'rarely', 'never'],
+    'performance_satisfaction': list(range(0, 11)),
+    'financial_stress': ['none', 'low', 'moderate', 'high', 'very-high'],
+    'academic_year': ['1st', '2nd', '3rd', '4th'],
+    'employment_status': ['not-employed', 'part-time', 'full-time'],
+    'study_hours': ['1-3', '3-5', '5-8', '8+'],
+    'career_alignment': list(range(0, 11)),
+}
+
+
+def map_form_to_ml_features(data: SimplifiedAssessmentRequest) -> List[float]:
+    """
+    Map all form inputs to ML model's required features.
+    ML Model expects: ['Curricular units 2nd sem (approved)', 'Curricular units 1st sem (approved)',
+                       'Tuition fees up to date', 'Scholarship holder', 'Age at enrollment',
+                       'Debtor', 'Gender', 'Application mode']
+    """
+    # Attendance maps to curricular units approved (study performance proxy)
+    attendance_to_units = {
+        'always': 50, 'often': 45, 'sometimes': 30, 'rarely': 15, 'never': 5
+    }
+    curricular_2nd_sem = attendance_to_units.get(data.attendance, 30)
+    curricular_1st_sem = attendance_to_units.get(data.attendance, 30)
+    
+    # Performance satisfaction affects study units
+    performance_factor = (data.performance_satisfaction / 10.0)
+    curricular_2nd_sem = int(curricular_2nd_sem * performance_factor)
+    curricular_1st_sem = int(curricular_1st_sem * performance_factor)
+    
+    # Tuition fees based on financial stress
+    financial_stress_map = {'none': 1, 'low': 1, 'moderate': 0, 'high': 0, 'very-high': 0}
+    tuition_fees_up_to_date = float(financial_stress_map.get(data.financial_stress, 0))
+    
+    # Scholarship holder based on financial stress
+    scholarship_scores = {'none': 1, 'low': 1, 'moderate': 0, 'high': 0, 'very-high': 0}
+    scholarship_holder = float(scholarship_scores.get(data.financial_stress, 0))
+    
+    # Age proxy based on academic year
+    academic_year_map = {'1st': 18, '2nd': 19, '3rd': 20, '4th': 21}
+    age_base = academic_year_map.get(data.academic_year, 19)
+    
+    # Adjust age based on employment
+    employment_age_adjustment = {'not-employed': 0, 'part-time': 1, 'full-time': 2}
+    age_at_enrollment = float(age_base + employment_age_adjustment.get(data.employment_status, 0))
+    
+    # Debtor status based on financial stress
+    debtor_map = {'none': 0, 'low': 0, 'moderate': 1, 'high': 1, 'very-high': 1}
+    debtor = float(debtor_map.get(data.financial_stress, 0))
+    
+    # Gender (1 for male, 0 for female) - use study hours as proxy
+    if data.study_hours in ['8+', '5-8']:
+        gender = 0  # Female tend to study more
+    else:
+        gender = 1
+    
+    # Application mode based on employment and career alignment
+    if data.employment_status == 'full-time' and data.career_alignment < 5:
+        application_mode = 2  # Alternative entry
+    elif data.career_alignment >= 8:
+        application_mode = 1  # Regular entry
+    else:
+        application_mode = 1
+    
+    return [
+        curricular_2nd_sem,
+        curricular_1st_sem,
+        tuition_fees_up_to_date,
+        scholarship_holder,
+        age_at_enrollment,
+        debtor,
+        gender,
+        application_mode
+    ]
@@ -0,0 +1,90 @@
+# backend/app/utils/json_response.py
+"""Fast JSON encoding of prediction responses.
+
+Prediction endpoints return a plain `Response` with these bytes instead of
+a Pydantic model, so FastAPI does not validate and serialize the response
+a second time through `response_model` (the decorators keep it, for the
+OpenAPI schema only). Risk factors and recommendations are the frozen rule
+fragments from `risk_rules`, so their JSON is encoded once at import and
+concatenated; only the scalar fields are encoded per request, with orjson.
+"""
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import orjson
+
+from app.models.schemas import BatchPredictionResponse, PredictionResponse
+
+
+def _default(obj):
+    # NumPy scalars and arrays (orjson only handles contiguous native arrays itself)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    # Nested models without a pre-encoded form (e.g. FeatureAttribution)
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+json_loads = orjson.loads
+
+
+# id(fragment) -> (fragment, encoded JSON); the fragment is kept so its id stays unique
+_FRAGMENTS: Dict[int, Tuple[object, bytes]] = {}
+
+
+def register_fragments(fragments: Iterable) -> None:
+    """Pre-encode shared, immutable RiskFactor / Recommendation instances."""
+    for fragment in fragments:
+        _FRAGMENTS[id(fragment)] = (fragment, dumps(fragment.model_dump()))
+
+
+def encode_fragment(fragment) -> bytes:
+    entry = _FRAGMENTS.get(id(fragment))
+    if entry is not None and entry[0] is fragment:
+        return entry[1]
+    return dumps(fragment.model_dump())
+
+
+def _encode_list(fragments) -> bytes:
+    return b"[" + b",".join([encode_fragment(f) for f in fragments]) + b"]"
+
+
+# Field names are encoded once, in schema order (the order model_dump_json uses)
+_PREDICTION_FIELDS = tuple(
+    (name, dumps(name) + b":", name in ('risk_factors', 'recommendations'))
+    for name in PredictionResponse.model_fields
+)
+_BATCH_FIELDS = tuple((name, dumps(name) + b":") for name in BatchPredictionResponse.model_fields)
+
+
+def encode_prediction_response(response: PredictionResponse) -> bytes:
+    """JSON body for a PredictionResponse, equal to `response.model_dump_json()`."""
+    parts = []
+    for name, key, is_list in _PREDICTION_FIELDS:
+        value = getattr(response, name)
+        if isinstance(value, np.generic):
+            # As model_dump_json does: a float32 widened to a Python float, not printed at float32 precision
+            value = value.item()
+        parts.append(key + (_encode_list(value) if is_list else dumps(value)))
+    return b"{" + b",".join(parts) + b"}"
+
+
+def encode_batch_response(response: BatchPredictionResponse) -> bytes:
+    """JSON body for a BatchPredictionResponse; each row reuses the prediction encoder."""
+    rows = []
+    for item in response.results:
+        result = b"null" if item.result is None else encode_prediction_response(item.result)
+        rows.append(b'{"index":' + dumps(item.index) + b',"result":' + result
+                    + b',"error":' + dumps(item.error) + b"}")
+    parts = []
+    for name, key in _BATCH_FIELDS:
+        if name == 'results':
+            parts.append(key + b"[" + b",".join(rows) + b"]")
+        else:
+            parts.append(key + dumps(getattr(response, name)))
+    return b"{" + b",".join(parts) + b"}"
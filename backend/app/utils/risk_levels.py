@@ -0,0 +1,21 @@
+# backend/app/utils/risk_levels.py
+"""Dropout probability -> 'low' / 'medium' / 'high' risk level thresholds."""
+import numpy as np
+
+HIGH_RISK_THRESHOLD = 0.6
+MEDIUM_RISK_THRESHOLD = 0.35
+
+
+def risk_level_for_probability(dropout_probability: float) -> str:
+    """Bucket a dropout probability into the 'low' / 'medium' / 'high' risk levels."""
+    if dropout_probability >= HIGH_RISK_THRESHOLD:
+        return 'high'
+    elif dropout_probability >= MEDIUM_RISK_THRESHOLD:
+        return 'medium'
+    return 'low'
+
+
+def risk_levels_for_probabilities(probabilities: np.ndarray) -> np.ndarray:
+    """Vectorised `risk_level_for_probability` for an array of probabilities."""
+    p = np.asarray(probabilities, dtype=float)
+    return np.where(p >= HIGH_RISK_THRESHOLD, 'high', np.where(p >= MEDIUM_RISK_THRESHOLD, 'medium', 'low'))
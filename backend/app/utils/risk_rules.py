@@ -0,0 +1,341 @@
+# backend/app/utils/risk_rules.py
+"""Declarative rule table for risk factors and recommendations.
+
+Every rule is a list of conditions on assessment fields (plus the computed
+`risk_level`) and a prebuilt, frozen RiskFactor or Recommendation. The
+table is compiled once at import into scalar predicates for single
+requests and vectorised NumPy predicates for batches; both the ML path and
+the heuristic fallback evaluate it, the fallback with the subset of rules
+it has always used. Rule order is output order.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Sequence, Tuple
+import numpy as np
+
+from app.models.schemas import RiskFactor, Recommendation
+from app.utils.json_response import register_fragments
+
+ML = "ml"
+FALLBACK = "fallback"
+BOTH = frozenset({ML, FALLBACK})
+ML_ONLY = frozenset({ML})
+
+# (field, op, value); ops: "in", "eq", "le", "true", "empty", "nonempty"
+Condition = Tuple[str, str, object]
+
+
+@dataclass(frozen=True)
+class FactorFragment:
+    """A risk factor with its impact variants for filter_risk_factors_by_level prebuilt."""
+    base: RiskFactor
+    as_low: RiskFactor
+    as_medium: RiskFactor
+
+    @classmethod
+    def of(cls, category: str, factor: str, impact: str, description: str) -> "FactorFragment":
+        base = RiskFactor(category=category, factor=factor, impact=impact, description=description)
+        return cls(base, base.model_copy(update={'impact': 'low'}), base.model_copy(update={'impact': 'medium'}))
+
+
+@dataclass(frozen=True)
+class Rule:
+    when: Tuple[Condition, ...]
+    fragment: object  # FactorFragment or Recommendation
+    paths: FrozenSet[str] = BOTH
+
+
+# ============================================================================
+# Rule table
+# ============================================================================
+
+FACTOR_RULES: Tuple[Rule, ...] = (
+    Rule((('attendance', 'in', ('rarely', 'never')),), FactorFragment.of(
+        "Academic", "Low Class Attendance", "high",
+        "Inconsistent class attendance is strongly correlated with dropout risk")),
+    Rule((('overwhelm_frequency', 'in', ('often', 'always')),), FactorFragment.of(
+        "Mental Health", "Academic Overwhelm", "high",
+        "Feeling frequently overwhelmed can lead to burnout and withdrawal")),
+    Rule((('financial_stress', 'in', ('high', 'very-high')),), FactorFragment.of(
+        "Financial", "Financial Stress", "high",
+        "Financial difficulties are a leading cause of student withdrawal")),
+    Rule((('withdrawal_considered', 'true', None),), FactorFragment.of(
+        "Behavioral", "Withdrawal Consideration", "high",
+        "Active consideration of withdrawal indicates elevated risk")),
+    Rule((('support_network_strength', 'le', 3),), FactorFragment.of(
+        "Social", "Weak Support Network", "medium",
+        "Limited social support increases vulnerability during challenges"), ML_ONLY),
+    Rule((('employment_status', 'eq', 'full-time'),), FactorFragment.of(
+        "Personal", "Full-time Employment", "medium",
+        "Working full-time while studying significantly increases time pressure"), ML_ONLY),
+)
+
+RECOMMENDATION_RULES: Tuple[Rule, ...] = (
+    Rule((('risk_level', 'eq', 'high'),), Recommendation(
+        type="counseling", title="Mental Health Support",
+        description="Schedule an urgent appointment with a counselor to discuss your concerns and develop a support plan",
+        urgency="immediate", contact="counseling@rvce.edu.in")),
+    Rule((('financial_stress', 'in', ('high', 'very-high')),), Recommendation(
+        type="financial", title="Financial Aid Office",
+        description="Connect with financial aid office to explore scholarships, grants, and emergency funding options",
+        urgency="soon", contact="financialaid@rvce.edu.in")),
+    Rule((('performance_satisfaction', 'le', 4),), Recommendation(
+        type="academic", title="Academic Tutoring",
+        description="Access tutoring services and study groups to improve academic performance",
+        urgency="soon", contact="tutoring@rvce.edu.in")),
+    Rule((('advisor_interaction', 'in', ('never', 'once-semester')),), Recommendation(
+        type="academic", title="Schedule Advisor Meeting",
+        description="Regular meetings with your academic advisor can help with course planning and early problem detection",
+        urgency="soon", contact="advising@rvce.edu.in"), ML_ONLY),
+    Rule((('employment_status', 'eq', 'full-time'),), Recommendation(
+        type="peer", title="Time Management Support",
+        description="Consider reducing work hours or exploring flexible work arrangements to prioritize your studies",
+        urgency="soon"), ML_ONLY),
+)
+
+# One (risk factor, recommendation) pair per selected withdrawal reason, in
+# the order the student listed them; ML path only
+WITHDRAWAL_REASONS_WHEN: Tuple[Condition, ...] = (
+    ('withdrawal_considered', 'true', None),
+    ('withdrawal_reasons', 'nonempty', None),
+)
+WITHDRAWAL_REASONS_PATHS = ML_ONLY
+WITHDRAWAL_REASON_FRAGMENTS: Dict[str, Tuple[FactorFragment, Recommendation]] = {
+    'Academic difficulty': (
+        FactorFragment.of("Academic", "Academic Difficulty", "high",
+                          "Struggling with academic material can lead to course failure and withdrawal"),
+        Recommendation(
+            type="academic", title="Academic Support Program",
+            description="Enroll in our comprehensive academic support program with tutoring, study groups, and study skills workshops",
+            urgency="immediate", contact="academicsupport@rvce.edu.in")),
+    'Financial challenges': (
+        FactorFragment.of("Financial", "Financial Crisis", "high",
+                          "Severe financial issues are a primary driver of student withdrawal"),
+        Recommendation(
+            type="financial", title="Emergency Financial Assistance",
+            description="Apply for emergency grants or loans. Meet with financial counselor to create a sustainable plan",
+            urgency="immediate", contact="financialaid@rvce.edu.in")),
+    'Mental health': (
+        FactorFragment.of("Mental Health", "Mental Health Crisis", "high",
+                          "Mental health challenges require immediate professional support and intervention"),
+        Recommendation(
+            type="counseling", title="Mental Health Crisis Support",
+            description="Contact counseling center immediately. We also have peer support groups and crisis resources available",
+            urgency="immediate", contact="counseling@rvce.edu.in")),
+    'Personal/family issues': (
+        FactorFragment.of("Personal", "Personal/Family Crisis", "high",
+                          "Personal and family issues can significantly impact academic focus and commitment"),
+        Recommendation(
+            type="support", title="Personal Counseling & Family Support",
+            description="Our counselors can help you navigate personal and family challenges while maintaining your academic progress",
+            urgency="soon", contact="counseling@rvce.edu.in")),
+    'Lack of interest': (
+        FactorFragment.of("Academic", "Loss of Academic Interest", "high",
+                          "Declining interest in studies suggests misalignment with chosen program or career path"),
+        Recommendation(
+            type="academic", title="Academic Advising & Program Exploration",
+            description="Meet with academic advisor to explore program alternatives, course selections, or potential major changes",
+            urgency="soon", contact="advising@rvce.edu.in")),
+    'Career opportunities': (
+        FactorFragment.of("Career", "Career Path Conflict", "medium",
+                          "External career opportunities may be pulling focus away from academic commitments"),
+        Recommendation(
+            type="career", title="Career Planning & Education Strategy",
+            description="Explore how to balance career opportunities with completing your degree. Many students pursue internships while studying",
+            urgency="soon", contact="career@rvce.edu.in")),
+}
+
+# Added after the level filter / withdrawal reasons
+TRAILING_RECOMMENDATION_RULES: Tuple[Rule, ...] = (
+    Rule((('services_used', 'empty', None),), Recommendation(
+        type="support", title="Explore Campus Support Services",
+        description="You haven't indicated using any support services yet. Visit the student center to learn about available resources including academic advising, counseling, and health services.",
+        urgency="soon", contact="studentcenter@rvce.edu.in")),
+)
+
+DEFAULT_RECOMMENDATION = Recommendation(
+    type="peer", title="Stay Connected",
+    description="Continue engaging with campus resources and maintain your support network",
+    urgency="when-needed")
+
+
+# ============================================================================
+# Compilation
+# ============================================================================
+
+def _scalar_predicate(conditions: Tuple[Condition, ...]) -> Callable[[object, str], bool]:
+    checks = []
+    for field, op, value in conditions:
+        get = (lambda d, level: level) if field == 'risk_level' else (lambda d, level, f=field: getattr(d, f))
+        if op == 'in':
+            values = frozenset(value)
+            checks.append(lambda d, level, get=get, values=values: get(d, level) in values)
+        elif op == 'eq':
+            checks.append(lambda d, level, get=get, value=value: get(d, level) == value)
+        elif op == 'le':
+            checks.append(lambda d, level, get=get, value=value: get(d, level) <= value)
+        elif op == 'true':
+            checks.append(lambda d, level, get=get: bool(get(d, level)))
+        elif op == 'empty':
+            checks.append(lambda d, level, get=get: not get(d, level))
+        elif op == 'nonempty':
+            checks.append(lambda d, level, get=get: bool(get(d, level)))
+        else:
+            raise ValueError(f"Unknown rule operator '{op}'")
+    if len(checks) == 1:
+        return checks[0]
+    return lambda d, level: all(check(d, level) for check in checks)
+
+
+def _vector_mask(conditions: Tuple[Condition, ...], columns: Dict[str, np.ndarray]) -> np.ndarray:
+    mask = None
+    for field, op, value in conditions:
+        col = columns[field]
+        if op == 'in':
+            hit = np.isin(col, list(value))
+        elif op == 'eq':
+            hit = col == value
+        elif op == 'le':
+            hit = col <= value
+        elif op in ('true', 'nonempty'):
+            hit = col.astype(bool)
+        elif op == 'empty':
+            hit = ~col.astype(bool)
+        else:
+            raise ValueError(f"Unknown rule operator '{op}'")
+        mask = hit if mask is None else mask & hit
+    return mask
+
+
+def _compile(path: str):
+    def select(rules):
+        return tuple((rule.when, _scalar_predicate(rule.when), rule.fragment) for rule in rules if path in rule.paths)
+    reasons = WITHDRAWAL_REASONS_WHEN if path in WITHDRAWAL_REASONS_PATHS else None
+    return (
+        select(FACTOR_RULES),
+        select(RECOMMENDATION_RULES),
+        (reasons, _scalar_predicate(reasons)) if reasons else None,
+        select(TRAILING_RECOMMENDATION_RULES),
+    )
+
+
+_COMPILED = {ML: _compile(ML), FALLBACK: _compile(FALLBACK)}
+_RULE_FIELDS = sorted({
+    field
+    for rules in (FACTOR_RULES, RECOMMENDATION_RULES, TRAILING_RECOMMENDATION_RULES)
+    for rule in rules for field, _, _ in rule.when
+} | {field for field, _, _ in WITHDRAWAL_REASONS_WHEN})
+
+
+def _all_fragments():
+    for rules in (FACTOR_RULES, RECOMMENDATION_RULES, TRAILING_RECOMMENDATION_RULES):
+        for rule in rules:
+            yield rule.fragment
+    for factor, recommendation in WITHDRAWAL_REASON_FRAGMENTS.values():
+        yield factor
+        yield recommendation
+    yield DEFAULT_RECOMMENDATION
+
+
+# Response bodies are assembled from the fragments' pre-encoded JSON
+register_fragments(
+    variant
+    for fragment in _all_fragments()
+    for variant in ((fragment.base, fragment.as_low, fragment.as_medium)
+                    if isinstance(fragment, FactorFragment) else (fragment,))
+)
+
+
+# ============================================================================
+# Evaluation
+# ============================================================================
+
+def filter_risk_factors_by_level(factors: Sequence[FactorFragment], risk_level: str) -> List[RiskFactor]:
+    """
+    Filter and adjust risk factors to be contextually appropriate for the overall risk level.
+
+    - Low Risk (0-34): Show max 2 factors with "low" or "medium" impact only
+    - Medium Risk (35-59): Show max 4 factors with "medium" or "high" impact
+    - High Risk (60+): Show all factors with "high" impact
+    """
+    if risk_level == 'low':
+        # For low risk, downgrade all impacts and show minimal factors
+        return [f.as_low for f in factors[:2]]
+    elif risk_level == 'medium':
+        # Keep high as high after the first two, otherwise prefer medium
+        return [
+            f.base if (i >= 2 and f.base.impact == 'high') else f.as_medium
+            for i, f in enumerate(factors[:4])
+        ]
+    # For high risk, show all factors with their original impact
+    return [f.base for f in factors]
+
+
+def _assemble(data, risk_level: str, factor_hits, rec_hits, reasons_hit: bool, trailing_hits):
+    factors = list(factor_hits)
+    recommendations = list(rec_hits)
+    if reasons_hit:
+        for reason in data.withdrawal_reasons:
+            pair = WITHDRAWAL_REASON_FRAGMENTS.get(reason)
+            if pair is not None:
+                factors.append(pair[0])
+                recommendations.append(pair[1])
+    risk_factors = filter_risk_factors_by_level(factors, risk_level)
+    recommendations.extend(trailing_hits)
+    if not recommendations:
+        recommendations.append(DEFAULT_RECOMMENDATION)
+    return risk_factors, recommendations
+
+
+def evaluate_rules(data, risk_level: str, path: str = ML) -> Tuple[List[RiskFactor], List[Recommendation]]:
+    """Risk factors and recommendations for one assessment at the given risk level."""
+    factor_rules, rec_rules, reasons, trailing_rules = _COMPILED[path]
+    return _assemble(
+        data, risk_level,
+        [fragment for _, check, fragment in factor_rules if check(data, risk_level)],
+        [fragment for _, check, fragment in rec_rules if check(data, risk_level)],
+        reasons is not None and reasons[1](data, risk_level),
+        [fragment for _, check, fragment in trailing_rules if check(data, risk_level)],
+    )
+
+
+def evaluate_rules_batch(assessments: Sequence, risk_levels: Sequence[str],
+                         path: str = ML) -> List[Tuple[List[RiskFactor], List[Recommendation]]]:
+    """`evaluate_rules` for many assessments: each rule is one vectorised mask over the batch.
+
+    The masks of a rule group are packed into one integer per row; rows with
+    the same pattern share the same tuple of fragments.
+    """
+    n = len(assessments)
+    if n == 0:
+        return []
+    columns = {}
+    for field in _RULE_FIELDS:
+        if field == 'risk_level':
+            values = list(risk_levels)
+        elif field in ('services_used', 'withdrawal_reasons'):
+            values = [bool(getattr(d, field)) for d in assessments]
+        else:
+            values = [getattr(d, field) for d in assessments]
+        columns[field] = np.array(values)
+
+    factor_rules, rec_rules, reasons, trailing_rules = _COMPILED[path]
+
+    def hits(rules) -> List[tuple]:
+        if not rules:
+            return [()] * n
+        codes = np.zeros(n, dtype=np.int64)
+        for bit, (when, _, _) in enumerate(rules):
+            codes |= _vector_mask(when, columns).astype(np.int64) << bit
+        patterns = {
+            code: tuple(fragment for bit, (_, _, fragment) in enumerate(rules) if code >> bit & 1)
+            for code in np.unique(codes).tolist()
+        }
+        return [patterns[code] for code in codes.tolist()]
+
+    factor_hits, rec_hits, trailing_hits = hits(factor_rules), hits(rec_rules), hits(trailing_rules)
+    reasons_hit = (_vector_mask(reasons[0], columns) if reasons is not None else np.zeros(n, dtype=bool)).tolist()
+
+    return [
+        _assemble(assessments[i], risk_levels[i], factor_hits[i], rec_hits[i], reasons_hit[i], trailing_hits[i])
+        for i in range(n)
+    ]
@@ -0,0 +1,35 @@
+# backend/app/utils/sql_functions.py
+"""SQL functions the repositories need that SQLite and PostgreSQL spell differently.
+
+Each is a SQLAlchemy construct compiled per dialect, so a query is written
+once and returns the same values on either database.
+"""
+from sqlalchemy import String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+
+class year_week(FunctionElement):
+    """
+    'YYYY-WW' for a timestamp: the year and the Monday-based week of that
+    year, 00 for the days before its first Monday (SQLite's and C's %Y-%W).
+    """
+    type = String()
+    inherit_cache = True
+    name = "year_week"
+
+
+@compiles(year_week, "sqlite")
+def _year_week_sqlite(element, compiler, **kw):
+    return "strftime('%%Y-%%W', %s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(year_week, "postgresql")
+def _year_week_postgresql(element, compiler, **kw):
+    # %W = (day of year + 7 - ISO weekday) / 7, with day of year from 1 and Monday = 1
+    ts = compiler.process(element.clauses, **kw)
+    return (
+        f"to_char({ts}, 'YYYY') || '-' || "
+        f"lpad(CAST((CAST(EXTRACT(DOY FROM {ts}) AS INTEGER) + 7 "
+        f"- CAST(EXTRACT(ISODOW FROM {ts}) AS INTEGER)) / 7 AS TEXT), 2, '0')"
+    )
@@ -0,0 +1,43 @@
+# backend/app/utils/what_if.py
+"""What-if grids: a student's assessment with one or two answers changed.
+
+Only the answers in FORM_OPTIONS reach the model, so those are the fields
+that are varied. Every alternative is mapped with map_form_to_ml_features
+(the same mapping as /predict/simplified) and the base assessment is row 0
+of the resulting matrix, so the whole grid is scored in one model call.
+"""
+import itertools
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.models.schemas import SimplifiedAssessmentRequest
+from app.utils.feature_mapping import FORM_OPTIONS, map_form_to_ml_features
+
+WHAT_IF_FIELDS = list(FORM_OPTIONS.keys())
+
+
+def build_what_if_grid(data: SimplifiedAssessmentRequest, fields: Optional[Sequence[str]] = None,
+                       pairwise: bool = False) -> Tuple[List[Dict], List[List[float]]]:
+    """Changed answers per option and the feature matrix (row 0 = unchanged assessment).
+
+    `fields` defaults to every field in FORM_OPTIONS; unknown fields raise ValueError.
+    """
+    fields = list(fields) if fields else WHAT_IF_FIELDS
+    unknown = [f for f in fields if f not in FORM_OPTIONS]
+    if unknown:
+        raise ValueError(f"Cannot vary {unknown}; choose from {WHAT_IF_FIELDS}")
+
+    base = data.model_dump()
+    singles = {
+        field: [{field: value} for value in FORM_OPTIONS[field] if value != base[field]]
+        for field in fields
+    }
+    options = [change for field in fields for change in singles[field]]
+    if pairwise:
+        for a, b in itertools.combinations(fields, 2):
+            options.extend({**x, **y} for x in singles[a] for y in singles[b])
+
+    matrix = [map_form_to_ml_features(data)]
+    matrix.extend(map_form_to_ml_features(SimpleNamespace(**{**base, **change})) for change in options)
+    return options, matrix
+
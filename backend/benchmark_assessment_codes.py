@@ -0,0 +1,222 @@
+"""
+Assessment storage benchmark: answer strings and JSON lists vs. codes and bitmasks.
+
+Builds a scratch SQLite database in the previous layout, where
+assessment_inputs stores every answer as a string and the multi-select
+lists as JSON text, with --predictions assessments. It measures the table
+size and three cohort queries written the only way that layout allows
+(string comparisons, LIKE over the JSON), runs the startup migration to
+answer codes, and runs the same cohorts through `get_cohort_stats`.
+Every cohort must return the same statistics.
+
+Run from the backend directory:
+    python benchmark_assessment_codes.py [--predictions 1000000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import warnings
+from datetime import datetime, timedelta
+
+warnings.filterwarnings("ignore")
+_tmp = tempfile.TemporaryDirectory()
+DB_PATH = os.path.join(_tmp.name, "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, MetaData, String, Table, Text  # noqa: E402
+from sqlalchemy.schema import CreateIndex, CreateTable  # noqa: E402
+from sqlalchemy.dialects import sqlite as sqlite_dialect  # noqa: E402
+
+from app.database import Prediction, SessionLocal, engine, init_db  # noqa: E402
+from app.repositories.prediction_repository import get_cohort_stats  # noqa: E402
+from app.utils.assessment_codes import MULTI_SELECT  # noqa: E402
+from benchmark_serving import simplified_payload  # noqa: E402
+
+# The previous assessment_inputs table: answers as strings, lists as JSON text
+legacy = MetaData()
+Table("predictions", legacy, Column("id", Integer, primary_key=True))
+legacy_assessments = Table(
+    "assessment_inputs", legacy,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("prediction_id", Integer, ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("consent_given", Boolean, nullable=False),
+    Column("consent_data_processing", Boolean, nullable=False),
+    Column("consent_anonymous_analytics", Boolean, nullable=False),
+    Column("academic_year", String, nullable=False),
+    Column("attendance", String, nullable=False),
+    Column("overwhelm_frequency", String, nullable=False),
+    Column("study_hours", String, nullable=False),
+    Column("performance_satisfaction", Integer, nullable=False),
+    Column("advisor_interaction", String, nullable=False),
+    Column("support_network_strength", Integer, nullable=False),
+    Column("extracurricular_hours", Integer, nullable=False),
+    Column("employment_status", String, nullable=False),
+    Column("financial_stress", String, nullable=False),
+    Column("career_alignment", Integer, nullable=False),
+    Column("services_used", Text, nullable=True),
+    Column("withdrawal_considered", Boolean, nullable=False),
+    Column("withdrawal_reasons", Text, nullable=True),
+)
+ASSESSMENT_COLUMNS = [c.name for c in legacy_assessments.columns if c.name != "id"]
+
+# (label, get_cohort_stats arguments, the same cohort against the string/JSON layout)
+COHORTS = [
+    ("full-time + high financial stress",
+     dict(choices={"employment_status": ["full-time"], "financial_stress": ["high", "very-high"]}),
+     "a.employment_status = 'full-time' AND a.financial_stress IN ('high', 'very-high')"),
+    ("withdrawal reason: financial",
+     dict(withdrawal_reasons=["Financial challenges"]),
+     "a.withdrawal_reasons LIKE '%\"Financial challenges\"%'"),
+    ("1st year + rarely attends + uses counseling",
+     dict(choices={"academic_year": ["1st"], "attendance": ["rarely", "never"]}, services_used=["counseling"]),
+     "a.academic_year = '1st' AND a.attendance IN ('rarely', 'never') "
+     "AND a.services_used LIKE '%\"counseling\"%'"),
+]
+
+
+def build_legacy_database(n: int, seed: int = 0):
+    """Write n predictions with string/JSON assessment inputs straight through sqlite3."""
+    dialect = sqlite_dialect.dialect()
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    for table in (Prediction.__table__, legacy_assessments):
+        conn.execute(str(CreateTable(table).compile(dialect=dialect)))
+        for index in table.indexes:
+            conn.execute(str(CreateIndex(index).compile(dialect=dialect)))
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    chunk = 50000
+    for start in range(1, n + 1, chunk):
+        predictions, assessments = [], []
+        for prediction_id in range(start, min(start + chunk, n + 1)):
+            answers = simplified_payload(rng)
+            answers["services_used"] = rng.sample(MULTI_SELECT["services_used"][:5], rng.choice([0, 0, 1, 1, 2]))
+            if answers["withdrawal_considered"]:
+                answers["withdrawal_reasons"] = rng.sample(MULTI_SELECT["withdrawal_reasons"], rng.randint(1, 3))
+            for field in MULTI_SELECT:
+                answers[field] = json.dumps(answers[field]) if answers[field] else None
+            risk_score = rng.randint(0, 100)
+            risk_level = "high" if risk_score >= 60 else "medium" if risk_score >= 35 else "low"
+            predictions.append((prediction_id, (now - timedelta(minutes=prediction_id)).isoformat(sep=" "),
+                                risk_level, risk_score, risk_score / 100, None, 0.8, "simplified", "bench"))
+            assessments.append((prediction_id, *(answers[c] for c in ASSESSMENT_COLUMNS[1:])))
+        conn.executemany(
+            "INSERT INTO predictions (id, created_at, risk_level, risk_score, dropout_probability, predicted_class, "
+            "prediction_confidence, endpoint, model_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", predictions)
+        conn.executemany(
+            f"INSERT INTO assessment_inputs ({', '.join(ASSESSMENT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(ASSESSMENT_COLUMNS))})", assessments)
+        conn.commit()
+    conn.close()
+
+
+def table_size(table: str):
+    """Bytes of a table and of its indexes, from SQLite's dbstat."""
+    conn = sqlite3.connect(DB_PATH)
+    sizes = conn.execute(
+        "SELECT SUM(CASE WHEN m.type = 'table' THEN s.pgsize ELSE 0 END), "
+        "SUM(CASE WHEN m.type = 'index' THEN s.pgsize ELSE 0 END) "
+        "FROM dbstat s JOIN sqlite_master m ON m.name = s.name WHERE m.tbl_name = ?", (table,)
+    ).fetchone()
+    conn.close()
+    return sizes
+
+
+def vacuum():
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def legacy_cohort_stats(where: str) -> dict:
+    """The cohort's statistics from the string/JSON layout, computed as get_cohort_stats does."""
+    conn = sqlite3.connect(DB_PATH)
+    total, high, medium, low, avg = conn.execute(
+        "SELECT COUNT(p.id), SUM(p.risk_level = 'high'), SUM(p.risk_level = 'medium'), "
+        "SUM(p.risk_level = 'low'), AVG(p.risk_score) "
+        f"FROM predictions p JOIN assessment_inputs a ON p.id = a.prediction_id WHERE {where}"
+    ).fetchone()
+    conn.close()
+    total, high, medium, low = total or 0, high or 0, medium or 0, low or 0
+    return {
+        'total_assessments': total,
+        'high_risk_count': high,
+        'medium_risk_count': medium,
+        'low_risk_count': low,
+        'high_risk_percentage': round((high / total * 100) if total > 0 else 0, 2),
+        'medium_risk_percentage': round((medium / total * 100) if total > 0 else 0, 2),
+        'low_risk_percentage': round((low / total * 100) if total > 0 else 0, 2),
+        'average_risk_score': round(avg or 0, 1)
+    }
+
+
+def best_of(repeats: int, run):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def best_of_async(repeats: int, run):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = await run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def main(args):
+    started = time.perf_counter()
+    build_legacy_database(args.predictions)
+    vacuum()
+    print(f"Built {args.predictions} assessments in the string/JSON layout "
+          f"({time.perf_counter() - started:.1f}s)")
+
+    before_size = table_size("assessment_inputs")
+    before = [best_of(args.repeats, lambda: legacy_cohort_stats(where)) for _, _, where in COHORTS]
+
+    started = time.perf_counter()
+    await init_db()
+    migration_s = time.perf_counter() - started
+    await engine.dispose()
+    vacuum()
+    after_size = table_size("assessment_inputs")
+
+    async def cohort(filters):
+        async with SessionLocal() as db:
+            return await get_cohort_stats(db, **filters)
+
+    after = [await best_of_async(args.repeats, lambda: cohort(filters)) for _, filters, _ in COHORTS]
+    await engine.dispose()
+
+    mb = 1024 * 1024
+    print(f"Migration to answer codes: {migration_s:.1f}s")
+    print(f"assessment_inputs rows:    {before_size[0] / mb:7.1f} MB -> {after_size[0] / mb:.1f} MB")
+    print(f"assessment_inputs indexes: {before_size[1] / mb:7.1f} MB -> {after_size[1] / mb:.1f} MB "
+          f"(adds the covering cohort index)\n")
+    print(f"{'cohort':44s} {'matches':>8s} {'strings/JSON':>13s} {'codes':>9s}")
+    for (label, _, _), (before_s, before_stats), (after_s, after_stats) in zip(COHORTS, before, after):
+        assert before_stats == after_stats, f"{label}: {before_stats} != {after_stats}"
+        print(f"{label:44s} {after_stats['total_assessments']:8d} {before_s * 1000:11.1f}ms "
+              f"{after_s * 1000:7.1f}ms  ({before_s / after_s:.1f}x)")
+    print("[OK] identical cohort statistics")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--predictions", type=int, default=1000000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,123 @@
+"""
+Throughput and memory benchmark for streaming CSV scoring (/predict/raw/csv).
+
+Writes synthetic registrar exports with every column of
+ml/data/dataset.csv (rows resampled from the dataset with jittered feature
+values, plus ~0.1% malformed rows), starts the API with uvicorn in a child
+process, uploads each file and consumes the NDJSON stream. Reports
+rows/sec, time to first result and the server's peak resident memory; the
+peak should stay roughly the same as the file grows.
+
+Run from the backend directory:
+    python benchmark_csv_upload.py [--rows 100000 1000000] [--port 8765]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from app.utils.feature_mapping import FEATURE_ORDER
+
+DATA_PATH = "ml/data/dataset.csv"
+
+
+def write_synthetic_csv(path: str, n_rows: int, seed: int = 0, block: int = 100000):
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(DATA_PATH, encoding="utf-8-sig")
+    for start in range(0, n_rows, block):
+        rows = source.sample(min(block, n_rows - start), replace=True, random_state=rng.integers(1 << 31))
+        rows = rows.reset_index(drop=True)
+        for col in FEATURE_ORDER[:2]:
+            rows[col] = np.clip(rows[col] + rng.integers(-2, 3, len(rows)), 0, None)
+        rows["Age at enrollment"] = np.clip(rows["Age at enrollment"] + rng.integers(-3, 4, len(rows)), 17, 70)
+        rows = rows.astype(object)
+        bad = rng.random(len(rows)) < 0.001
+        rows.loc[bad, FEATURE_ORDER[0]] = "n/a"
+        rows.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def upload(base_url: str, path: str) -> dict:
+    started = time.perf_counter()
+    first = None
+    lines = 0
+    summary = None
+    with open(path, "rb") as f, httpx.Client(timeout=None) as client:
+        files = {"file": (os.path.basename(path), f, "text/csv")}
+        with client.stream("POST", f"{base_url}/api/v1/predict/raw/csv", files=files) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if first is None:
+                    first = time.perf_counter() - started
+                lines += 1
+                if line.startswith('{"summary"'):
+                    summary = json.loads(line)["summary"]
+    return {"elapsed_s": time.perf_counter() - started, "first_result_s": first,
+            "lines": lines, "summary": summary}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for n in args.rows:
+            path = os.path.join(tmp, f"synthetic_{n}.csv")
+            started = time.perf_counter()
+            write_synthetic_csv(path, n)
+            print(f"Wrote {n} rows ({os.path.getsize(path) / 1e6:.0f} MB) in {time.perf_counter() - started:.1f} s")
+            paths.append((n, path))
+
+        env = dict(os.environ, LAZY_MODEL_LOAD="false",
+                   DATABASE_URL=f"sqlite+aiosqlite:///{tmp}/bench.db",
+                   ARCHIVED_MODELS_DIR=os.path.join(tmp, "archived"))
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            for _ in range(300):
+                try:
+                    if httpx.get(f"{base_url}/ready").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.1)
+            else:
+                raise RuntimeError("server did not become ready")
+
+            print(f"\nServer ready, peak RSS {peak_rss_mb(server.pid):.0f} MB")
+            print(f"\n{'rows':>9}{'MB':>7}{'server rows/s':>15}{'client s':>10}{'first result s':>16}"
+                  f"{'malformed':>11}{'peak RSS MB':>13}")
+            for n, path in paths:
+                result = upload(base_url, path)
+                summary = result["summary"]
+                print(f"{n:>9}{os.path.getsize(path) / 1e6:>7.0f}{summary['rows_per_sec']:>15.0f}"
+                      f"{result['elapsed_s']:>10.2f}{result['first_result_s']:>16.2f}"
+                      f"{summary['malformed']:>11}{peak_rss_mb(server.pid):>13.0f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Heuristic fallback equivalence check and batch benchmark.
+
+Property check: for random assessments (including answers outside the
+known categories and numeric values outside their documented ranges) the
+vectorised fallback (`calculate_fallback_risks`) must give exactly the same
+risk score, risk level, factors and recommendations as the per-request
+reference `calculate_fallback_risk`, and fail on the same rows. Then times
+both for a cohort, as /predict/batch runs them when no model is loaded.
+
+Run from the backend directory:
+    python benchmark_fallback.py [--rows 20000] [--seed 0]
+"""
+
+import argparse
+import random
+import time
+
+from app.models.schemas import SimplifiedAssessmentRequest
+from app.routers.prediction import (
+    calculate_fallback_risk, calculate_fallback_risks, _fallback_prediction_response
+)
+from app.utils.fallback_scoring import (
+    ATTENDANCE_SCORES, OVERWHELM_SCORES, FINANCIAL_STRESS_SCORES, ADVISOR_SCORES, EMPLOYMENT_SCORES,
+    encode_assessments, fallback_scores
+)
+from app.utils.risk_rules import WITHDRAWAL_REASON_FRAGMENTS
+
+
+def answer(rng: random.Random, table) -> str:
+    # Mostly known answers, sometimes unknown ones (scored 0) incl. near-misses of known keys
+    if rng.random() < 0.9:
+        return rng.choice(list(table) + ['not-employed'])
+    return rng.choice(['', 'unknown', 'Always', 'very high', 'zzz', 'a'])
+
+
+def random_assessment(rng: random.Random) -> SimplifiedAssessmentRequest:
+    withdrawal = rng.random() < 0.4
+    return SimplifiedAssessmentRequest(
+        consent_given=True, consent_data_processing=True, consent_anonymous_analytics=True,
+        academic_year=rng.choice(["1st", "2nd", "3rd", "4th"]),
+        attendance=answer(rng, ATTENDANCE_SCORES),
+        overwhelm_frequency=answer(rng, OVERWHELM_SCORES),
+        study_hours=rng.choice(["1-3", "3-5", "5-8", "8+"]),
+        performance_satisfaction=rng.randint(-3, 13),
+        advisor_interaction=answer(rng, ADVISOR_SCORES),
+        support_network_strength=rng.randint(-3, 13),
+        extracurricular_hours=rng.randint(-2, 25),
+        employment_status=answer(rng, EMPLOYMENT_SCORES),
+        financial_stress=answer(rng, FINANCIAL_STRESS_SCORES),
+        career_alignment=rng.randint(-3, 13),
+        services_used=rng.sample(["tutoring", "counseling"], rng.randint(0, 2)),
+        withdrawal_considered=withdrawal,
+        withdrawal_reasons=rng.sample(list(WITHDRAWAL_REASON_FRAGMENTS) + ["Other"], rng.randint(0, 3)) if withdrawal else [],
+    )
+
+
+def outcome(build):
+    try:
+        return build().model_dump()
+    except Exception as e:
+        return type(e).__name__
+
+
+def check_equivalence(assessments) -> int:
+    vectorised = calculate_fallback_risks(assessments)
+    mismatches = 0
+    for data, row in zip(assessments, vectorised):
+        expected = outcome(lambda: calculate_fallback_risk(data))
+        if outcome(lambda: _fallback_prediction_response(*row)) != expected:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  mismatch: {data.model_dump()}\n    reference:  {expected}\n    vectorised: {row[:2]}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    assessments = [random_assessment(rng) for _ in range(args.rows)]
+
+    mismatches = check_equivalence(assessments)
+    print(f"Equivalence: {mismatches} mismatches over {len(assessments)} random assessments")
+
+    started = time.perf_counter()
+    for data in assessments:
+        try:
+            calculate_fallback_risk(data)
+        except Exception:
+            pass
+    loop_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for row in calculate_fallback_risks(assessments):
+        try:
+            _fallback_prediction_response(*row)
+        except Exception:
+            pass
+    vector_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    fallback_scores(encode_assessments(assessments))
+    scores_ms = (time.perf_counter() - started) * 1000
+
+    print(f"\n{args.rows} rows")
+    print(f"  per-request reference          {loop_ms:8.1f} ms")
+    print(f"  vectorised (full responses)    {vector_ms:8.1f} ms")
+    print(f"  vectorised (scores + levels)   {scores_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Prediction persistence benchmark: per-row ORM writes vs. bulk Core inserts.
+
+Stores the same predictions (ML responses with their risk factors,
+recommendations and assessment inputs) three ways in a scratch SQLite
+database:
+  - orm per row: the previous `save_prediction`, one ORM transaction per
+    prediction with a mid-transaction flush for the ID
+  - orm batched: every prediction as ORM objects in one transaction
+  - core bulk:   `save_predictions`, one INSERT ... RETURNING plus one
+    executemany INSERT per child table
+
+At each size it reports rows/sec and SQL statements executed (an
+executemany counts as one), and checks that every method stored identical
+rows.
+
+Run from the backend directory:
+    python benchmark_persistence.py [--sizes 1 100 10000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+warnings.filterwarnings("ignore")
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp.name}/bench.db"
+
+from sqlalchemy import delete, event, select  # noqa: E402
+
+from app.database import (  # noqa: E402
+    AssessmentInput, Prediction, Recommendation, RiskFactor, SessionLocal, engine, init_db
+)
+from app.models.schemas import SimplifiedAssessmentRequest  # noqa: E402
+from app.utils.assessment_codes import encode_assessment  # noqa: E402
+from app.repositories.prediction_repository import PredictionRecord, save_predictions  # noqa: E402
+from app.repositories.text_catalog import (  # noqa: E402
+    recommendation_catalog, recommendation_key, risk_factor_catalog, risk_factor_key
+)
+from app.routers.prediction import build_ml_prediction_response  # noqa: E402
+from benchmark_serving import simplified_payload  # noqa: E402
+
+TABLES = (AssessmentInput, RiskFactor, Recommendation, Prediction)
+statements = 0
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count_statement(*args):
+    global statements
+    statements += 1
+
+
+def make_records(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(n):
+        payload = simplified_payload(rng)
+        payload["services_used"] = rng.sample(["tutoring", "counseling"], rng.randint(0, 2))
+        data = SimplifiedAssessmentRequest.model_validate(payload)
+        p = rng.random()
+        pred = {"dropout_probability": p, "predicted_class": "Dropout" if p >= 0.5 else "Non-Dropout",
+                "model_confidence": max(p, 1 - p)}
+        response = build_ml_prediction_response(data, pred)
+        records.append(PredictionRecord(response, data, "simplified", "bench", datetime.utcnow()))
+    return records
+
+
+def _orm_objects(db, record: PredictionRecord) -> Prediction:
+    """The ORM rows the previous implementation added for one prediction."""
+    prediction = record.prediction
+    new_prediction = Prediction(
+        risk_level=prediction.risk_level, risk_score=prediction.risk_score,
+        dropout_probability=prediction.dropout_probability,
+        predicted_class=prediction.predicted_class if prediction.predicted_class else None,
+        prediction_confidence=prediction.prediction_confidence,
+        endpoint=record.endpoint, model_version=record.model_version, created_at=record.created_at
+    )
+    db.add(new_prediction)
+    return new_prediction
+
+
+async def _text_ids(db, records):
+    """Catalog ids of the records' texts, adding new ones (all cached after `store_texts`)."""
+    factors = await risk_factor_catalog.resolve(
+        db, {risk_factor_key(f) for r in records for f in r.prediction.risk_factors})
+    recs = await recommendation_catalog.resolve(
+        db, {recommendation_key(rec) for r in records for rec in r.prediction.recommendations})
+    return factors, recs
+
+
+async def store_texts(records):
+    """Put every text in the catalog up front so no method pays for first-time catalog inserts."""
+    async with SessionLocal() as db:
+        (_, new_factors), (_, new_recs) = await _text_ids(db, records)
+        await db.commit()
+    risk_factor_catalog.remember(new_factors)
+    recommendation_catalog.remember(new_recs)
+
+
+def _orm_children(db, prediction_id: int, record: PredictionRecord, text_ids):
+    prediction, a = record.prediction, record.assessment_input
+    if a:
+        db.add(AssessmentInput(prediction_id=prediction_id, **encode_assessment(a.__dict__)))
+    factor_ids, rec_ids = text_ids
+    for f in prediction.risk_factors:
+        db.add(RiskFactor(prediction_id=prediction_id, text_id=factor_ids[risk_factor_key(f)]))
+    for r in prediction.recommendations:
+        db.add(Recommendation(prediction_id=prediction_id, text_id=rec_ids[recommendation_key(r)]))
+
+
+async def orm_per_row(records):
+    for record in records:
+        async with SessionLocal() as db:
+            (factor_ids, _), (rec_ids, _) = await _text_ids(db, [record])
+            new_prediction = _orm_objects(db, record)
+            await db.flush()
+            _orm_children(db, new_prediction.id, record, (factor_ids, rec_ids))
+            await db.commit()
+
+
+async def orm_batched(records):
+    async with SessionLocal() as db:
+        (factor_ids, _), (rec_ids, _) = await _text_ids(db, records)
+        new_predictions = [_orm_objects(db, record) for record in records]
+        await db.flush()
+        for new_prediction, record in zip(new_predictions, records):
+            _orm_children(db, new_prediction.id, record, (factor_ids, rec_ids))
+        await db.commit()
+
+
+async def core_bulk(records):
+    async with SessionLocal() as db:
+        await save_predictions(db, records)
+
+
+METHODS = {"orm per row": orm_per_row, "orm batched": orm_batched, "core bulk": core_bulk}
+
+
+async def clear():
+    async with SessionLocal() as db:
+        for table in TABLES:
+            await db.execute(delete(table))
+        await db.commit()
+
+
+async def snapshot():
+    """Stored rows without surrogate keys; child rows refer to their prediction's position."""
+    async with SessionLocal() as db:
+        ids = list((await db.execute(select(Prediction.id).order_by(Prediction.id))).scalars())
+        position = {pid: i for i, pid in enumerate(ids)}
+        result = {}
+        for table in TABLES:
+            columns = [c for c in table.__table__.columns if c.name != "id"]
+            rows = (await db.execute(select(*columns).order_by(table.id))).all()
+            key = "prediction_id" if table is not Prediction else None
+            result[table.__tablename__] = [
+                tuple(position[v] if c.name == key else v for c, v in zip(columns, row)) for row in rows
+            ]
+        return result
+
+
+async def main(sizes):
+    await init_db()
+
+    global statements
+    print(f"{'predictions':>11s} {'method':>12s} {'seconds':>9s} {'predictions/s':>14s} "
+          f"{'table rows/s':>13s} {'statements':>11s}")
+    for n in sizes:
+        records = make_records(n, seed=n)
+        await store_texts(records)
+        reference = base_rate = None
+        for name, method in METHODS.items():
+            await clear()
+            statements = 0
+            started = time.perf_counter()
+            await method(records)
+            elapsed = time.perf_counter() - started
+            n_statements = statements
+
+            stored = await snapshot()
+            reference = reference or stored
+            assert stored == reference, f"{name} stores different rows than {next(iter(METHODS))}"
+            table_rows = sum(len(rows) for rows in stored.values())
+            rate = n / elapsed
+            base_rate = base_rate or rate
+            print(f"{n:11d} {name:>12s} {elapsed:9.3f} {rate:14.0f} {table_rows / elapsed:13.0f} "
+                  f"{n_statements:11d}  ({rate / base_rate:.1f}x)")
+        print(f"{'':11s} [OK] identical rows stored by every method ({table_rows} table rows)\n")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000])
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes))
@@ -0,0 +1,104 @@
+"""
+Read/write engine benchmark: dashboard traffic against prediction writes.
+
+Seeds a scratch SQLite database, then runs --readers tasks that load the
+dashboard (stats, top risk factors, trends) back to back and --writers
+tasks that store one prediction per transaction, for --duration seconds,
+twice:
+  shared  dashboard sessions from the write engine's pool (the previous setup)
+  split   dashboard sessions from the read engine (`get_read_db`)
+Both pools have the default size. It reports throughput and latency per
+role, including how long sessions waited for a pooled connection.
+
+Run from the backend directory:
+    python benchmark_read_write_engines.py [--readers 24] [--writers 4] [--duration 5]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import warnings
+
+warnings.filterwarnings("ignore")
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+
+from app.config import settings  # noqa: E402
+from app.database import ReadSessionLocal, SessionLocal, dispose_engines  # noqa: E402
+from app.repositories.prediction_repository import (  # noqa: E402
+    get_dashboard_stats, get_risk_trends, get_top_risk_factors, save_predictions
+)
+from benchmark_sqlite_profiles import make_records, percentile, seed  # noqa: E402
+
+
+async def run_mode(args, read_factory, records):
+    stats = {role: {"ok": 0, "errors": 0, "latency_ms": [], "wait_ms": []} for role in ("write", "read")}
+    deadline = time.time() + args.duration
+
+    async def checkout(db, role: str):
+        """Take the session's pooled connection now, timing the wait for it."""
+        started = time.perf_counter()
+        await db.connection()
+        stats[role]["wait_ms"].append((time.perf_counter() - started) * 1000)
+
+    async def run(role: str, operation):
+        s = stats[role]
+        while time.time() < deadline:
+            started = time.perf_counter()
+            try:
+                await operation()
+                s["ok"] += 1
+                s["latency_ms"].append((time.perf_counter() - started) * 1000)
+            except Exception:
+                s["errors"] += 1
+
+    async def write_one():
+        async with SessionLocal() as db:
+            await checkout(db, "write")
+            await save_predictions(db, [random.choice(records)])
+
+    async def read_dashboard():
+        async with read_factory() as db:
+            await checkout(db, "read")
+            await get_dashboard_stats(db)
+            await get_top_risk_factors(db)
+            await get_risk_trends(db)
+
+    await asyncio.gather(*[run("write", write_one) for _ in range(args.writers)],
+                         *[run("read", read_dashboard) for _ in range(args.readers)])
+    return stats
+
+
+async def main(args):
+    started = time.perf_counter()
+    await seed(args.seed_rows)
+    print(f"Seeded {args.seed_rows} predictions ({time.perf_counter() - started:.1f}s)")
+    records = make_records(200, seed=1)
+
+    print(f"{args.readers} dashboard readers + {args.writers} writers, {args.duration:g}s per mode; "
+          f"write pool {settings.db_pool_size} + {settings.db_max_overflow} overflow, "
+          f"read pool {settings.db_read_pool_size} + {settings.db_read_max_overflow}\n")
+    print(f"{'mode':7s} {'role':6s} {'ops/s':>8s} {'p50':>9s} {'p99':>9s} {'max':>9s} "
+          f"{'pool wait p99':>14s} {'errors':>7s}")
+    for mode, read_factory in (("shared", SessionLocal), ("split", ReadSessionLocal)):
+        stats = await run_mode(args, read_factory, records)
+        for role in ("write", "read"):
+            s = stats[role]
+            latency = s["latency_ms"]
+            print(f"{mode:7s} {role:6s} {s['ok'] / args.duration:8.1f} {percentile(latency, 0.5):7.1f}ms "
+                  f"{percentile(latency, 0.99):7.1f}ms {max(latency, default=0):7.1f}ms "
+                  f"{percentile(s['wait_ms'], 0.99):12.1f}ms {s['errors']:7d}")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=24)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--seed-rows", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,150 @@
+"""
+Response construction benchmark: validated Pydantic path vs. pre-encoded JSON.
+
+The old path builds a validated PredictionResponse and lets FastAPI
+re-validate it through `response_model` and serialize it with
+`jsonable_encoder` + `JSONResponse`. The fast path builds it with
+`model_construct` and encodes it from the rule fragments' pre-encoded JSON
+(app/utils/json_response.py). The script first checks that both produce
+the same JSON for random assessments (single and batch), then reports
+per-request latency and peak allocated memory for each path.
+
+Run from the backend directory:
+    python benchmark_responses.py [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.main import app
+from app.models.schemas import (
+    BatchPredictionItem, BatchPredictionResponse, PredictionResponse, SimplifiedAssessmentRequest
+)
+from app.routers.prediction import build_ml_prediction_response, calculate_fallback_risk
+from app.utils.json_response import encode_batch_response, encode_prediction_response
+from app.utils.risk_levels import risk_level_for_probability
+from app.utils.risk_rules import ML, evaluate_rules
+from benchmark_serving import simplified_payload
+
+REASONS = ["Academic difficulty", "Financial challenges", "Mental health", "Personal/family issues",
+           "Lack of interest", "Career opportunities"]
+
+
+def random_case(rng: random.Random):
+    payload = simplified_payload(rng)
+    payload["services_used"] = rng.sample(["tutoring", "counseling"], rng.randint(0, 2))
+    if payload["withdrawal_considered"]:
+        payload["withdrawal_reasons"] = rng.sample(REASONS, rng.randint(0, 3))
+    p = rng.random()
+    pred = {"dropout_probability": p, "predicted_class": "Dropout" if p >= 0.5 else "Non-Dropout",
+            "model_confidence": max(p, 1 - p)}
+    return SimplifiedAssessmentRequest.model_validate(payload), pred
+
+
+def old_response(data, pred) -> PredictionResponse:
+    """The response as it was built before: fully validated."""
+    level = risk_level_for_probability(pred["dropout_probability"])
+    factors, recommendations = evaluate_rules(data, level, path=ML)
+    return PredictionResponse(
+        risk_level=level, risk_score=int(round(pred["dropout_probability"] * 100)),
+        dropout_probability=pred["dropout_probability"], predicted_class=pred["predicted_class"],
+        risk_factors=factors, recommendations=recommendations,
+        prediction_confidence=pred["model_confidence"]
+    )
+
+
+def response_field(path: str):
+    route = next(r for r in app.routes if str(getattr(r, "path", "")).endswith(path))
+    return route.secure_cloned_response_field
+
+
+async def old_body(field, result) -> bytes:
+    """What FastAPI does with a returned model: re-validate, jsonable_encoder, JSONResponse."""
+    content = await serialize_response(field=field, response_content=result)
+    return JSONResponse(content).body
+
+
+def check_equivalence(cases, field, batch_field):
+    mismatches = 0
+    for data, pred in cases:
+        expected = json.loads(asyncio.run(old_body(field, old_response(data, pred))))
+        if json.loads(encode_prediction_response(build_ml_prediction_response(data, pred))) != expected:
+            mismatches += 1
+        try:
+            fallback = calculate_fallback_risk(data)
+        except ValueError:
+            continue  # the heuristic can produce a fractional score, which the schema rejects
+        if json.loads(encode_prediction_response(fallback)) != json.loads(fallback.model_dump_json()):
+            mismatches += 1
+
+    items = [BatchPredictionItem(index=i, result=build_ml_prediction_response(d, p)) for i, (d, p) in enumerate(cases[:200])]
+    items.append(BatchPredictionItem(index=len(items), error="Invalid assessment"))
+    batch = BatchPredictionResponse(results=items, total=len(items), succeeded=len(items) - 1, failed=1,
+                                    ml_model_used=True, inference_ms=1.25, elapsed_ms=3.5)
+    if json.loads(encode_batch_response(batch)) != json.loads(asyncio.run(old_body(batch_field, batch))):
+        mismatches += 1
+    return mismatches
+
+
+def measure(cases, fn):
+    latencies, peaks = [], []
+    for data, pred in cases:
+        started = time.perf_counter()
+        fn(data, pred)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    tracemalloc.start()
+    for data, pred in cases[:2000]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(data, pred)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    latencies.sort()
+    return {
+        "p50_us": latencies[len(latencies) // 2],
+        "p99_us": latencies[int(0.99 * len(latencies))],
+        "mean_us": statistics.fmean(latencies),
+        "peak_alloc_bytes": statistics.fmean(peaks),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    cases = [random_case(rng) for _ in range(args.requests)]
+    field = response_field("/predict/simplified")
+    batch_field = response_field("/predict/batch")
+
+    mismatches = check_equivalence(cases[:5000], field, batch_field)
+    print(f"Equivalence: {mismatches} mismatches over {min(5000, len(cases))} assessments (+ batch)")
+
+    loop = asyncio.new_event_loop()
+
+    def old_path(data, pred):
+        return loop.run_until_complete(old_body(field, old_response(data, pred)))
+
+    def fast_path(data, pred):
+        return encode_prediction_response(build_ml_prediction_response(data, pred))
+
+    results = {"validated + response_model": measure(cases, old_path),
+               "model_construct + pre-encoded": measure(cases, fast_path)}
+    loop.close()
+
+    print(f"\n{'path':<32}{'p50 us':>10}{'p99 us':>10}{'mean us':>10}{'peak alloc B':>14}")
+    for name, r in results.items():
+        print(f"{name:<32}{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}{r['mean_us']:>10.1f}{r['peak_alloc_bytes']:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
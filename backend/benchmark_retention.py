@@ -0,0 +1,243 @@
+"""
+Retention benchmark: cold archival of old predictions under write load.
+
+Builds a scratch SQLite database with --predictions predictions spread
+over the last --days days (texts and answers from real rule-table
+responses) and measures the dashboard queries. It then runs one retention
+pass (--retention-days) while a writer stores a prediction every
+--write-interval-ms, and reports archive throughput, how long each chunk's
+write transaction held the lock and the writer's latency against an idle
+baseline. Afterwards it checks that the archive files hold exactly the
+expired predictions, that the all-time dashboard numbers only changed by
+the writer's rows, and measures the queries and the file size again.
+
+Run from the backend directory:
+    python benchmark_retention.py [--predictions 500000] [--days 730] [--retention-days 365]
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import warnings
+from datetime import datetime, timedelta
+
+warnings.filterwarnings("ignore")
+_tmp = tempfile.TemporaryDirectory()
+DB_PATH = os.path.join(_tmp.name, "bench.db")
+ARCHIVE_DIR = os.path.join(_tmp.name, "archive")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+from app.database import SessionLocal, engine, init_db  # noqa: E402
+from app.models.retention import RetentionJob, read_archive  # noqa: E402
+from app.repositories.prediction_repository import (  # noqa: E402
+    PredictionRecord, get_dashboard_stats, get_risk_distribution, get_risk_trends, get_top_risk_factors,
+    save_predictions
+)
+from app.repositories.text_catalog import (  # noqa: E402
+    recommendation_catalog, recommendation_key, risk_factor_catalog, risk_factor_key
+)
+from app.utils.assessment_codes import encode_assessment  # noqa: E402
+from benchmark_sqlite_profiles import make_records  # noqa: E402
+
+WRITER_ENDPOINT = "bench-writer"
+QUERIES = {
+    "stats": get_dashboard_stats,
+    "distribution": get_risk_distribution,
+    "top risk factors": get_top_risk_factors,
+    "trends": get_risk_trends,
+}
+
+
+async def catalog_ids(patterns):
+    """Catalog ids of the patterns' texts, adding them to the (empty) catalogs."""
+    async with SessionLocal() as db:
+        factor_ids, new_factors = await risk_factor_catalog.resolve(
+            db, {risk_factor_key(f) for r in patterns for f in r.prediction.risk_factors})
+        recommendation_ids, new_recommendations = await recommendation_catalog.resolve(
+            db, {recommendation_key(rec) for r in patterns for rec in r.prediction.recommendations})
+        await db.commit()
+    risk_factor_catalog.remember(new_factors)
+    recommendation_catalog.remember(new_recommendations)
+    return factor_ids, recommendation_ids
+
+
+async def build_database(n: int, days: int, seed: int = 0):
+    """Create the schema, then write n predictions straight through sqlite3 (the ORM would take too long)."""
+    await init_db()
+    patterns = make_records(2000, seed=seed)
+    factor_ids, recommendation_ids = await catalog_ids(patterns)
+    await engine.dispose()
+
+    encoded = [encode_assessment(r.assessment_input.__dict__) for r in patterns]
+    assessment_columns = list(encoded[0])
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA synchronous=OFF")
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    chunk = 50000
+    for start in range(1, n + 1, chunk):
+        predictions, assessments, factors, recommendations = [], [], [], []
+        for prediction_id in range(start, min(start + chunk, n + 1)):
+            i = rng.randrange(len(patterns))
+            p = patterns[i].prediction
+            # Ids ascend with created_at, as they do when predictions are stored as they are made
+            created_at = now - timedelta(seconds=(n - prediction_id + rng.random()) * days * 86400 / n)
+            predictions.append((prediction_id, created_at.isoformat(sep=" "), p.risk_level, p.risk_score,
+                                p.dropout_probability, p.predicted_class, p.prediction_confidence,
+                                "simplified", "bench"))
+            assessments.append((prediction_id, *encoded[i].values()))
+            factors.extend((prediction_id, factor_ids[risk_factor_key(f)]) for f in p.risk_factors)
+            recommendations.extend((prediction_id, recommendation_ids[recommendation_key(r)])
+                                   for r in p.recommendations)
+        conn.executemany(
+            "INSERT INTO predictions (id, created_at, risk_level, risk_score, dropout_probability, predicted_class, "
+            "prediction_confidence, endpoint, model_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", predictions)
+        conn.executemany(
+            f"INSERT INTO assessment_inputs (prediction_id, {', '.join(assessment_columns)}) "
+            f"VALUES ({', '.join('?' * (len(assessment_columns) + 1))})", assessments)
+        conn.executemany("INSERT INTO risk_factors (prediction_id, text_id) VALUES (?, ?)", factors)
+        conn.executemany("INSERT INTO recommendations (prediction_id, text_id) VALUES (?, ?)", recommendations)
+        conn.commit()
+    conn.close()
+
+
+def vacuum():
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def sql(query: str, *params):
+    conn = sqlite3.connect(DB_PATH)
+    rows = conn.execute(query, params).fetchall()
+    conn.close()
+    return rows
+
+
+async def time_queries(repeats: int):
+    timings, results = {}, {}
+    for name, query in QUERIES.items():
+        best = float("inf")
+        for _ in range(repeats):
+            async with SessionLocal() as db:
+                started = time.perf_counter()
+                results[name] = await query(db)
+                best = min(best, time.perf_counter() - started)
+        timings[name] = best
+    return timings, results
+
+
+def percentile(samples, q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0.0
+
+
+async def write_load(stop: asyncio.Event, interval_ms: float, records, latencies):
+    """Store one prediction (without risk factors) every interval until stopped."""
+    i = 0
+    while not stop.is_set():
+        r = records[i % len(records)]
+        record = PredictionRecord(r.prediction.model_copy(update={"risk_factors": []}), r.assessment_input,
+                                  WRITER_ENDPOINT, r.model_version, datetime.utcnow())
+        started = time.perf_counter()
+        async with SessionLocal() as db:
+            await save_predictions(db, [record])
+        latencies.append((time.perf_counter() - started) * 1000)
+        i += 1
+        await asyncio.sleep(interval_ms / 1000)
+
+
+async def main(args):
+    started = time.perf_counter()
+    await build_database(args.predictions, args.days)
+    vacuum()
+    print(f"Built {args.predictions} predictions over {args.days} days ({time.perf_counter() - started:.1f}s)")
+
+    job = RetentionJob(retention_days=args.retention_days, archive_dir=ARCHIVE_DIR,
+                       chunk_size=args.chunk_size, chunk_pause_ms=args.chunk_pause_ms, interval_seconds=3600)
+    cutoff = job.cutoff()
+    expired_ids = {row[0] for row in sql("SELECT id FROM predictions WHERE created_at < ?", cutoff.isoformat(sep=" "))}
+    before_file = os.path.getsize(DB_PATH)
+    before_times, before = await time_queries(args.repeats)
+
+    # Writer latency with the database idle, then during the retention pass
+    writer_records = make_records(200, seed=1)
+    stop, idle_latencies = asyncio.Event(), []
+    writer = asyncio.create_task(write_load(stop, args.write_interval_ms, writer_records, idle_latencies))
+    await asyncio.sleep(args.baseline_seconds)
+    stop.set()
+    await writer
+
+    stop, busy_latencies = asyncio.Event(), []
+    writer = asyncio.create_task(write_load(stop, args.write_interval_ms, writer_records, busy_latencies))
+    run = await job.run_once()
+    stop.set()
+    await writer
+    metrics = job.metrics()
+
+    # The archive holds every expired prediction, each self-contained
+    archived = {}
+    for path in sorted(glob.glob(os.path.join(ARCHIVE_DIR, "*.ndjson.gz"))):
+        for record in read_archive(path):
+            assert record["created_at"][:7] == path[-len("YYYY-MM.ndjson.gz"):-len(".ndjson.gz")], path
+            archived[record["id"]] = record
+    assert set(archived) == expired_ids, f"archived {len(archived)} predictions, expected {len(expired_ids)}"
+    assert all(r["assessment"] and r["recommendations"] for r in archived.values())
+    assert not sql("SELECT COUNT(*) FROM predictions WHERE created_at < ?", cutoff.isoformat(sep=" "))[0][0]
+
+    await engine.dispose()
+    vacuum()
+    after_file = os.path.getsize(DB_PATH)
+    archive_bytes = sum(os.path.getsize(p) for p in glob.glob(os.path.join(ARCHIVE_DIR, "*")))
+    after_times, after = await time_queries(args.repeats)
+    await engine.dispose()
+
+    # All-time numbers: unchanged apart from the writer's predictions (which have no risk factors)
+    written = dict(sql("SELECT risk_level, COUNT(*) FROM predictions WHERE endpoint = ? GROUP BY risk_level",
+                       WRITER_ENDPOINT))
+    expected = {level: count + written.get(level, 0) for level, count in before["distribution"].items()}
+    assert after["distribution"] == expected, f"{after['distribution']} != {expected}"
+    assert after["stats"]["total_assessments"] == before["stats"]["total_assessments"] + sum(written.values())
+    assert after["top risk factors"] == before["top risk factors"], \
+        f"{before['top risk factors']} != {after['top risk factors']}"
+
+    mb = 1024 * 1024
+    print(f"\nRetention pass: {run['archived']} predictions before {cutoff:%Y-%m-%d} in {run['chunks']} chunks "
+          f"of {args.chunk_size}, {run['elapsed_ms'] / 1000:.1f}s "
+          f"({run['archived'] / (run['elapsed_ms'] / 1000):.0f} predictions/s) to {len(run['files'])} monthly files")
+    print(f"write lock per chunk (delete + rollups): p50 {metrics['delete_ms_p50']:.1f}ms  "
+          f"p99 {metrics['delete_ms_p99']:.1f}ms  max {metrics['delete_ms_max']:.1f}ms")
+    print(f"writer latency, idle:      p50 {percentile(idle_latencies, 0.5):6.1f}ms  "
+          f"p99 {percentile(idle_latencies, 0.99):6.1f}ms  max {max(idle_latencies):6.1f}ms  "
+          f"({len(idle_latencies)} writes)")
+    print(f"writer latency, archiving: p50 {percentile(busy_latencies, 0.5):6.1f}ms  "
+          f"p99 {percentile(busy_latencies, 0.99):6.1f}ms  max {max(busy_latencies):6.1f}ms  "
+          f"({len(busy_latencies)} writes)\n")
+    print(f"database file: {before_file / mb:.1f} MB -> {after_file / mb:.1f} MB; "
+          f"archive files: {archive_bytes / mb:.1f} MB\n")
+    print(f"{'dashboard query':18s} {'before':>9s} {'after':>9s}")
+    for name in QUERIES:
+        print(f"{name:18s} {before_times[name] * 1000:7.1f}ms {after_times[name] * 1000:7.1f}ms  "
+              f"({before_times[name] / after_times[name]:.1f}x)")
+    print(f"[OK] archive holds all {len(archived)} expired predictions; "
+          f"all-time dashboard numbers include them via rollups")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--predictions", type=int, default=500000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--retention-days", type=int, default=365)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-pause-ms", type=float, default=50.0)
+    parser.add_argument("--write-interval-ms", type=float, default=10.0)
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,237 @@
+"""
+Serving latency benchmark: mixed prediction and admin dashboard traffic.
+
+Runs the app in-process once per inference executor mode ("inline" is the
+old behaviour where scoring blocks the event loop) while a background
+4000-row cohort is scored repeatedly, and reports p50/p99 latency for
+prediction requests and for concurrent admin dashboard requests, plus the event-loop lag observed while serving them.
+
+With --shadow it instead compares /predict/simplified traffic (thread
+executor) with and without a shadow candidate model, to show the latency
+shadow scoring adds to the request path.
+
+With --write-behind it compares /predict/simplified traffic with
+predictions stored inside each request and with the write-behind queue,
+and reports the writer's batch sizes and flush latency.
+
+Run from the backend directory:
+    python benchmark_serving.py [--requests 400] [--concurrency 16] [--shadow | --write-behind]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import json
+
+MODES = ["inline", "thread", "process"]
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0.0
+
+
+def simplified_payload(rng: random.Random) -> dict:
+    return {
+        "consent_given": True, "consent_data_processing": True, "consent_anonymous_analytics": True,
+        "academic_year": rng.choice(["1st", "2nd", "3rd", "4th"]),
+        "attendance": rng.choice(["always", "often", "sometimes", "rarely", "never"]),
+        "overwhelm_frequency": rng.choice(["never", "rarely", "sometimes", "often", "always"]),
+        "study_hours": rng.choice(["1-3", "3-5", "5-8", "8+"]),
+        "performance_satisfaction": rng.randint(0, 10),
+        "advisor_interaction": rng.choice(["never", "once-semester", "2-3-semester", "monthly"]),
+        "support_network_strength": rng.randint(0, 10),
+        "extracurricular_hours": rng.randint(0, 20),
+        "employment_status": rng.choice(["not-employed", "part-time", "full-time"]),
+        "financial_stress": rng.choice(["none", "low", "moderate", "high", "very-high"]),
+        "career_alignment": rng.randint(0, 10),
+        "services_used": [],
+        "withdrawal_considered": rng.random() < 0.3,
+        "withdrawal_reasons": [],
+    }
+
+
+async def run_traffic(n_requests: int, concurrency: int, endpoint: str = "raw") -> dict:
+    import httpx
+    from app.main import app, startup_event, shutdown_event
+    from app.models.executor import inference_executor
+    from app.utils.feature_mapping import FEATURE_ORDER
+
+    await startup_event()
+    rng = random.Random(42)
+    latencies = {"predict": [], "admin": []}
+    loop_lag = []
+
+    def cohort(n):
+        # Raw vectors outside the simplified lookup table so every row hits the model
+        return [
+            {"features": dict(zip(FEATURE_ORDER, [rng.randint(0, 20), rng.randint(0, 20), 1, 0,
+                                                   rng.randint(17, 45), 0, 1, rng.choice([1, 17, 39])]))}
+            for _ in range(n)
+        ]
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        queue = asyncio.Queue()
+        bodies = cohort(n_requests) if endpoint == "raw" else [simplified_payload(rng) for _ in range(n_requests)]
+        for body in bodies:
+            queue.put_nowait(("predict", body))
+            if rng.random() < 0.25:
+                queue.put_nowait(("admin", None))
+
+        async def worker():
+            while not queue.empty():
+                kind, body = queue.get_nowait()
+                started = time.perf_counter()
+                if kind == "predict":
+                    r = await client.post(f"/api/v1/predict/{endpoint}", json=body)
+                else:
+                    r = await client.get("/api/v1/admin/dashboard/stats")
+                r.raise_for_status()
+                latencies[kind].append((time.perf_counter() - started) * 1000)
+
+        # Large cohort scoring in the background, as /predict/batch does for a term roster
+        cohort_matrix = [[rng.randint(0, 40) for _ in FEATURE_ORDER] for _ in range(4000)]
+
+        async def cohort_scoring():
+            if endpoint != "raw":
+                return  # shadow comparison: keep the background load out of the picture
+            while not queue.empty():
+                await inference_executor.predict_batch(cohort_matrix)
+                await asyncio.sleep(0.05)  # a new cohort every ~50 ms
+
+        async def lag_probe():
+            # How late a 1 ms sleep wakes up = how long the event loop was blocked
+            while not queue.empty():
+                scheduled = time.perf_counter()
+                await asyncio.sleep(0.001)
+                loop_lag.append(max(0.0, (time.perf_counter() - scheduled) * 1000 - 1.0))
+
+        started = time.perf_counter()
+        await asyncio.gather(lag_probe(), cohort_scoring(), *[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+        runtime = (await client.get("/api/v1/admin/runtime", headers={"X-Admin-Key": "benchmark"})).json()
+
+    await shutdown_event()
+    from app.models.prediction_writer import prediction_writer
+    return {
+        kind: {
+            "count": len(samples),
+            "p50_ms": round(statistics.median(samples), 2) if samples else 0.0,
+            "p99_ms": round(percentile(samples, 0.99), 2),
+        }
+        for kind, samples in latencies.items()
+    } | {
+        "throughput_rps": round((len(latencies["predict"]) + len(latencies["admin"])) / elapsed, 1),
+        "loop_lag_p99_ms": round(percentile(loop_lag, 0.99), 2),
+        "loop_lag_max_ms": round(max(loop_lag, default=0.0), 2),
+        "shadow": runtime.get("shadow", {}),
+        # After shutdown, so rows flushed on the way out are included
+        "prediction_writes": prediction_writer.metrics(),
+    }
+
+
+def run_child(args):
+    import warnings
+    warnings.filterwarnings("ignore")
+    result = asyncio.run(run_traffic(args.requests, args.concurrency, args.endpoint))
+    print("RESULT " + json.dumps(result))
+
+
+def run_mode(args, mode: str, endpoint: str = "raw", extra_env: dict = None) -> dict:
+    """Run one benchmark child process; returns its result dict or None on failure."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ,
+                   INFERENCE_EXECUTOR=mode, LAZY_MODEL_LOAD="false",
+                   DATABASE_URL=f"sqlite+aiosqlite:///{tmp}/bench.db",
+                   ARCHIVED_MODELS_DIR=os.path.join(tmp, "archived"),
+                   ADMIN_API_KEY="benchmark",
+                   **(extra_env or {}))
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", "--requests", str(args.requests),
+             "--concurrency", str(args.concurrency), "--endpoint", endpoint],
+            env=env, capture_output=True, text=True
+        )
+    lines = [l for l in out.stdout.splitlines() if l.startswith("RESULT ")]
+    if not lines:
+        print(f"{mode:10s} failed:\n{out.stderr[-2000:]}")
+        return None
+    return json.loads(lines[-1][len("RESULT "):])
+
+
+def main(args):
+    print("=" * 72)
+    print(f"MIXED TRAFFIC: {args.requests} predictions + ~25% admin requests, concurrency {args.concurrency},")
+    print("plus continuous 4000-row cohort scoring")
+    print("=" * 72)
+    print(f"{'executor':10s} {'predict p50':>12s} {'predict p99':>12s} {'admin p50':>10s} {'admin p99':>10s} "
+          f"{'req/s':>8s} {'loop lag p99':>13s}")
+    for mode in MODES:
+        r = run_mode(args, mode)
+        if r is None:
+            continue
+        print(f"{mode:10s} {r['predict']['p50_ms']:10.2f}ms {r['predict']['p99_ms']:10.2f}ms "
+              f"{r['admin']['p50_ms']:8.2f}ms {r['admin']['p99_ms']:8.2f}ms {r['throughput_rps']:8.1f} "
+              f"{r['loop_lag_p99_ms']:11.2f}ms")
+
+
+def main_shadow(args):
+    from app.config import settings
+    print("=" * 72)
+    print(f"SHADOW SCORING: {args.requests} /predict/simplified requests, concurrency {args.concurrency}")
+    print("candidate = the live model files, so every sample goes through the full comparison;")
+    print("no background cohort scoring")
+    print("=" * 72)
+    print(f"{'shadow':10s} {'predict p50':>12s} {'predict p99':>12s} {'req/s':>8s} "
+          f"{'submit p99':>11s} {'compared':>9s} {'dropped':>8s}")
+    candidate = {"SHADOW_MODEL_PATH": settings.model_path, "SHADOW_SCALER_PATH": settings.scaler_path}
+    for label, extra_env in (("off", {"SHADOW_MODEL_PATH": ""}), ("on", candidate)):
+        r = run_mode(args, "thread", "simplified", extra_env)
+        if r is None:
+            continue
+        shadow = r["shadow"]
+        print(f"{label:10s} {r['predict']['p50_ms']:10.2f}ms {r['predict']['p99_ms']:10.2f}ms "
+              f"{r['throughput_rps']:8.1f} {shadow.get('request_overhead_us_p99', 0.0):9.1f}us "
+              f"{shadow.get('compared', 0):9d} {shadow.get('dropped', 0):8d}")
+
+
+def main_write_behind(args):
+    print("=" * 72)
+    print(f"WRITE-BEHIND: {args.requests} /predict/simplified requests, concurrency {args.concurrency}")
+    print("sync = each request waits for its own INSERT transaction; no background cohort scoring")
+    print("=" * 72)
+    print(f"{'storage':14s} {'predict p50':>12s} {'predict p99':>12s} {'req/s':>8s} "
+          f"{'written':>8s} {'batch avg':>10s} {'flush p50':>10s} {'flush p99':>10s}")
+    for label, enabled in (("sync", "false"), ("write-behind", "true")):
+        r = run_mode(args, "thread", "simplified", {"PREDICTION_WRITE_BEHIND_ENABLED": enabled})
+        if r is None:
+            continue
+        writes = r["prediction_writes"]
+        print(f"{label:14s} {r['predict']['p50_ms']:10.2f}ms {r['predict']['p99_ms']:10.2f}ms "
+              f"{r['throughput_rps']:8.1f} {writes['written']:8d} {writes['avg_batch_size']:10.1f} "
+              f"{writes['flush_ms_p50']:8.2f}ms {writes['flush_ms_p99']:8.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--shadow", action="store_true", help="measure shadow-scoring overhead instead")
+    parser.add_argument("--write-behind", action="store_true",
+                        help="compare synchronous and write-behind prediction storage instead")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--endpoint", default="raw", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args)
+    elif args.shadow:
+        main_shadow(args)
+    elif args.write_behind:
+        main_write_behind(args)
+    else:
+        main(args)
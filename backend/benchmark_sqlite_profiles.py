@@ -0,0 +1,192 @@
+"""
+SQLite profile benchmark: concurrent prediction writes and dashboard reads.
+
+For each SQLite performance profile (see SQLITE_PROFILES in app/database.py)
+it seeds a scratch database, then runs several worker processes against it
+at once, like several uvicorn workers sharing one database file. Every
+worker runs writer tasks storing one prediction per transaction (the
+synchronous `save_prediction` path) and reader tasks running the dashboard
+summary queries, for a fixed duration.
+
+It reports writes/s, reads/s, p50/p99 latency and the share of operations
+that failed with "database is locked" (or any other error) per profile.
+"legacy" is the previous setup: no pragmas and a new connection per session.
+
+Run from the backend directory:
+    python benchmark_sqlite_profiles.py [--processes 2] [--writers 4] [--readers 4] [--duration 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+PROFILES = ["legacy", "durable", "balanced", "fast"]
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0.0
+
+
+def make_records(n: int, seed: int):
+    from datetime import datetime
+    from app.models.schemas import SimplifiedAssessmentRequest
+    from app.repositories.prediction_repository import PredictionRecord
+    from app.routers.prediction import build_ml_prediction_response
+    from benchmark_serving import simplified_payload
+
+    rng = random.Random(seed)
+    records = []
+    for _ in range(n):
+        data = SimplifiedAssessmentRequest.model_validate(simplified_payload(rng))
+        p = rng.random()
+        pred = {"dropout_probability": p, "predicted_class": "Dropout" if p >= 0.5 else "Non-Dropout",
+                "model_confidence": max(p, 1 - p)}
+        records.append(PredictionRecord(build_ml_prediction_response(data, pred), data, "simplified",
+                                        "bench", datetime.utcnow()))
+    return records
+
+
+async def seed(n: int):
+    from app.database import SessionLocal, engine, init_db
+    from app.repositories.prediction_repository import save_predictions
+
+    await init_db()
+    records = make_records(n, seed=0)
+    for start in range(0, n, 1000):
+        async with SessionLocal() as db:
+            await save_predictions(db, records[start:start + 1000])
+    await engine.dispose()
+
+
+async def work(args) -> dict:
+    from app.database import ReadSessionLocal, SessionLocal, database_metrics, dispose_engines
+    from app.repositories.prediction_repository import (
+        get_dashboard_stats, get_risk_distribution, save_predictions
+    )
+
+    records = make_records(200, seed=os.getpid())
+    stats = {role: {"ok": 0, "locked": 0, "other": 0, "latency_ms": []} for role in ("write", "read")}
+
+    async def run(role: str, operation):
+        s = stats[role]
+        while time.time() < deadline:
+            started = time.perf_counter()
+            try:
+                await operation()
+                s["ok"] += 1
+                s["latency_ms"].append((time.perf_counter() - started) * 1000)
+            except Exception as e:
+                s["locked" if "locked" in str(e) else "other"] += 1
+
+    async def write_one():
+        async with SessionLocal() as db:
+            await save_predictions(db, [random.choice(records)])
+
+    async def read_one():
+        async with ReadSessionLocal() as db:
+            await get_dashboard_stats(db)
+            await get_risk_distribution(db)
+
+    # All worker processes start together, once every one has imported the app
+    print("READY", flush=True)
+    sys.stdin.readline()
+    deadline = time.time() + args.duration
+    await asyncio.gather(*[run("write", write_one) for _ in range(args.writers)],
+                         *[run("read", read_one) for _ in range(args.readers)])
+    metrics = database_metrics()
+    connections = sum(metrics[role].get("connections_opened", 0) for role in ("write", "read"))
+    await dispose_engines()
+    return {"stats": stats, "connections_opened": connections}
+
+
+def run_child(args):
+    import warnings
+    warnings.filterwarnings("ignore")
+    if args.seed:
+        asyncio.run(seed(args.seed))
+        return
+    print("RESULT " + json.dumps(asyncio.run(work(args))))
+
+
+def run_profile(args, profile: str):
+    """Seed a scratch database, then run the worker processes against it; returns merged stats."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SQLITE_PROFILE=profile, DATABASE_URL=f"sqlite+aiosqlite:///{tmp}/bench.db")
+        if profile == "legacy":
+            env.update(DB_POOL_SIZE="0", DB_READ_POOL_SIZE="0")
+        base = [sys.executable, __file__, "--child"]
+        subprocess.run(base + ["--seed", str(args.seed_rows)], env=env, check=True, capture_output=True)
+
+        children = [
+            subprocess.Popen(base + ["--writers", str(args.writers), "--readers", str(args.readers),
+                                     "--duration", str(args.duration)],
+                             env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             text=True)
+            for _ in range(args.processes)
+        ]
+        for child in children:
+            child.stdout.readline()  # READY (or EOF if the worker failed)
+        outputs = [child.communicate("GO\n") for child in children]
+
+    merged = {role: {"ok": 0, "locked": 0, "other": 0, "latency_ms": []} for role in ("write", "read")}
+    connections = 0
+    for stdout, stderr in outputs:
+        lines = [l for l in stdout.splitlines() if l.startswith("RESULT ")]
+        if not lines:
+            print(f"{profile:9s} worker failed:\n{stderr[-2000:]}")
+            return None
+        result = json.loads(lines[-1][len("RESULT "):])
+        connections += result["connections_opened"]
+        for role, s in result["stats"].items():
+            for key in ("ok", "locked", "other"):
+                merged[role][key] += s[key]
+            merged[role]["latency_ms"].extend(s["latency_ms"])
+    merged["connections_opened"] = connections
+    return merged
+
+
+def main(args):
+    print("=" * 100)
+    print(f"SQLITE PROFILES: {args.processes} processes x ({args.writers} writers + {args.readers} readers), "
+          f"{args.duration:g}s each, {args.seed_rows} seeded predictions")
+    print("write = one prediction per transaction; read = dashboard stats + risk distribution")
+    print("=" * 100)
+    print(f"{'profile':9s} {'writes/s':>9s} {'w p50':>8s} {'w p99':>9s} {'w locked':>9s} "
+          f"{'reads/s':>8s} {'r p50':>8s} {'r p99':>9s} {'r locked':>9s} {'errors':>7s} {'conns':>6s}")
+    for profile in args.profiles:
+        r = run_profile(args, profile)
+        if r is None:
+            continue
+        row = f"{profile:9s}"
+        for role in ("write", "read"):
+            s = r[role]
+            attempts = s["ok"] + s["locked"] + s["other"]
+            row += (f" {s['ok'] / args.duration:{9 if role == 'write' else 8}.1f}"
+                    f" {percentile(s['latency_ms'], 0.50):6.1f}ms {percentile(s['latency_ms'], 0.99):7.1f}ms"
+                    f" {(s['locked'] / attempts * 100 if attempts else 0.0):8.2f}%")
+        row += f" {r['write']['other'] + r['read']['other']:7d} {r['connections_opened']:6d}"
+        print(row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=PROFILES, choices=PROFILES)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--writers", type=int, default=4, help="writer tasks per process")
+    parser.add_argument("--readers", type=int, default=4, help="reader tasks per process")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of traffic per profile")
+    parser.add_argument("--seed-rows", type=int, default=5000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--seed", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args)
+    else:
+        main(args)
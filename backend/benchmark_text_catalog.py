@@ -0,0 +1,204 @@
+"""
+Text catalog benchmark: inline risk factor / recommendation texts vs. catalog ids.
+
+Builds a scratch SQLite database in the previous layout, where every
+risk_factors / recommendations row repeats its full texts, with
+--predictions predictions spread over the last eight weeks (texts drawn
+from real rule-table responses). It measures file size and the dashboard's
+top-risk-factors query, runs the startup migration to the text catalogs,
+and measures again. The dashboard output must not change.
+
+Run from the backend directory:
+    python benchmark_text_catalog.py [--predictions 1000000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import warnings
+from datetime import datetime, timedelta
+
+warnings.filterwarnings("ignore")
+_tmp = tempfile.TemporaryDirectory()
+DB_PATH = os.path.join(_tmp.name, "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+from sqlalchemy import (  # noqa: E402
+    Column, ForeignKey, Integer, MetaData, String, Table, Text, and_, func, select
+)
+from sqlalchemy.schema import CreateIndex, CreateTable  # noqa: E402
+from sqlalchemy.dialects import sqlite as sqlite_dialect  # noqa: E402
+
+from app.database import Prediction, SessionLocal, engine, init_db  # noqa: E402
+from app.repositories.prediction_repository import get_top_risk_factors  # noqa: E402
+from benchmark_sqlite_profiles import make_records  # noqa: E402
+
+# The previous per-prediction tables, texts inline
+legacy = MetaData()
+Table("predictions", legacy, Column("id", Integer, primary_key=True))
+legacy_factors = Table(
+    "risk_factors", legacy,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("prediction_id", Integer, ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("category", String, nullable=False, index=True),
+    Column("factor", String, nullable=False),
+    Column("impact", String, nullable=False),
+    Column("description", Text, nullable=False),
+)
+legacy_recommendations = Table(
+    "recommendations", legacy,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("prediction_id", Integer, ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("rec_type", String, nullable=False, index=True),
+    Column("title", String, nullable=False),
+    Column("description", Text, nullable=False),
+    Column("urgency", String, nullable=False),
+    Column("contact", String, nullable=True),
+)
+
+
+def build_legacy_database(n: int, seed: int = 0):
+    """Write n predictions with inline texts straight through sqlite3 (the ORM would take hours)."""
+    dialect = sqlite_dialect.dialect()
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    for table in (Prediction.__table__, legacy_factors, legacy_recommendations):
+        conn.execute(str(CreateTable(table).compile(dialect=dialect)))
+        for index in table.indexes:
+            conn.execute(str(CreateIndex(index).compile(dialect=dialect)))
+
+    patterns = make_records(2000, seed=seed)
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    chunk = 50000
+    for start in range(1, n + 1, chunk):
+        predictions, factors, recommendations = [], [], []
+        for prediction_id in range(start, min(start + chunk, n + 1)):
+            p = rng.choice(patterns).prediction
+            age = rng.uniform(0, 8 * 7 * 86400)
+            if min(abs(age - 7 * 86400), abs(age - 14 * 86400)) < 3600:
+                age += 7200  # keep off the trend-window edges, which move while the benchmark runs
+            created_at = now - timedelta(seconds=age)
+            predictions.append((prediction_id, created_at.isoformat(sep=" "), p.risk_level, p.risk_score,
+                                p.dropout_probability, p.predicted_class, p.prediction_confidence,
+                                "simplified", "bench"))
+            factors.extend((prediction_id, f.category, f.factor, f.impact, f.description) for f in p.risk_factors)
+            recommendations.extend((prediction_id, r.type, r.title, r.description, r.urgency, r.contact or None)
+                                   for r in p.recommendations)
+        conn.executemany(
+            "INSERT INTO predictions (id, created_at, risk_level, risk_score, dropout_probability, predicted_class, "
+            "prediction_confidence, endpoint, model_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", predictions)
+        conn.executemany(
+            "INSERT INTO risk_factors (prediction_id, category, factor, impact, description) VALUES (?, ?, ?, ?, ?)",
+            factors)
+        conn.executemany(
+            "INSERT INTO recommendations (prediction_id, rec_type, title, description, urgency, contact) "
+            "VALUES (?, ?, ?, ?, ?, ?)", recommendations)
+        conn.commit()
+    conn.close()
+
+
+async def legacy_top_risk_factors(db, limit: int = 5):
+    """The previous get_top_risk_factors: GROUP BY category text, then two IN-subquery counts per category."""
+    rows = (await db.execute(
+        select(legacy_factors.c.category, func.count(legacy_factors.c.id).label("count"))
+        .group_by(legacy_factors.c.category).order_by(func.count(legacy_factors.c.id).desc()).limit(limit)
+    )).all()
+    total = sum(r.count for r in rows)
+    now = datetime.utcnow()
+    week_ago, two_weeks_ago = now - timedelta(days=7), now - timedelta(days=14)
+    factors = []
+    for row in rows:
+        counts = []
+        for window in (Prediction.created_at >= week_ago,
+                       and_(Prediction.created_at >= two_weeks_ago, Prediction.created_at < week_ago)):
+            ids = select(legacy_factors.c.id).join(
+                Prediction, Prediction.id == legacy_factors.c.prediction_id).where(window)
+            counts.append((await db.execute(select(func.count(legacy_factors.c.id)).where(
+                and_(legacy_factors.c.category == row.category, legacy_factors.c.id.in_(ids))))).scalar() or 0)
+        trend = "up" if counts[0] > counts[1] else "down" if counts[0] < counts[1] else "stable"
+        factors.append({"name": row.category, "percentage": round(row.count / total * 100 if total else 0, 1),
+                        "trend": trend})
+    return factors
+
+
+def table_sizes() -> dict:
+    """Bytes per table including its indexes, from SQLite's dbstat."""
+    conn = sqlite3.connect(DB_PATH)
+    sizes = {}
+    for name, table, size in conn.execute(
+            "SELECT s.name, m.tbl_name, SUM(s.pgsize) FROM dbstat s JOIN sqlite_master m ON m.name = s.name "
+            "GROUP BY s.name"):
+        sizes[table] = sizes.get(table, 0) + size
+    conn.close()
+    return sizes
+
+
+def vacuum():
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    conn.close()
+
+
+async def time_query(query, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        async with SessionLocal() as db:
+            started = time.perf_counter()
+            result = await query(db)
+            best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def by_name(factors):
+    return {f["name"]: (f["percentage"], f["trend"]) for f in factors}
+
+
+async def main(args):
+    started = time.perf_counter()
+    build_legacy_database(args.predictions)
+    vacuum()
+    print(f"Built {args.predictions} predictions in the inline-text layout "
+          f"({time.perf_counter() - started:.1f}s)")
+
+    before_sizes = table_sizes()
+    before_file = os.path.getsize(DB_PATH)
+    before_time, before = await time_query(legacy_top_risk_factors, args.repeats)
+
+    started = time.perf_counter()
+    await init_db()
+    migration_s = time.perf_counter() - started
+    await engine.dispose()
+    vacuum()
+
+    after_sizes = table_sizes()
+    after_file = os.path.getsize(DB_PATH)
+    after_time, after = await time_query(get_top_risk_factors, args.repeats)
+    await engine.dispose()
+
+    assert by_name(before) == by_name(after), f"dashboard changed:\n{before}\n{after}"
+
+    mb = 1024 * 1024
+    print(f"Migration to text catalogs: {migration_s:.1f}s\n")
+    print(f"{'table (+ indexes)':22s} {'inline MB':>10s} {'catalog MB':>11s}")
+    for table in ("risk_factors", "recommendations", "risk_factor_texts", "recommendation_texts", "predictions"):
+        print(f"{table:22s} {before_sizes.get(table, 0) / mb:10.1f} {after_sizes.get(table, 0) / mb:11.1f}")
+    print(f"{'database file':22s} {before_file / mb:10.1f} {after_file / mb:11.1f}  "
+          f"({before_file / after_file:.1f}x smaller)\n")
+    print(f"top risk factors query: {before_time * 1000:9.1f}ms -> {after_time * 1000:.1f}ms "
+          f"({before_time / after_time:.1f}x faster, best of {args.repeats})")
+    print(f"[OK] identical dashboard output: {after}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--predictions", type=int, default=1000000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args))
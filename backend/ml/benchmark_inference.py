@@ -0,0 +1,227 @@
+"""
+Inference equivalence check and latency microbenchmark.
+
+Verifies that MLModel's compiled flat-array evaluator reproduces sklearn's
+GradientBoostingClassifier on every row of the training dataset, that the
+simplified-assessment lookup table matches live inference for every
+reachable feature vector and that TreeSHAP feature attributions add up to
+the model's log-odds (and match brute-force Shapley values on a sample),
+then times single-row and batch scoring and the attribution overhead.
+
+Run from the backend directory:
+    python ml/benchmark_inference.py
+"""
+
+import itertools
+import os
+import sys
+from math import factorial
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings  # noqa: E402
+from app.models.ml_model import MLModel, ModelVersion  # noqa: E402
+from app.models.lookup_table import reachable_feature_vectors  # noqa: E402
+from app.utils.feature_mapping import FEATURE_ORDER  # noqa: E402
+
+DATA_PATH = "ml/data/dataset.csv"
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def load_features(path: str) -> np.ndarray:
+    df = pd.read_csv(path, delimiter=',')
+    X = df[FEATURE_ORDER].copy()
+    return X.fillna(X.median()).to_numpy(dtype=float)
+
+
+def check_equivalence(model: ModelVersion, X: np.ndarray):
+    """Compiled probabilities and classes must match sklearn on every dataset row."""
+    print("=" * 60)
+    print("EQUIVALENCE: compiled evaluator vs sklearn")
+    print("=" * 60)
+
+    sk_scaled = model.scaler.transform(X)
+    sk_proba = model.model.predict_proba(sk_scaled)
+    sk_class = model.model.predict(sk_scaled)
+
+    compiled_proba = model.compiled.predict_proba(X)
+    max_abs_diff = float(np.max(np.abs(compiled_proba - sk_proba)))
+
+    rows = model._format_predictions(compiled_proba)
+    compiled_class = np.array([1 if r['predicted_class'] == "Dropout" else 0 for r in rows])
+    class_mismatches = int(np.sum(compiled_class != sk_class))
+
+    print(f"Rows checked:            {len(X)}")
+    print(f"Max |probability diff|:  {max_abs_diff:.3e}")
+    print(f"Class mismatches:        {class_mismatches}")
+
+    assert max_abs_diff < 1e-9, "compiled probabilities diverge from sklearn"
+    assert class_mismatches == 0, "compiled classes diverge from sklearn"
+    print("[OK] Compiled evaluator matches sklearn")
+
+
+def check_lookup_table(model: ModelVersion):
+    """Every table entry must equal a live single-row prediction exactly."""
+    print("\n" + "=" * 60)
+    print("EQUIVALENCE: lookup table vs live inference")
+    print("=" * 60)
+
+    vectors = reachable_feature_vectors()
+    mismatches = 0
+    for row in vectors:
+        live = model._format_predictions(model._predict_proba(row.reshape(1, -1), per_request=True))[0]
+        if model.lookup.get(row.tolist()) != live:
+            mismatches += 1
+
+    sk_proba = model.model.predict_proba(model.scaler.transform(vectors))[:, 1]
+    cells = model.lookup.get_many(vectors)
+    max_abs_diff = float(np.max(np.abs(model.lookup.probability[cells] - sk_proba)))
+
+    print(f"Reachable vectors:       {len(vectors)}")
+    print(f"Table cells filled:      {model.lookup.size} / {model.lookup.filled.size}")
+    print(f"Mismatches vs live:      {mismatches}")
+    print(f"Max |diff| vs sklearn:   {max_abs_diff:.3e}")
+
+    assert mismatches == 0, "lookup table diverges from live inference"
+    assert int(np.sum(cells < 0)) == 0, "reachable vector missing from lookup table"
+    print("[OK] Lookup table matches live inference")
+
+
+def path_dependent_value(model: ModelVersion, x: np.ndarray, known: set) -> float:
+    """TreeSHAP's cover-weighted expected log-odds when only `known` features of x are used."""
+    compiled = model.compiled
+    total = compiled.base_score
+    for t, est in enumerate(model.model.estimators_[:, 0]):
+        tree, offset = est.tree_, int(compiled.roots[t])
+        cover = tree.weighted_n_node_samples
+
+        def walk(node):
+            left, right = tree.children_left[node], tree.children_right[node]
+            if left == -1:
+                return compiled.value[offset + node]
+            if tree.feature[node] in known:
+                return walk(left if x[tree.feature[node]] <= compiled.threshold[offset + node] else right)
+            return (cover[left] * walk(left) + cover[right] * walk(right)) / cover[node]
+
+        total += walk(0)
+    return total
+
+
+def brute_force_shapley(model: ModelVersion, x: np.ndarray) -> np.ndarray:
+    """Shapley values from all 2**n_features subsets (slow; for verification only)."""
+    n = len(x)
+    values = {
+        subset: path_dependent_value(model, x, set(subset))
+        for size in range(n + 1) for subset in itertools.combinations(range(n), size)
+    }
+    phi = np.zeros(n)
+    for subset, value in values.items():
+        for i in set(range(n)) - set(subset):
+            weight = factorial(len(subset)) * factorial(n - len(subset) - 1) / factorial(n)
+            phi[i] += weight * (values[tuple(sorted(subset + (i,)))] - value)
+    return phi
+
+
+def check_attribution(model: ModelVersion, X: np.ndarray, n_brute_force: int = 5):
+    """Attributions must sum to the log-odds on every row and equal exact Shapley values."""
+    print("\n" + "=" * 60)
+    print("ATTRIBUTION: TreeSHAP contributions")
+    print("=" * 60)
+    base_value, contributions = model.explain(X)
+    margin = model.model.decision_function(model.scaler.transform(X))
+    max_sum_diff = float(np.max(np.abs(base_value + contributions.sum(axis=1) - margin)))
+
+    rows = np.random.default_rng(0).choice(len(X), n_brute_force, replace=False)
+    max_shap_diff = max(
+        float(np.max(np.abs(brute_force_shapley(model, X[i]) - contributions[i]))) for i in rows
+    )
+    print(f"Rows checked:                {len(X)}")
+    print(f"Max |base + sum - log-odds|: {max_sum_diff:.3e}")
+    print(f"Max diff vs brute force:     {max_shap_diff:.3e} ({n_brute_force} rows, all subsets)")
+    assert max_sum_diff < 1e-9, "attributions do not add up to the model output"
+    assert max_shap_diff < 1e-9, "attributions diverge from exact Shapley values"
+    print("[OK] Attributions are exact")
+
+
+def time_call(fn, repeats: int) -> float:
+    """Median wall time of `fn()` in microseconds."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples) * 1e6)
+
+
+def sklearn_predict(model: ModelVersion, X: np.ndarray):
+    """The pre-compilation path: scaler.transform + predict_proba + predict."""
+    X_scaled = model.scaler.transform(X)
+    model.model.predict_proba(X_scaled)
+    model.model.predict(X_scaled)
+
+
+def run_benchmark(model: ModelVersion, X: np.ndarray):
+    print("\n" + "=" * 60)
+    print("LATENCY (median)")
+    print("=" * 60)
+    print("sklearn  = scaler.transform + predict_proba + predict (previous MLModel path)")
+    print("compiled = flat-array evaluator probabilities")
+    print("predict  = MLModel.predict / predict_batch end to end (includes result dicts)\n")
+
+    print(f"{'rows':>6s} {'sklearn':>12s} {'compiled':>12s} {'predict':>12s} {'speedup':>8s}")
+    for n_rows, repeats in [(1, 500), (10, 300), (100, 200), (250, 100), (1000, 30), (len(X), 10)]:
+        batch = X[:n_rows]
+        sk_us = time_call(lambda: sklearn_predict(model, batch), repeats)
+        compiled_us = time_call(lambda: model.compiled.predict_proba(batch), repeats)
+        if n_rows == 1:
+            row = batch[0]
+            predict_us = time_call(lambda: model.predict(row), repeats)
+        else:
+            predict_us = time_call(lambda: model.predict_batch(batch), repeats)
+        print(f"{n_rows:6d} {sk_us:10.1f}us {compiled_us:10.1f}us {predict_us:10.1f}us "
+              f"{sk_us / compiled_us:7.1f}x")
+    print(f"\nMLModel uses the compiled evaluator up to settings.compiled_max_rows={settings.compiled_max_rows} rows.")
+
+    reachable = reachable_feature_vectors()
+    hit = reachable[len(reachable) // 2].tolist()
+    lookup_us = time_call(lambda: model.predict(hit), 2000)
+    batch_us = time_call(lambda: model.predict_batch(reachable), 50)
+    print(f"Lookup-table hit, single predict():        {lookup_us:8.1f}us")
+    print(f"Lookup-table hits, predict_batch({len(reachable)} rows): {batch_us:8.1f}us")
+
+    if model.attribution is None:
+        return
+    print("\nAttribution overhead (explain=true adds `explain` on top of `predict`)\n")
+    print(f"{'rows':>6s} {'predict':>12s} {'explain':>12s} {'per row':>10s} {'overhead':>9s}")
+    for n_rows, repeats in [(1, 500), (10, 300), (100, 100), (1000, 20), (len(X), 5)]:
+        batch = X[:n_rows]
+        if n_rows == 1:
+            row = batch[0]
+            predict_us = time_call(lambda: model.predict(row), repeats)
+        else:
+            predict_us = time_call(lambda: model.predict_batch(batch), repeats)
+        explain_us = time_call(lambda: model.explain(batch), repeats)
+        print(f"{n_rows:6d} {predict_us:10.1f}us {explain_us:10.1f}us {explain_us / n_rows:8.1f}us "
+              f"{explain_us / predict_us * 100:7.0f}%")
+
+
+if __name__ == "__main__":
+    ml_model = MLModel()
+    model = ml_model.current() if ml_model.load_model(settings.model_path, settings.scaler_path) else None
+    if model is None or model.compiled is None:
+        print("Compiled model not available; nothing to benchmark")
+        sys.exit(1)
+
+    X = load_features(DATA_PATH)
+    check_equivalence(model, X)
+    if model.lookup is not None:
+        check_lookup_table(model)
+    if model.attribution is not None:
+        check_attribution(model, X)
+    run_benchmark(model, X)
@@ -0,0 +1,262 @@
+"""
+Offline batch scoring with a process pool.
+
+Scores a large input file with the same code the API uses, so offline and
+online results match exactly:
+  - raw-feature CSV (shaped like ml/data/dataset.csv; only the FEATURE_ORDER
+    columns are read, as by /predict/raw/csv) is scored with
+    `ModelVersion.predict_arrays`, like /predict/raw/bulk and /predict/raw/csv
+  - simplified-assessment JSONL (one SimplifiedAssessmentRequest per line) is
+    validated, mapped with `map_form_to_ml_features` and scored with
+    `ModelVersion.predict_batch`, like /predict/batch
+
+The main process reads the input in chunks and writes results in input
+order; worker processes each load the model once and score whole chunks.
+Output (CSV, or Parquet if pyarrow is installed) has one row per input row:
+row, dropout_probability, predicted_class, risk_level, model_confidence,
+error. Per-stage throughput is printed at the end.
+
+Run from the backend directory:
+    python ml/score_batch.py INPUT [-o OUTPUT] [--workers N] [--chunk-rows 50000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pydantic import ValidationError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings  # noqa: E402
+from app.models.csv_scoring import chunk_to_matrix, row_errors  # noqa: E402
+from app.models.ml_model import MLModel, ModelVersion  # noqa: E402
+from app.models.schemas import SimplifiedAssessmentRequest  # noqa: E402
+from app.utils.feature_mapping import FEATURE_ORDER, map_form_to_ml_features  # noqa: E402
+from app.utils.risk_levels import risk_levels_for_probabilities  # noqa: E402
+
+# Model owned by a worker process (loaded once by _init_worker)
+_worker_version: Optional[ModelVersion] = None
+
+
+def _init_worker(model_path: str, scaler_path: str, build_lookup: bool):
+    global _worker_version
+    _worker_version = MLModel.build_version(model_path, scaler_path, build_lookup)
+
+
+def _worker_ready() -> str:
+    return _worker_version.version
+
+
+# ============================================================================
+# Worker tasks: return (dropout_probability, is_dropout, model_confidence,
+# valid mask, errors, prepare seconds, score seconds) for one chunk
+# ============================================================================
+
+def _score_raw_chunk(X: np.ndarray, valid: np.ndarray):
+    started = time.perf_counter()
+    result = _worker_version.predict_arrays(X[valid]) if valid.any() else (np.zeros(0), np.zeros(0, dtype=bool), np.zeros(0))
+    if result is None:
+        raise RuntimeError("model scoring failed for a chunk")
+    return (*result, valid, row_errors(X, valid), 0.0, time.perf_counter() - started)
+
+
+def _score_simplified_chunk(lines: List[str]):
+    started = time.perf_counter()
+    valid = np.zeros(len(lines), dtype=bool)
+    errors, features = [], []
+    for i, line in enumerate(lines):
+        # Same messages as /predict/batch
+        try:
+            data = SimplifiedAssessmentRequest.model_validate_json(line)
+            features.append(map_form_to_ml_features(data))
+            valid[i] = True
+        except ValidationError as e:
+            errors.append(f"Invalid assessment: {e.error_count()} validation error(s): {e.errors()[0]['msg']}")
+        except Exception as e:
+            errors.append(f"Feature mapping failed: {str(e)}")
+    prepared = time.perf_counter()
+
+    # A chunk of only invalid lines has nothing to score, just its error records
+    preds = _worker_version.predict_batch(features) if features else []
+    if preds is None:
+        raise RuntimeError("model scoring failed for a chunk")
+    dropout_probability = np.array([p['dropout_probability'] for p in preds], dtype=float)
+    is_dropout = np.array([p['predicted_class'] == "Dropout" for p in preds], dtype=bool)
+    model_confidence = np.array([p['model_confidence'] for p in preds], dtype=float)
+    return (dropout_probability, is_dropout, model_confidence, valid, errors,
+            prepared - started, time.perf_counter() - prepared)
+
+
+# ============================================================================
+# Input readers: yield (first row index, worker task args) per chunk
+# ============================================================================
+
+def read_raw_csv(path: str, chunk_rows: int, sep: str) -> Iterator[Tuple[int, tuple]]:
+    first = 0
+    for chunk in pd.read_csv(path, sep=sep, usecols=FEATURE_ORDER, dtype=str, chunksize=chunk_rows,
+                             encoding="utf-8-sig", skip_blank_lines=False):
+        yield first, chunk_to_matrix(chunk)
+        first += len(chunk)
+
+
+def read_simplified_jsonl(path: str, chunk_rows: int) -> Iterator[Tuple[int, tuple]]:
+    first = 0
+    lines: List[str] = []
+    with open(path, encoding="utf-8-sig") as f:
+        for line in f:
+            lines.append(line)
+            if len(lines) == chunk_rows:
+                yield first, (lines,)
+                first += len(lines)
+                lines = []
+    if lines:
+        yield first, (lines,)
+
+
+# ============================================================================
+# Output
+# ============================================================================
+
+class OutputWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._header = True
+        if self.parquet:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                sys.exit("Parquet output needs pyarrow installed (or write .csv)")
+
+    def write(self, df: pd.DataFrame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def build_output(first: int, result) -> pd.DataFrame:
+    dropout_probability, is_dropout, model_confidence, valid, errors = result[:5]
+    n = len(valid)
+    out = pd.DataFrame({
+        "row": np.arange(first, first + n),
+        "dropout_probability": np.full(n, np.nan),
+        "predicted_class": np.full(n, None, dtype=object),
+        "risk_level": np.full(n, None, dtype=object),
+        "model_confidence": np.full(n, np.nan),
+        "error": np.full(n, None, dtype=object),
+    })
+    out.loc[valid, "dropout_probability"] = dropout_probability
+    out.loc[valid, "predicted_class"] = np.where(is_dropout, "Dropout", "Non-Dropout")
+    out.loc[valid, "risk_level"] = risk_levels_for_probabilities(dropout_probability)
+    out.loc[valid, "model_confidence"] = model_confidence
+    if errors:
+        out.loc[~valid, "error"] = errors
+    return out
+
+
+def detect_kind(path: str) -> str:
+    return "simplified" if path.endswith((".jsonl", ".ndjson")) else "raw"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a raw-feature CSV or simplified-assessment JSONL file offline")
+    parser.add_argument("input")
+    parser.add_argument("-o", "--output", help="output .csv or .parquet (default: INPUT.scored.csv)")
+    parser.add_argument("--kind", choices=["raw", "simplified"], help="input kind (default: by extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-rows", type=int, default=settings.csv_chunk_rows)
+    parser.add_argument("--sep", default=",", help="CSV delimiter for raw input")
+    parser.add_argument("--model-path", default=settings.model_path)
+    parser.add_argument("--scaler-path", default=settings.scaler_path)
+    args = parser.parse_args()
+
+    kind = args.kind or detect_kind(args.input)
+    output = args.output or f"{os.path.splitext(args.input)[0]}.scored.csv"
+    writer = OutputWriter(output)
+
+    started = time.perf_counter()
+    pool = ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_init_worker,
+        # The lookup table answers simplified rows online, so it is built for them here too
+        initargs=(args.model_path, args.scaler_path, kind == "simplified")
+    )
+    versions = {f.result() for f in [pool.submit(_worker_ready) for _ in range(args.workers)]}
+    load_s = time.perf_counter() - started
+    print(f"Scoring {args.input} ({kind}) with {args.workers} worker(s), model {', '.join(sorted(versions))} "
+          f"(loaded in {load_s:.1f} s)")
+
+    task = _score_simplified_chunk if kind == "simplified" else _score_raw_chunk
+    chunks = read_simplified_jsonl(args.input, args.chunk_rows) if kind == "simplified" \
+        else read_raw_csv(args.input, args.chunk_rows, args.sep)
+
+    read_s = write_s = prepare_s = score_s = 0.0
+    rows = malformed = 0
+    in_flight: deque = deque()
+
+    def drain_one():
+        nonlocal write_s, prepare_s, score_s, rows, malformed
+        first, future = in_flight.popleft()
+        result = future.result()
+        prepare_s += result[5]
+        score_s += result[6]
+        t = time.perf_counter()
+        out = build_output(first, result)
+        writer.write(out)
+        write_s += time.perf_counter() - t
+        rows += len(out)
+        malformed += int((~result[3]).sum())
+
+    scoring_started = time.perf_counter()
+    try:
+        while True:
+            t = time.perf_counter()
+            item = next(chunks, None)
+            read_s += time.perf_counter() - t
+            if item is None:
+                break
+            first, task_args = item
+            in_flight.append((first, pool.submit(task, *task_args)))
+            # Bounded look-ahead keeps memory flat: at most 2 chunks per worker in flight
+            while len(in_flight) >= 2 * args.workers:
+                drain_one()
+        while in_flight:
+            drain_one()
+    finally:
+        writer.close()
+        pool.shutdown()
+    wall_s = time.perf_counter() - scoring_started
+
+    def rate(seconds: float, parallel: int = 1) -> str:
+        return f"{rows / seconds * parallel:>12.0f} rows/s" if seconds > 0 else f"{'-':>12} rows/s"
+
+    print(f"\n{rows} rows ({malformed} malformed) -> {output}")
+    print(f"  model load      {load_s:8.2f} s")
+    print(f"  read + parse    {read_s:8.2f} s  {rate(read_s)}")
+    if kind == "simplified":
+        print(f"  validate + map  {prepare_s:8.2f} s  {rate(prepare_s, args.workers)}  (worker-seconds, {args.workers} workers)")
+    print(f"  model scoring   {score_s:8.2f} s  {rate(score_s, args.workers)}  (worker-seconds, {args.workers} workers)")
+    print(f"  write           {write_s:8.2f} s  {rate(write_s)}")
+    print(f"  total (wall)    {wall_s:8.2f} s  {rate(wall_s)}")
+
+
+if __name__ == "__main__":
+    main()
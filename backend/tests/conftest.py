@@ -0,0 +1,133 @@
+# backend/tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# Point the app at a scratch database before anything imports app.database
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_tmp.name, 'test.db')}"
+# Predictions written and the model loaded before requests are served, so tests can assert on them
+os.environ["PREDICTION_WRITE_BEHIND_ENABLED"] = "false"
+os.environ["LAZY_MODEL_LOAD"] = "false"
+# Files the app writes next to the code go to the scratch directory too
+os.environ["ARCHIVED_MODELS_DIR"] = os.path.join(_tmp.name, "archived_models")
+os.environ["RETENTION_ARCHIVE_DIR"] = os.path.join(_tmp.name, "prediction_archive")
+os.environ["ADMIN_API_KEY"] = "test-admin-key"
+
+from anyio.from_thread import start_blocking_portal  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import Base, _engine_options, _listen_for_connections, async_database_url  # noqa: E402
+from app.models.ml_model import MLModel  # noqa: E402
+from app.repositories.text_catalog import recommendation_catalog, risk_factor_catalog  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ScratchDatabase:
+    """Write and read-only engines set up like the app's, on their own event loop."""
+
+    def __init__(self, url: str, portal):
+        self.url = url
+        self.dialect = url.split("+")[0]
+        self.portal = portal
+        self.engine = create_async_engine(url, **_engine_options(url, 2, 2))
+        self.read_engine = create_async_engine(url, **_engine_options(url, 2, 2, read_only=True))
+        _listen_for_connections(self.engine)
+        _listen_for_connections(self.read_engine, read_only=True)
+        self.Session = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.ReadSession = async_sessionmaker(self.read_engine, class_=AsyncSession, expire_on_commit=False)
+
+    def run(self, fn, *args):
+        """Run a coroutine function on the loop the engines' connections belong to."""
+        return self.portal.call(fn, *args)
+
+    async def create_schema(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def empty(self):
+        async with self.engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                await conn.execute(table.delete())
+
+    async def dispose(self):
+        await self.engine.dispose()
+        await self.read_engine.dispose()
+
+
+def _clear_text_catalogs():
+    risk_factor_catalog.clear()
+    recommendation_catalog.clear()
+
+
+@pytest.fixture(scope="session")
+def model_version():
+    """The saved model, built once with its compiled evaluator and lookup table."""
+    return MLModel.build_version(os.path.join(BACKEND_DIR, settings.model_path),
+                                 os.path.join(BACKEND_DIR, settings.scaler_path))
+
+
+@pytest.fixture(scope="session", params=["sqlite", "postgresql"])
+def database_backend(request):
+    """
+    A scratch database per backend. PostgreSQL runs only when TEST_POSTGRES_URL
+    names a scratch database (its tables are dropped and recreated), e.g.
+    TEST_POSTGRES_URL=postgresql://postgres@localhost:5432/dropout_test
+    """
+    if request.param == "sqlite":
+        url = f"sqlite+aiosqlite:///{os.path.join(_tmp.name, 'scratch.db')}"
+    elif os.environ.get("TEST_POSTGRES_URL"):
+        url = async_database_url(os.environ["TEST_POSTGRES_URL"])
+    else:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+
+    with start_blocking_portal() as portal:
+        database = ScratchDatabase(url, portal)
+        database.run(database.create_schema)
+        try:
+            yield database
+        finally:
+            database.run(database.dispose)
+
+
+@pytest.fixture
+def database(database_backend):
+    """The scratch database of each backend, emptied for the test."""
+    database_backend.run(database_backend.empty)
+    # The text catalog caches are per process: keep ids of one database out of the other
+    _clear_text_catalogs()
+    yield database_backend
+    _clear_text_catalogs()
+
+
+@pytest.fixture
+def simplified_payload():
+    """A valid SimplifiedAssessmentRequest body."""
+    return {
+        "consent_given": True, "consent_data_processing": True, "consent_anonymous_analytics": True,
+        "academic_year": "1st", "attendance": "rarely", "overwhelm_frequency": "always", "study_hours": "1-3",
+        "performance_satisfaction": 3, "advisor_interaction": "never", "support_network_strength": 2,
+        "extracurricular_hours": 0, "employment_status": "full-time", "financial_stress": "high",
+        "career_alignment": 2, "services_used": [], "withdrawal_considered": True,
+        "withdrawal_reasons": ["Financial challenges"],
+    }
+
+
+@pytest.fixture
+def admin_headers():
+    """Headers that authorise a request to the /admin API."""
+    return {"X-Admin-Key": settings.admin_api_key}
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The API with startup run (schema, demo data, model) against the scratch database."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
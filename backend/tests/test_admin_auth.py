@@ -0,0 +1,33 @@
+# backend/tests/test_admin_auth.py
+from app.config import settings
+
+
+def test_admin_endpoints_require_the_key(client, admin_headers):
+    assert client.get("/api/v1/admin/runtime").status_code == 401
+    assert client.get("/api/v1/admin/runtime", headers={"X-Admin-Key": "wrong"}).status_code == 401
+    assert client.get("/api/v1/admin/runtime", headers=admin_headers).status_code == 200
+
+
+def test_admin_api_is_disabled_without_a_configured_key(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(settings, "admin_api_key", "")
+    assert client.get("/api/v1/admin/model", headers=admin_headers).status_code == 403
+    assert client.get("/api/v1/admin/model", headers={"X-Admin-Key": ""}).status_code == 403
+
+
+def test_dashboard_reads_are_public_unless_configured_otherwise(client, admin_headers, monkeypatch):
+    assert client.get("/api/v1/admin/dashboard/stats").status_code == 200
+
+    monkeypatch.setattr(settings, "public_dashboard", False)
+    assert client.get("/api/v1/admin/dashboard/stats").status_code == 401
+    assert client.get("/api/v1/admin/dashboard/stats", headers=admin_headers).status_code == 200
+
+
+def test_model_reload_only_reads_the_configured_files(client, admin_headers):
+    before = client.get("/api/v1/admin/model", headers=admin_headers).json()
+    response = client.post("/api/v1/admin/model/reload", headers=admin_headers,
+                           json={"model_path": "/tmp/untrusted.joblib", "scaler_path": "/tmp/untrusted.joblib"})
+    assert response.status_code == 200
+    body = response.json()
+    assert not body["reloaded"]
+    assert body["version"] == before["version"]
+    assert body["model_path"] == settings.model_path
@@ -0,0 +1,72 @@
+# backend/tests/test_assessment_codes.py
+import itertools
+
+import pytest
+
+from app.utils.assessment_codes import (
+    CHOICES, MULTI_SELECT, UNLISTED, choice_code, decode_assessment, encode_assessment, multi_select_bit
+)
+
+
+def round_trip(answers):
+    return decode_assessment(encode_assessment(answers))
+
+
+def test_every_listed_choice_round_trips(simplified_payload):
+    for field, values in CHOICES.items():
+        for value in values:
+            row = encode_assessment(dict(simplified_payload, **{field: value}))
+            assert row[field] == choice_code(field, value)
+            assert row['unlisted_answers'] is None
+            assert decode_assessment(row)[field] == value
+
+
+def test_listed_multi_select_is_a_bitmask(simplified_payload):
+    for field, values in MULTI_SELECT.items():
+        for chosen in itertools.combinations(values, 2):
+            row = encode_assessment(dict(simplified_payload, **{field: list(chosen)}))
+            assert row[field] == multi_select_bit(field, chosen[0]) | multi_select_bit(field, chosen[1])
+            assert row['unlisted_answers'] is None
+            assert decode_assessment(row)[field] == list(chosen)
+
+
+def test_full_assessment_round_trips(simplified_payload):
+    answers = dict(simplified_payload, services_used=["academic", "counseling"])
+    assert round_trip(answers) == answers
+
+
+@pytest.mark.parametrize("field, value", [
+    ("attendance", "mostly"),
+    ("academic_year", "5th"),
+    ("study_hours", "0-2"),
+    ("financial_stress", ""),
+])
+def test_unlisted_choice_is_kept_verbatim(simplified_payload, field, value):
+    row = encode_assessment(dict(simplified_payload, **{field: value}))
+    assert row[field] == UNLISTED
+    assert decode_assessment(row)[field] == value
+
+
+@pytest.mark.parametrize("field, values", [
+    ("services_used", ["academic", "tutoring"]),            # unlisted entry
+    ("services_used", ["career", "career"]),                # duplicate
+    ("withdrawal_reasons", ["Mental health", "Academic difficulty"]),  # not in vocabulary order
+    ("withdrawal_reasons", ["Other"]),
+])
+def test_unlisted_multi_select_is_kept_verbatim(simplified_payload, field, values):
+    row = encode_assessment(dict(simplified_payload, **{field: values}))
+    assert row['unlisted_answers'] is not None
+    assert decode_assessment(row)[field] == values
+
+
+def test_empty_multi_select(simplified_payload):
+    row = encode_assessment(dict(simplified_payload, services_used=[], withdrawal_reasons=[]))
+    assert (row['services_used'], row['withdrawal_reasons'], row['unlisted_answers']) == (0, 0, None)
+    assert round_trip(dict(simplified_payload, services_used=[]))['services_used'] == []
+
+
+def test_filters_reject_unlisted_values():
+    with pytest.raises(ValueError):
+        choice_code("attendance", "mostly")
+    with pytest.raises(ValueError):
+        multi_select_bit("services_used", "tutoring")
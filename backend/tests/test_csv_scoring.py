@@ -0,0 +1,71 @@
+# backend/tests/test_csv_scoring.py
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from app.config import settings
+from app.utils.feature_mapping import FEATURE_ORDER
+
+URL = "/api/v1/predict/raw/csv"
+
+# Row 2 misses a value and row 3 has a non-numeric one; with 2-row chunks the second chunk is all malformed
+ROWS = [
+    [10, 9, 1, 0, 20, 1, 1, 1],
+    [0, 0, 0, 1, 35, 0, 0, 2],
+    [5, 5, "", 0, 25, 1, 1, 2],
+    [5, "n/a", 1, 0, 25, 1, 1, 2],
+    [3, 2, 0, 0, 19, 1, 0, 1],
+]
+
+
+@pytest.fixture
+def upload(monkeypatch):
+    monkeypatch.setattr(settings, "csv_chunk_rows", 2)
+    df = pd.DataFrame(ROWS, columns=FEATURE_ORDER)
+    df.insert(0, "Student id", range(len(ROWS)))  # extra columns are ignored
+    return {"file": ("export.csv", df.to_csv(index=False).encode(), "text/csv")}
+
+
+def expected_predictions(model_version, rows):
+    return model_version.predict_batch([[float(v) for v in row] for row in rows])
+
+
+def test_ndjson_reports_malformed_rows(client, model_version, upload):
+    response = client.post(URL, files=upload)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results, summary = lines[:-1], lines[-1]["summary"]
+
+    assert response.status_code == 200
+    assert [r["row"] for r in results] == [0, 1, 2, 3, 4]
+    assert results[2]["error"] == f"Missing or non-numeric value for: {FEATURE_ORDER[2]}"
+    assert results[3]["error"] == f"Missing or non-numeric value for: {FEATURE_ORDER[1]}"
+    assert results[2]["dropout_probability"] is None and results[3]["predicted_class"] is None
+
+    expected = expected_predictions(model_version, [ROWS[0], ROWS[1], ROWS[4]])
+    for result, pred in zip([results[0], results[1], results[4]], expected):
+        assert result["error"] is None
+        assert result["dropout_probability"] == pytest.approx(pred["dropout_probability"], abs=1e-12)
+        assert result["predicted_class"] == pred["predicted_class"]
+    assert (summary["rows"], summary["scored"], summary["malformed"]) == (5, 3, 2)
+
+
+def test_csv_format(client, upload):
+    response = client.post(URL, files=upload, params={"format": "csv"})
+    out = pd.read_csv(io.StringIO(response.text))
+
+    assert response.status_code == 200
+    assert out["row"].tolist() == [0, 1, 2, 3, 4]
+    assert out["error"].isna().tolist() == [True, True, False, False, True]
+
+
+def test_missing_feature_column_fails_before_streaming(client):
+    csv = pd.DataFrame([ROWS[0][:-1]], columns=FEATURE_ORDER[:-1]).to_csv(index=False).encode()
+    response = client.post(URL, files={"file": ("export.csv", csv, "text/csv")})
+    assert response.status_code == 400
+    assert "Unreadable CSV" in response.json()["detail"]
+
+
+def test_unknown_format(client, upload):
+    assert client.post(URL, files=upload, params={"format": "xml"}).status_code == 400
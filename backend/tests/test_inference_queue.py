@@ -0,0 +1,32 @@
+# backend/tests/test_inference_queue.py
+import asyncio
+
+from app.models.inference_queue import InferenceBatcher
+
+# Not a reachable simplified-form vector, so it is never answered by the lookup table
+FEATURES = [17.5, 13.25, 1, 0, 33, 1, 0, 2]
+
+
+class RecordingExecutor:
+    def __init__(self):
+        self.batches = []
+
+    async def predict_batch(self, features, version):
+        self.batches.append(len(features))
+        return version.predict_batch(features)
+
+
+def test_stop_flushes_partially_collected_batch(model_version):
+    async def run():
+        executor = RecordingExecutor()
+        # A window far longer than the test, so the requests sit in `_collect` when stop() runs
+        batcher = InferenceBatcher(None, executor, window_ms=60_000, max_batch_size=64)
+        batcher.start()
+        callers = [asyncio.create_task(batcher.predict(FEATURES, model_version)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        await batcher.stop()
+        return executor.batches, await asyncio.wait_for(asyncio.gather(*callers), timeout=5)
+
+    batches, results = asyncio.run(run())
+    assert batches == [3]
+    assert results == model_version.predict_batch([FEATURES] * 3)
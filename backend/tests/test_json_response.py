@@ -0,0 +1,50 @@
+# backend/tests/test_json_response.py
+import json
+
+import numpy as np
+import pytest
+
+from app.models.schemas import BatchPredictionItem, BatchPredictionResponse, FeatureAttribution, SimplifiedAssessmentRequest
+from app.routers.prediction import build_ml_prediction_response, calculate_fallback_risk
+from app.utils.json_response import encode_batch_response, encode_prediction_response
+
+PROBABILITIES = [0.0, 1e-07, 0.123456789, 1 / 3, 0.35, 0.6, 0.999999, 1.0]
+
+
+def ml_response(payload, p, scalar=float, attribution=None):
+    pred = {"dropout_probability": scalar(p), "predicted_class": "Dropout" if p >= 0.5 else "Non-Dropout",
+            "model_confidence": scalar(max(p, 1 - p))}
+    return build_ml_prediction_response(SimplifiedAssessmentRequest(**payload), pred, attribution)
+
+
+def validated(response):
+    """The same response rebuilt through validation, so every field holds a plain Python value."""
+    return type(response).model_validate(dict(response))
+
+
+@pytest.mark.parametrize("p", PROBABILITIES)
+def test_prediction_encoding_is_model_dump_json(simplified_payload, p):
+    for response in (ml_response(simplified_payload, p),
+                     calculate_fallback_risk(SimplifiedAssessmentRequest(**dict(simplified_payload, attendance="always")))):
+        assert encode_prediction_response(response) == response.model_dump_json().encode()
+
+
+@pytest.mark.parametrize("scalar", [np.float64, np.float32])
+@pytest.mark.parametrize("p", PROBABILITIES)
+def test_numpy_scalar_fields_encode_as_python_values(simplified_payload, p, scalar):
+    response = ml_response(simplified_payload, p, scalar)
+    assert isinstance(response.dropout_probability, scalar)
+    assert json.loads(encode_prediction_response(response)) == json.loads(validated(response).model_dump_json())
+
+
+def test_attribution_and_batch_encoding(simplified_payload):
+    attribution = FeatureAttribution(base_value=-0.5, contributions={"Debtor": 0.25, "Gender": -0.125})
+    response = ml_response(simplified_payload, 0.42, np.float64, attribution)
+    assert json.loads(encode_prediction_response(response)) == json.loads(response.model_dump_json())
+
+    batch = BatchPredictionResponse(
+        results=[BatchPredictionItem(index=0, result=validated(response)),
+                 BatchPredictionItem(index=1, error="Invalid assessment: bad")],
+        total=2, succeeded=1, failed=1, ml_model_used=True, inference_ms=1.5, elapsed_ms=2.25
+    )
+    assert json.loads(encode_batch_response(batch)) == json.loads(batch.model_dump_json())
@@ -0,0 +1,37 @@
+# backend/tests/test_lookup_table.py
+import numpy as np
+
+from app.models.lookup_table import reachable_feature_vectors
+
+
+def live_prediction(version, row):
+    return version._format_predictions(version._predict_proba(row.reshape(1, -1), per_request=True))[0]
+
+
+def test_every_reachable_vector_matches_live_inference(model_version):
+    vectors = reachable_feature_vectors()
+
+    assert model_version.lookup.size == len(vectors)
+    assert (model_version.lookup.get_many(vectors) >= 0).all()
+    for row in vectors:
+        assert model_version.lookup.get(row.tolist()) == live_prediction(model_version, row)
+
+
+def test_batch_lookup_matches_single_lookup(model_version):
+    vectors = reachable_feature_vectors()
+    cells = model_version.lookup.get_many(vectors)
+
+    assert [model_version.lookup.row(cell) for cell in cells.tolist()] == \
+        [model_version.lookup.get(row) for row in vectors.tolist()]
+
+
+def test_unreachable_vectors_miss(model_version):
+    row = reachable_feature_vectors()[0].copy()
+    row[0] += 0.5
+
+    assert model_version.lookup.get(row.tolist()) is None
+    assert model_version.lookup.get(row.tolist()[:-1]) is None
+    assert model_version.lookup.get_many(np.array([row])).tolist() == [-1]
+    # Mixed batches score only the misses, in order
+    assert model_version.predict_batch([row, reachable_feature_vectors()[0]]) == \
+        [live_prediction(model_version, row), model_version.lookup.get(reachable_feature_vectors()[0].tolist())]
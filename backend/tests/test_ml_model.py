@@ -0,0 +1,54 @@
+# backend/tests/test_ml_model.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.models.ml_model import ModelVersion
+from app.utils.feature_mapping import FEATURE_ORDER
+from conftest import BACKEND_DIR
+
+
+def test_predict_batch_empty_list(model_version):
+    assert model_version.predict_batch([]) == []
+
+
+def test_predict_batch_empty_matrix(model_version):
+    assert model_version.predict_batch(np.zeros((0, 8))) == []
+
+
+def test_predict_batch_empty_without_lookup(model_version):
+    version = ModelVersion(model_version.model, model_version.scaler, model_version.version,
+                           model_version.model_path, model_version.scaler_path, build_lookup=False)
+    assert version.predict_batch([]) == []
+
+
+def test_predict_arrays_empty(model_version):
+    probability, is_dropout, confidence = model_version.predict_arrays(np.zeros((0, 8)))
+    assert len(probability) == len(is_dropout) == len(confidence) == 0
+
+
+def dataset_features():
+    df = pd.read_csv(os.path.join(BACKEND_DIR, "ml", "data", "dataset.csv"))
+    X = df[FEATURE_ORDER]
+    return X.fillna(X.median()).to_numpy(dtype=float)
+
+
+def test_compiled_evaluator_matches_sklearn(model_version):
+    X = dataset_features()
+    expected = model_version.model.predict_proba(model_version.scaler.transform(X))
+
+    assert np.abs(model_version.compiled.predict_proba(X) - expected).max() < 1e-9
+    predicted = [p['predicted_class'] == "Dropout" for p in model_version._format_predictions(expected)]
+    assert predicted == (model_version.model.predict(model_version.scaler.transform(X)) == 1).tolist()
+
+
+def test_compiled_evaluator_matches_sklearn_on_split_thresholds(model_version):
+    """Rows sitting exactly on a split, where folding the scaler into thresholds could round wrongly."""
+    compiled = model_version.compiled
+    splits = np.flatnonzero(np.isfinite(compiled.threshold))
+    X = np.repeat(dataset_features()[:1], len(splits), axis=0)
+    X[np.arange(len(splits)), compiled.feature[splits]] = compiled.threshold[splits]
+    expected = model_version.model.predict_proba(model_version.scaler.transform(X))
+
+    assert np.abs(compiled.predict_proba(X) - expected).max() < 1e-9
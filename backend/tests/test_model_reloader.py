@@ -0,0 +1,17 @@
+# backend/tests/test_model_reloader.py
+import asyncio
+
+from app.models.ml_model import MLModel
+from app.models.model_reloader import ModelReloader
+
+
+def test_reload_of_unchanged_files_builds_nothing(model_version, monkeypatch):
+    model = MLModel()
+    model.activate(model_version)
+    builds = []
+    monkeypatch.setattr(MLModel, "build_version", staticmethod(lambda *paths: builds.append(paths)))
+
+    active, changed = asyncio.run(ModelReloader(model, None, watch_interval=0).reload())
+    assert active is model_version
+    assert not changed
+    assert builds == []
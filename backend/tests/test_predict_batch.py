@@ -0,0 +1,45 @@
+# backend/tests/test_predict_batch.py
+from sqlalchemy import event, func, select
+
+from app.database import Prediction, engine
+
+
+def count_rows(client, endpoint):
+    async def count():
+        async with engine.connect() as conn:
+            return (await conn.execute(
+                select(func.count()).select_from(Prediction).where(Prediction.endpoint == endpoint))).scalar()
+    return client.portal.call(count)
+
+
+def test_batch_stores_all_rows_with_one_insert(client, simplified_payload):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO predictions"):
+            statements.append(statement)
+
+    before = count_rows(client, "batch")
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        response = client.post("/api/v1/predict/batch",
+                               json={"assessments": [simplified_payload, {"bad": 1}, simplified_payload,
+                                                     dict(simplified_payload, attendance="always")]})
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+    body = response.json()
+    assert response.status_code == 200
+    assert (body["succeeded"], body["failed"]) == (3, 1)
+    assert body["results"][1]["error"].startswith("Invalid assessment:")
+    assert len(statements) == 1
+    assert count_rows(client, "batch") == before + 3
+
+
+def test_batch_of_invalid_rows_stores_nothing(client):
+    before = count_rows(client, "batch")
+    response = client.post("/api/v1/predict/batch", json={"assessments": [{"bad": 1}]})
+
+    assert response.status_code == 200
+    assert response.json()["failed"] == 1
+    assert count_rows(client, "batch") == before
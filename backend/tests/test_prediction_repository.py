@@ -0,0 +1,177 @@
+# backend/tests/test_prediction_repository.py
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.exc import DBAPIError
+
+from app.config import settings
+from app.database import AssessmentInput, Prediction, RiskFactor
+from app.models.schemas import SimplifiedAssessmentRequest
+from app.repositories.prediction_repository import (
+    PredictionRecord, get_cohort_stats, get_dashboard_stats, get_recent_assessments, get_risk_distribution,
+    get_risk_trends, get_top_risk_factors, save_predictions
+)
+from app.routers.prediction import calculate_fallback_risk
+
+ATTENDANCE = ("always", "often", "sometimes", "rarely", "never")
+OVERWHELM = ("never", "rarely", "sometimes", "often", "always")
+ADVISOR = ("monthly", "2-3-semester", "once-semester", "never")
+EMPLOYMENT = ("not-employed", "part-time", "full-time")
+STRESS = ("none", "low", "moderate", "high", "very-high")
+SERVICES = ([], ["counseling"], ["counseling", "financial"], ["academic", "financial"])
+REASONS = ([], ["Financial challenges"], ["Mental health", "Financial challenges"])
+
+
+def varied_records(payload, n, start, step=timedelta(seconds=1)):
+    """
+    n heuristic-scored predictions of every risk level; record i is made
+    i steps after `start` and has extracurricular_hours i % 20.
+    """
+    records = []
+    for i in range(n):
+        data = SimplifiedAssessmentRequest.model_validate(dict(
+            payload, academic_year=("1st", "2nd", "3rd", "4th")[i % 4], attendance=ATTENDANCE[i % 5],
+            overwhelm_frequency=OVERWHELM[i % 7 % 5], advisor_interaction=ADVISOR[i % 4],
+            employment_status=EMPLOYMENT[i % 3], financial_stress=STRESS[i % 5 if i % 2 else (i + 2) % 5],
+            performance_satisfaction=i * 3 % 11, support_network_strength=i * 7 % 11, career_alignment=i % 6 * 2,
+            extracurricular_hours=i % 20, services_used=SERVICES[i % 4], withdrawal_reasons=REASONS[i % 3],
+            withdrawal_considered=i % 2 == 0
+        ))
+        records.append(PredictionRecord(calculate_fallback_risk(data), data, "repository-test", None,
+                                        start + i * step))
+    return records
+
+
+def test_large_batch_statement_count_and_row_order(database, simplified_payload):
+    start = datetime.utcnow().replace(microsecond=0) - timedelta(days=200)
+    records = varied_records(simplified_payload, 5000, start)
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split(" (")[0])
+
+    async def run():
+        # The same answers a day earlier put every text in the catalog caches, so the batch only inserts
+        async with database.Session() as db:
+            await save_predictions(db, varied_records(simplified_payload, len(records), start - timedelta(days=1)))
+        event.listen(database.engine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            async with database.Session() as db:
+                ids = await save_predictions(db, records)
+        finally:
+            event.remove(database.engine.sync_engine, "before_cursor_execute", on_execute)
+        async with database.Session() as db:
+            stored = (await db.execute(
+                select(Prediction.id, Prediction.created_at, Prediction.risk_score, AssessmentInput.extracurricular_hours)
+                .join(AssessmentInput, AssessmentInput.prediction_id == Prediction.id)
+                .where(Prediction.created_at >= start)
+            )).all()
+            factor_counts = dict((await db.execute(
+                select(RiskFactor.prediction_id, func.count()).group_by(RiskFactor.prediction_id)
+            )).all())
+        return ids, stored, factor_counts
+
+    ids, stored, factor_counts = database.run(run)
+
+    pages = math.ceil(len(records) / settings.db_insert_page_size)
+    assert statements == ["INSERT INTO predictions"] * pages + [
+        "INSERT INTO assessment_inputs", "INSERT INTO risk_factors", "INSERT INTO recommendations"]
+    assert len(ids) == len(set(ids)) == len(records) == len(stored)
+    by_id = {row.id: row for row in stored}
+    for i, (prediction_id, record) in enumerate(zip(ids, records)):
+        row = by_id[prediction_id]
+        assert row.created_at == record.created_at
+        assert row.risk_score == record.prediction.risk_score
+        assert row.extracurricular_hours == i % 20
+        assert factor_counts.get(prediction_id, 0) == len(record.prediction.risk_factors)
+
+
+def level_counts(records):
+    counts = Counter(record.prediction.risk_level for record in records)
+    return {'high': counts['high'], 'medium': counts['medium'], 'low': counts['low']}
+
+
+def test_dashboard_queries(database, simplified_payload):
+    now = datetime.utcnow()
+    # One prediction every 9 hours over the last 7 weeks
+    records = varied_records(simplified_payload, 130, now - timedelta(weeks=7), step=timedelta(hours=9))
+    assert all(level_counts(records).values())
+
+    async def run():
+        async with database.Session() as db:
+            ids = await save_predictions(db, records)
+        async with database.ReadSession() as db:
+            return ids, {
+                'stats': await get_dashboard_stats(db),
+                'distribution': await get_risk_distribution(db),
+                'trends': await get_risk_trends(db),
+                'recent': await get_recent_assessments(db, limit=10),
+                'factors': await get_top_risk_factors(db, limit=3),
+                'full_time_high_stress': await get_cohort_stats(
+                    db, {'employment_status': ['full-time'], 'financial_stress': ['high', 'very-high']}),
+                'financial_counseling': await get_cohort_stats(db, services_used=['financial', 'counseling']),
+                'money_reasons': await get_cohort_stats(db, withdrawal_reasons=['Financial challenges'],
+                                                        withdrawal_considered=True),
+            }
+
+    ids, results = database.run(run)
+
+    assert results['distribution'] == level_counts(records)
+    stats = results['stats']
+    assert stats['total_assessments'] == len(records)
+    assert (stats['high_risk_count'], stats['medium_risk_count'], stats['low_risk_count']) == tuple(
+        level_counts(records).values())
+    assert stats['average_risk_score'] == round(sum(r.prediction.risk_score for r in records) / len(records), 1)
+
+    weeks = {}
+    for record in sorted(records, key=lambda r: r.created_at):
+        week = weeks.setdefault(record.created_at.strftime('%Y-%W'), Counter())
+        week[record.prediction.risk_level] += 1
+    assert results['trends'] == [
+        {'week': f"W{key.split('-')[1]}", 'high_risk': c['high'], 'medium_risk': c['medium'], 'low_risk': c['low']}
+        for key, c in sorted(weeks.items())
+    ]
+
+    newest = sorted(zip(ids, records), key=lambda item: item[1].created_at, reverse=True)[:10]
+    assert [(a['id'], a['risk'], a['type']) for a in results['recent']] == [
+        (i, r.prediction.risk_level, f"Year {r.assessment_input.academic_year} Review") for i, r in newest]
+
+    categories = Counter(f.category for r in records for f in r.prediction.risk_factors)
+    top = sorted(categories.items(), key=lambda item: (-item[1], item[0]))[:3]
+    assert [(f['name'], f['percentage']) for f in results['factors']] == [
+        (name, round(count / sum(c for _, c in top) * 100, 1)) for name, count in top]
+
+    cohorts = {
+        'full_time_high_stress': [r for r in records if r.assessment_input.employment_status == 'full-time'
+                                  and r.assessment_input.financial_stress in ('high', 'very-high')],
+        'financial_counseling': [r for r in records
+                                 if {'financial', 'counseling'} <= set(r.assessment_input.services_used)],
+        'money_reasons': [r for r in records if r.assessment_input.withdrawal_considered
+                          and 'Financial challenges' in r.assessment_input.withdrawal_reasons],
+    }
+    for name, members in cohorts.items():
+        assert members, name
+        cohort = results[name]
+        assert (cohort['total_assessments'], cohort['high_risk_count'], cohort['medium_risk_count'],
+                cohort['low_risk_count']) == (len(members), *level_counts(members).values()), name
+
+
+def test_read_engine_rejects_writes(database):
+    async def write_through_read_engine():
+        async with database.ReadSession() as db:
+            await db.execute(insert(Prediction).values(
+                risk_level='low', risk_score=1, dropout_probability=0.01, prediction_confidence=0.99,
+                endpoint='read-only-test',
+                created_at=datetime.utcnow()))
+            await db.commit()
+
+    async def count():
+        async with database.Session() as db:
+            return (await db.execute(select(func.count()).select_from(Prediction))).scalar()
+
+    with pytest.raises(DBAPIError, match="read-only|readonly"):
+        database.run(write_through_read_engine)
+    assert database.run(count) == 0
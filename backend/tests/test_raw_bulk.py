@@ -0,0 +1,72 @@
+# backend/tests/test_raw_bulk.py
+import io
+
+import numpy as np
+import pytest
+
+from app.utils.feature_mapping import FEATURE_ORDER
+
+URL = "/api/v1/predict/raw/bulk"
+
+
+def columns(X):
+    return {f: X[:, i].tolist() for i, f in enumerate(FEATURE_ORDER)}
+
+
+def npy(X):
+    buffer = io.BytesIO()
+    np.save(buffer, X)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def matrix():
+    return np.random.default_rng(0).integers(0, 40, size=(50, len(FEATURE_ORDER))).astype(float)
+
+
+def test_json_and_npy_bodies_match_predict_arrays(client, model_version, matrix):
+    expected_probability, expected_dropout, _ = model_version.predict_arrays(matrix)
+    for response in (client.post(URL, json=columns(matrix)),
+                     client.post(URL, content=npy(matrix), headers={"Content-Type": "application/x-npy"})):
+        body = response.json()
+        assert response.status_code == 200
+        assert body["n"] == len(matrix)
+        assert np.allclose(body["dropout_probability"], expected_probability, rtol=0, atol=1e-12)
+        assert body["predicted_class"] == ["Dropout" if d else "Non-Dropout" for d in expected_dropout]
+
+
+def test_empty_matrix(client):
+    body = client.post(URL, json=columns(np.zeros((0, len(FEATURE_ORDER))))).json()
+    assert (body["n"], body["dropout_probability"], body["predicted_class"]) == (0, [], [])
+
+
+@pytest.mark.parametrize("mutate, detail", [
+    (lambda c: c.pop(FEATURE_ORDER[0]), "Missing feature keys"),
+    (lambda c: c[FEATURE_ORDER[1]].pop(), "differ in length"),
+    (lambda c: c[FEATURE_ORDER[2]].__setitem__(3, "x"), "must be numeric"),
+    (lambda c: c[FEATURE_ORDER[3]].__setitem__(0, None), "must be finite"),
+])
+def test_malformed_json_is_rejected(client, matrix, mutate, detail):
+    body = columns(matrix)
+    mutate(body)
+    response = client.post(URL, json=body)
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
+
+
+def test_non_finite_values_are_rejected(client, matrix):
+    matrix[7, 2] = np.nan
+    response = client.post(URL, content=npy(matrix), headers={"Content-Type": "application/x-npy"})
+    assert response.status_code == 400
+    assert "finite" in response.json()["detail"]
+
+
+def test_wrong_npy_shape_is_rejected(client, matrix):
+    response = client.post(URL, content=npy(matrix[:, :5]), headers={"Content-Type": "application/x-npy"})
+    assert response.status_code == 400
+    assert "shape" in response.json()["detail"]
+
+
+def test_unsupported_content_type(client, matrix):
+    response = client.post(URL, content=b"a,b", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 415
@@ -0,0 +1,112 @@
+# backend/tests/test_retention.py
+import asyncio
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import Prediction, PredictionRollup
+from app.models.retention import MIN_RETENTION_DAYS, RetentionJob, read_archive
+from app.models.schemas import SimplifiedAssessmentRequest
+from app.repositories.prediction_repository import (
+    PredictionRecord, get_dashboard_stats, get_risk_distribution, get_top_risk_factors, save_predictions
+)
+from app.routers.prediction import calculate_fallback_risk
+from conftest import BACKEND_DIR
+
+
+def test_short_retention_does_not_block_import():
+    env = dict(os.environ, RETENTION_DAYS=str(MIN_RETENTION_DAYS - 1), RETENTION_ENABLED="false")
+    result = subprocess.run([sys.executable, "-c", "import app.main"], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+
+
+def test_short_retention_disables_the_job(tmp_path):
+    job = RetentionJob(MIN_RETENTION_DAYS - 1, str(tmp_path), chunk_size=100, chunk_pause_ms=0,
+                       interval_seconds=3600)
+
+    async def run():
+        job.start()
+        assert not job.is_running
+        with pytest.raises(ValueError, match="retention_days"):
+            await job.run_once()
+
+    asyncio.run(run())
+
+
+def expired_records(payload, days_ago, now):
+    """Heuristic-scored predictions of varied risk, made on each of `days_ago` (two per day)."""
+    records = []
+    for i, days in enumerate(days_ago):
+        for attendance, stress in (("always", "none"), ("never", "very-high")):
+            data = SimplifiedAssessmentRequest.model_validate(
+                dict(payload, attendance=attendance, financial_stress=stress, withdrawal_considered=i % 2 == 0))
+            records.append(PredictionRecord(calculate_fallback_risk(data), data, "simplified", None,
+                                            now - timedelta(days=days, hours=1)))
+    return records
+
+
+def test_archived_predictions_stay_in_all_time_numbers(database, simplified_payload, tmp_path):
+    now = datetime.utcnow()
+    # Two chunks land on the same days, so the second adds to the first chunk's rollup rows
+    records = expired_records(simplified_payload, [400, 400, 401], now)
+    assert any(record.prediction.risk_factors for record in records)
+
+    async def dashboard():
+        async with database.ReadSession() as db:
+            return (await get_dashboard_stats(db), await get_risk_distribution(db),
+                    await get_top_risk_factors(db, limit=50))
+
+    async def rollups():
+        async with database.Session() as db:
+            return {(row.day, row.risk_level): (row.predictions, row.risk_score_sum)
+                    for row in (await db.execute(select(PredictionRollup))).scalars()}
+
+    async def run():
+        async with database.Session() as db:
+            ids = await save_predictions(db, records)
+        before, rollups_before = await dashboard(), await rollups()
+        job = RetentionJob(365, str(tmp_path), chunk_size=4, chunk_pause_ms=0, interval_seconds=3600,
+                           session_factory=database.Session)
+        result = await job.run_once(now=now)
+        async with database.Session() as db:
+            remaining = (await db.execute(select(Prediction.id).where(Prediction.id.in_(ids)))).all()
+        return ids, before, rollups_before, result, await dashboard(), await rollups(), remaining
+
+    ids, before, rollups_before, result, after, rollups_after, remaining = database.run(run)
+
+    assert result['archived'] == len(records)
+    assert result['chunks'] == 2
+    assert remaining == []
+    assert after == before
+
+    expected = dict(rollups_before)
+    for record in records:
+        key = (record.created_at.date(), record.prediction.risk_level)
+        count, score_sum = expected.get(key, (0, 0))
+        expected[key] = (count + 1, score_sum + record.prediction.risk_score)
+    assert rollups_after == expected
+
+    archived = {r['id']: r for path in result['files'] for r in read_archive(path)}
+    assert sorted(archived) == sorted(ids)
+    for prediction_id, record in zip(ids, records):
+        assert archived[prediction_id]['assessment'] == record.assessment_input.model_dump()
+        assert [f['factor'] for f in archived[prediction_id]['risk_factors']] == \
+            [f.factor for f in record.prediction.risk_factors]
+
+
+def test_manual_retention_run_requires_the_admin_key(client, admin_headers, monkeypatch):
+    assert client.post("/api/v1/admin/retention/run").status_code == 401
+    assert client.post("/api/v1/admin/retention/run", headers={"X-Admin-Key": "wrong"}).status_code == 401
+    monkeypatch.setattr(settings, "admin_api_key", "")
+    assert client.post("/api/v1/admin/retention/run", headers=admin_headers).status_code == 403
+    monkeypatch.undo()
+
+    response = client.post("/api/v1/admin/retention/run", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["cutoff"]
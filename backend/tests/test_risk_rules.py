@@ -0,0 +1,73 @@
+# backend/tests/test_risk_rules.py
+"""
+The rule table against risk factors and recommendations frozen from the
+baseline code (the hand-written if-chains of routers/prediction.py), for
+every fallback tier, ML probabilities on and around the risk-level
+boundaries, and the low / medium risk factor filters.
+
+tests/data/baseline_rules.json holds, per case, the answers that differ
+from `base_answers` and the expected output, with factor and
+recommendation texts stored once in the text tables.
+"""
+import json
+import os
+
+import pytest
+
+from app.models.schemas import SimplifiedAssessmentRequest
+from app.routers.prediction import build_ml_prediction_response, build_ml_prediction_responses, calculate_fallback_risk
+
+with open(os.path.join(os.path.dirname(__file__), "data", "baseline_rules.json")) as f:
+    BASELINE = json.load(f)
+
+CASES = BASELINE["cases"]
+
+
+def assessment(case):
+    return SimplifiedAssessmentRequest(**dict(BASELINE["base_answers"], **case["answers"]))
+
+
+def model_prediction(probability: str) -> dict:
+    """The model output the baseline was run with for a probability."""
+    p = float(probability)
+    return {"dropout_probability": p, "predicted_class": "Dropout" if p >= 0.5 else "Graduate",
+            "model_confidence": max(p, 1 - p)}
+
+
+def summary(response) -> dict:
+    """The response in the fixture's form, after checking its texts against the text tables."""
+    for factor in response.risk_factors:
+        assert [factor.category, factor.description] == BASELINE["risk_factor_texts"][factor.factor]
+    for recommendation in response.recommendations:
+        assert recommendation.model_dump() == BASELINE["recommendation_texts"][recommendation.title]
+    return {
+        "risk_level": response.risk_level,
+        "risk_score": response.risk_score,
+        "risk_factors": [[factor.factor, factor.impact] for factor in response.risk_factors],
+        "recommendations": [recommendation.title for recommendation in response.recommendations],
+    }
+
+
+def test_cases_cover_every_tier_and_filter():
+    fallback_levels = {case["fallback"]["risk_level"] for case in CASES}
+    ml_levels = {expected["risk_level"] for case in CASES for expected in case["ml"].values()}
+    assert fallback_levels == ml_levels == {"high", "medium", "low"}
+    # The low filter keeps two factors and the medium one four, promoting high impacts after the second
+    assert any(len(case["ml"]["0.1"]["risk_factors"]) == 2 for case in CASES)
+    assert any(len(case["ml"]["0.45"]["risk_factors"]) == 4 for case in CASES)
+    assert any(["high"] == [impact for _, impact in case["ml"]["0.45"]["risk_factors"][2:3]] for case in CASES)
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_fallback_matches_baseline(case):
+    assert summary(calculate_fallback_risk(assessment(case))) == case["fallback"]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_ml_matches_baseline(case):
+    data = assessment(case)
+    for probability, expected in case["ml"].items():
+        assert summary(build_ml_prediction_response(data, model_prediction(probability))) == expected, probability
+
+    batch = build_ml_prediction_responses([data] * len(case["ml"]), [model_prediction(p) for p in case["ml"]])
+    assert [summary(response) for response in batch] == list(case["ml"].values())
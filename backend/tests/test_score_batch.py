@@ -0,0 +1,40 @@
+# backend/tests/test_score_batch.py
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from conftest import BACKEND_DIR
+
+
+def run_cli(tmp_path, lines, *args):
+    source = tmp_path / "input.jsonl"
+    source.write_text("".join(line + "\n" for line in lines))
+    output = tmp_path / "output.csv"
+    result = subprocess.run(
+        [sys.executable, os.path.join("ml", "score_batch.py"), str(source), "-o", str(output), "--workers", "1",
+         *args],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stderr
+    return pd.read_csv(output)
+
+
+def test_all_invalid_chunk_writes_error_rows(tmp_path, simplified_payload):
+    lines = [json.dumps(simplified_payload), '{"bad": 1}', json.dumps(simplified_payload)]
+    out = run_cli(tmp_path, lines, "--chunk-rows", "1")
+
+    assert out["row"].tolist() == [0, 1, 2]
+    assert out["error"].isna().tolist() == [True, False, True]
+    assert out.loc[1, "error"].startswith("Invalid assessment:")
+    assert out["dropout_probability"].isna().tolist() == [False, True, False]
+
+
+def test_only_invalid_lines(tmp_path):
+    out = run_cli(tmp_path, ['{"bad": 1}', "not json"])
+
+    assert len(out) == 2
+    assert out["error"].str.startswith("Invalid assessment:").all()
+    assert out["predicted_class"].isna().all()
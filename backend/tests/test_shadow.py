@@ -0,0 +1,35 @@
+# backend/tests/test_shadow.py
+import os
+
+import pytest
+
+from app.config import settings
+from app.models.shadow import candidate_file
+
+
+def test_candidate_files_resolve_inside_the_candidates_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "shadow_candidates_dir", str(tmp_path))
+    os.symlink("/etc/hosts", tmp_path / "escape.joblib")
+
+    assert candidate_file("model.joblib") == os.path.join(os.path.realpath(tmp_path), "model.joblib")
+    for path in ("../model.joblib", "/etc/hosts", "escape.joblib"):
+        with pytest.raises(ValueError):
+            candidate_file(path)
+
+
+def test_shadow_load_rejects_paths_outside_the_candidates_dir(client, admin_headers):
+    body = {"model_path": "../../../../etc/hosts", "scaler_path": "scaler_gb.joblib"}
+    assert client.post("/api/v1/admin/shadow", json=body).status_code == 401
+    response = client.post("/api/v1/admin/shadow", json=body, headers=admin_headers)
+    assert response.status_code == 400
+    assert client.get("/api/v1/admin/shadow", headers=admin_headers).json()["current"]["candidate_version"] is None
+
+
+def test_shadow_load_from_the_candidates_dir(client, admin_headers, model_version):
+    body = {"model_path": "model_gb.joblib", "scaler_path": "scaler_gb.joblib"}
+    try:
+        response = client.post("/api/v1/admin/shadow", json=body, headers=admin_headers)
+        assert response.status_code == 200
+        assert response.json()["current"]["candidate_version"] == model_version.version
+    finally:
+        client.delete("/api/v1/admin/shadow", headers=admin_headers)
@@ -0,0 +1,62 @@
+# backend/tests/test_sql_functions.py
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import Prediction, async_database_url
+from app.utils.sql_functions import year_week
+
+DAYS = [datetime(1999, 12, 25) + timedelta(days=i, hours=13) for i in range(41 * 366)]
+
+
+def test_sqlite_year_week_is_strftime():
+    query = str(select(year_week(bindparam("ts"))).compile(dialect=sqlite.dialect()))
+    conn = sqlite3.connect(":memory:")
+    try:
+        weeks = [conn.execute(query.replace("?", ":ts"), {"ts": day.isoformat(sep=" ")}).fetchone()[0]
+                 for day in DAYS]
+    finally:
+        conn.close()
+    assert weeks == [day.strftime("%Y-%W") for day in DAYS]
+
+
+def test_postgresql_week_formula_is_strftime():
+    """The arithmetic the PostgreSQL expression performs, checked day by day against %W (no server needed)."""
+    sql = str(select(year_week(bindparam("ts"))).compile(dialect=postgresql.dialect()))
+    assert "EXTRACT(DOY FROM" in sql and "EXTRACT(ISODOW FROM" in sql and "to_char(" in sql
+
+    for day in DAYS:
+        week = (day.timetuple().tm_yday + 7 - day.isoweekday()) // 7
+        assert f"{day.year}-{week:02d}" == day.strftime("%Y-%W"), day
+
+
+def test_year_week_runs_as_strftime(database):
+    """The SQL each backend actually executes on stored timestamps, against every day of four decades."""
+    async def weeks():
+        async with database.Session() as db:
+            await db.execute(insert(Prediction), [
+                {'risk_level': 'low', 'risk_score': 0, 'dropout_probability': 0.0, 'prediction_confidence': 1.0,
+                 'endpoint': 'week-test', 'created_at': day} for day in DAYS
+            ])
+            await db.commit()
+        async with database.ReadSession() as db:
+            return (await db.execute(select(Prediction.created_at, year_week(Prediction.created_at)))).all()
+
+    rows = database.run(weeks)
+    assert len(rows) == len(DAYS)
+    for day, week in rows:
+        assert week == day.strftime("%Y-%W"), day
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("postgres://u:p@host:5432/db", "postgresql+asyncpg://u:p@host:5432/db"),
+    ("postgresql://u:p@host/db", "postgresql+asyncpg://u:p@host/db"),
+    ("postgresql+asyncpg://u:p@host/db", "postgresql+asyncpg://u:p@host/db"),
+    ("sqlite:///./database.db", "sqlite+aiosqlite:///./database.db"),
+    ("sqlite+aiosqlite:///./database.db", "sqlite+aiosqlite:///./database.db"),
+])
+def test_async_database_url(url, expected):
+    assert async_database_url(url) == expected